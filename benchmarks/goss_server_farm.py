@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Synthetic Goss server farm, for benchmarking print_goss_json_results.py without a live system
+
+Listens on N loopback ports (chosen by the kernel) on a single asyncio event loop, and answers every
+GET request the way a Goss server does: with Goss JSON results (status 200 if no tests failed,
+503 if some did). The results are either generated or a recorded Goss JSON results file. Each
+request can be delayed, answered with a transient 503 (which has no Goss results, and so is
+retried by the aggregator), or never answered at all (a hung server).
+
+Once it is listening, one line is written to stdout: a JSON list of the ports. It then serves until
+it is killed.
+
+Usage: goss_server_farm.py --servers N [--tests T] [--fail-ratio F] [--payload FILE] [--latency S]
+                           [--error-503-ratio R] [--hang-ratio H] [--seed SEED]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+TRANSIENT_503_BODY = b"Service Unavailable"
+
+def generated_payload(tests: int, fail_ratio: float) -> bytes:
+    """
+    Returns Goss JSON results with the specified number of tests, of which round(tests * fail_ratio) failed
+    """
+    failed = round(tests * fail_ratio)
+    results = list()
+    for i in range(tests):
+        passed = i >= failed
+        results.append({ "duration": 1000000 + 7919 * i,
+                         "err": None,
+                         "expected": [ "0" ],
+                         "found": [ "0" if passed else "1" ],
+                         "human": "",
+                         "meta": { "desc": f"Validates that synthetic check {i} passes on this node.", "sev": 0 },
+                         "property": "exit-status",
+                         "resource-id": f"synthetic_check_{i}",
+                         "resource-type": "Command",
+                         "result": 0 if passed else 1,
+                         "skipped": False,
+                         "successful": passed,
+                         "summary-line": f"Command: synthetic_check_{i}: exit-status: "
+                                         f"{'matches' if passed else 'doesnt match'} expectation: [0]",
+                         "test-type": 0,
+                         "title": f"Synthetic check number {i}" })
+    summary = { "failed-count": failed,
+                "summary-line": f"Count: {tests}, Failed: {failed}, Duration: 0.000s",
+                "test-count": tests,
+                "total-duration": sum(result["duration"] for result in results) }
+    return json.dumps({ "results": results, "summary": summary }).encode()
+
+def http_response(status: int, reason: str, body: bytes, content_type: str) -> bytes:
+    head = (f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n")
+    return head.encode() + body
+
+class GossServerFarm:
+    def __init__(self, payload: bytes, latency: float, error_503_ratio: float, hang_ratio: float, seed: int):
+        try:
+            failed_count = json.loads(payload)["summary"]["failed-count"]
+        except Exception:
+            failed_count = 1
+        # Like Goss, answer with 503 when any test failed
+        if failed_count == 0:
+            self.results_response = http_response(200, "OK", payload, "application/json")
+        else:
+            self.results_response = http_response(503, "Service Unavailable", payload, "application/json")
+        self.transient_response = http_response(503, "Service Unavailable", TRANSIENT_503_BODY, "text/plain")
+        self.latency = latency
+        self.error_503_ratio = error_503_ratio
+        self.hang_ratio = hang_ratio
+        self.random = random.Random(seed)
+        self.servers = list()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Serve requests on the connection until the client closes it (the aggregator keeps connections alive)
+            while True:
+                try:
+                    await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                draw = self.random.random()
+                if draw < self.hang_ratio:
+                    # Never answer; just wait for the client to give up
+                    await reader.read()
+                    return
+                if self.latency > 0:
+                    # Uniformly distributed, with the requested mean
+                    await asyncio.sleep(self.random.uniform(0, 2 * self.latency))
+                if draw < self.hang_ratio + self.error_503_ratio:
+                    writer.write(self.transient_response)
+                else:
+                    writer.write(self.results_response)
+                await writer.drain()
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+    async def start(self, count: int) -> list:
+        ports = list()
+        for _ in range(count):
+            server = await asyncio.start_server(self.handle, host="127.0.0.1", port=0, backlog=1024)
+            self.servers.append(server)
+            ports.append(server.sockets[0].getsockname()[1])
+        return ports
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve synthetic Goss results on many loopback ports.")
+    parser.add_argument("--servers", type=int, required=True, help="Number of ports to listen on")
+    parser.add_argument("--tests", type=int, default=50, help="Number of tests in the generated results")
+    parser.add_argument("--fail-ratio", type=float, default=0.05, help="Fraction of the generated tests which fail")
+    parser.add_argument("--payload", help="Serve this recorded Goss JSON results file instead of generated results")
+    parser.add_argument("--latency", type=float, default=0, help="Mean delay (in seconds) before each response")
+    parser.add_argument("--error-503-ratio", type=float, default=0,
+                        help="Fraction of requests answered with a transient 503 (no Goss results)")
+    parser.add_argument("--hang-ratio", type=float, default=0, help="Fraction of requests which are never answered")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random choices")
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    if args.payload:
+        with open(args.payload, "rb") as payload_file:
+            payload = payload_file.read()
+    else:
+        payload = generated_payload(args.tests, args.fail_ratio)
+    farm = GossServerFarm(payload=payload, latency=args.latency, error_503_ratio=args.error_503_ratio,
+                          hang_ratio=args.hang_ratio, seed=args.seed)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    ports = loop.run_until_complete(farm.start(args.servers))
+    sys.stdout.write(json.dumps(ports) + "\n")
+    sys.stdout.flush()
+    loop.run_forever()
+
+if __name__ == "__main__":
+    main()
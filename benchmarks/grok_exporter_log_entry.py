@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Microbenchmark for the grok-exporter log entry serializer
+
+Measures the cost of building one grok-exporter log entry for a Goss test result, which is
+done once per test by print_goss_json_results.py. For comparison, the cost of json.dumps on the
+same dict (which does not give the field order or duration formatting that grok-exporter needs)
+is also shown.
+
+Usage: grok_exporter_log_entry.py [--entries N] [--repeat R]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "goss-testing", "automated", "python"))
+
+from lib.grok_exporter_logger import LogEntry
+from lib.results import DurationSeconds
+
+def test_result_data(i: int) -> dict:
+    return { "Result Code": i % 3,
+             "Result String": ("PASS", "FAIL", "SKIPPED")[i % 3],
+             "Source": "http://ncn-m001.hmn:8994/ncn-healthcheck-master",
+             "Test Name": f"Kubernetes Node Test Number {i}",
+             "Description": f"Validates that the check numbered {i} passes on this node.",
+             "Test Summary": f"Command: check_{i}: exit-status: matches expectation: [0]",
+             "Execution Time (seconds)": DurationSeconds(123456789 + i),
+             "Execution Time (nanoseconds)": 123456789 + i,
+             "Node": "ncn-m001" }
+
+def per_entry_usec(func, entries: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) / entries * 1000000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time grok-exporter log entry serialization")
+    parser.add_argument("--entries", type=int, default=10000, help="Log entries per timed run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs (the best is reported)")
+    args = parser.parse_args()
+
+    data = [ test_result_data(i) for i in range(args.entries) ]
+    plain_data = [ dict(d, **{ "Execution Time (seconds)": str(d["Execution Time (seconds)"]) }) for d in data ]
+
+    def log_entries():
+        for d in data:
+            LogEntry(message="Test result", script_name="print_goss_json_results.py", product="CSM", data=d).to_json_str()
+
+    def json_dumps():
+        for d in plain_data:
+            json.dumps(d)
+
+    print(f"Python {sys.version.split()[0]}, {args.entries} entries, best of {args.repeat}")
+    print(f"LogEntry:   {per_entry_usec(log_entries, args.entries, args.repeat):8.2f} usec per entry")
+    print(f"json.dumps: {per_entry_usec(json_dumps, args.entries, args.repeat):8.2f} usec per entry (reference)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Benchmark for print_goss_json_results.py against a synthetic Goss server farm
+
+Starts goss_server_farm.py with as many loopback ports as there are sources, and runs the
+aggregator against one URL on each port. This needs no system and no network access, so it can be
+run in CI. For each run, these are reported:
+
+wall            Seconds from starting the aggregator until it exited
+first output    Seconds until the aggregator printed its first results ("Checking test results")
+peak RSS        Peak resident set size of the aggregator process, in MiB
+exit code       Exit code of the aggregator (1 is expected when the results include failed tests)
+
+The farm options (--tests, --fail-ratio, --payload, --latency, --error-503-ratio, --hang-ratio) are
+passed through to it. Hung requests are limited by --read-timeout.
+
+Usage: results_aggregator.py [--sources 10,100,1000] [--engine threads|asyncio|both] [--repeat R]
+                             [--json FILE] [farm options]
+"""
+
+from typing import List, Optional
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FARM_SCRIPT = os.path.join(BENCHMARKS_DIR, "goss_server_farm.py")
+AGGREGATOR_SCRIPT = os.path.join(BENCHMARKS_DIR, "..", "goss-testing", "automated", "python",
+                                 "print_goss_json_results.py")
+
+# The aggregator prints this when it reports the results of its first source
+FIRST_OUTPUT_MARKER = "Checking test results"
+
+def raise_open_file_limit() -> None:
+    """
+    Each source needs a listening socket in the farm, and a connection in each process
+    """
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def start_farm(servers: int, farm_args: List[str]) -> (subprocess.Popen, List[int]):
+    farm = subprocess.Popen([sys.executable, FARM_SCRIPT, "--servers", str(servers)] + farm_args,
+                            stdout=subprocess.PIPE, universal_newlines=True)
+    line = farm.stdout.readline()
+    if not line:
+        farm.wait()
+        raise RuntimeError(f"Server farm exited with return code {farm.returncode} before it was ready")
+    return farm, json.loads(line)
+
+def stop_farm(farm: subprocess.Popen) -> None:
+    farm.kill()
+    farm.wait()
+    farm.stdout.close()
+
+def aggregator_env(log_dir: str, engine: str, max_threads: int, read_timeout: float) -> dict:
+    env = dict(os.environ)
+    env.update({ "GOSS_LOG_BASE_DIR": log_dir,
+                 "GOSS_GROK_EXPORTER_LOG_DIR": os.path.join(log_dir, "grok_exporter"),
+                 "GOSS_SCRIPT_HISTORY_DB": "",
+                 "GOSS_SCRIPT_ENGINE": engine,
+                 "GOSS_SCRIPT_READ_TIMEOUT": str(read_timeout),
+                 "GOSS_SCRIPT_RETRY_BACKOFF": "0.1",
+                 "GOSS_SCRIPT_RETRY_MAX_BACKOFF": "0.5" })
+    if max_threads is not None:
+        env["GOSS_SCRIPT_MAX_THREADS"] = str(max_threads)
+    return env
+
+def wait_for_first_output(stdout, started: float, first_output: list) -> None:
+    for line in stdout:
+        if not first_output and FIRST_OUTPUT_MARKER in line:
+            first_output.append(time.monotonic() - started)
+    stdout.close()
+
+def run_aggregator(urls: List[str], env: dict) -> dict:
+    started = time.monotonic()
+    proc = subprocess.Popen([sys.executable, AGGREGATOR_SCRIPT] + urls, env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, universal_newlines=True)
+    first_output = list()
+    reader = threading.Thread(target=wait_for_first_output, args=(proc.stdout, started, first_output))
+    reader.start()
+    # wait4 gives the resource usage of just this process (not the farm)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.monotonic() - started
+    reader.join()
+    if os.WIFEXITED(status):
+        proc.returncode = os.WEXITSTATUS(status)
+    else:
+        proc.returncode = -os.WTERMSIG(status)
+    return { "wall_seconds": round(wall, 3),
+             "first_output_seconds": round(first_output[0], 3) if first_output else None,
+             # ru_maxrss is in KiB on Linux
+             "peak_rss_mib": round(rusage.ru_maxrss / 1024, 1),
+             "exit_code": proc.returncode }
+
+def benchmark(sources: int, engines: List[str], repeat: int, farm_args: List[str], max_threads: Optional[int],
+              read_timeout: float) -> List[dict]:
+    farm, ports = start_farm(sources, farm_args)
+    try:
+        urls = [ f"http://127.0.0.1:{port}/ncn-healthcheck-synthetic-{i}" for i, port in enumerate(ports) ]
+        runs = list()
+        for engine in engines:
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory(prefix="goss-benchmark-") as log_dir:
+                    result = run_aggregator(urls, aggregator_env(log_dir, engine, max_threads, read_timeout))
+                result.update(sources=sources, engine=engine)
+                print_run(result)
+                runs.append(result)
+        return runs
+    finally:
+        stop_farm(farm)
+
+def print_run(run: dict) -> None:
+    first_output = run["first_output_seconds"]
+    first_output = "-" if first_output is None else f"{first_output:.3f}"
+    print(f"{run['sources']:>8} {run['engine']:>8} {run['wall_seconds']:>9.3f} {first_output:>13} "
+          f"{run['peak_rss_mib']:>14.1f} {run['exit_code']:>10}", flush=True)
+
+def print_summary(runs: List[dict]) -> None:
+    print("\nMedian over repeats:")
+    keys = sorted({ (run["sources"], run["engine"]) for run in runs })
+    for sources, engine in keys:
+        matching = [ run for run in runs if run["sources"] == sources and run["engine"] == engine ]
+        first_outputs = [ run["first_output_seconds"] for run in matching if run["first_output_seconds"] is not None ]
+        print_run({ "sources": sources, "engine": engine,
+                    "wall_seconds": statistics.median(run["wall_seconds"] for run in matching),
+                    "first_output_seconds": statistics.median(first_outputs) if first_outputs else None,
+                    "peak_rss_mib": statistics.median(run["peak_rss_mib"] for run in matching),
+                    "exit_code": max(run["exit_code"] for run in matching) })
+
+def source_counts(value: str) -> List[int]:
+    try:
+        counts = [ int(count) for count in value.split(",") ]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a comma-separated list of integers: {value}")
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"Source counts must be positive: {value}")
+    return counts
+
+def parse_args() -> (argparse.Namespace, List[str]):
+    parser = argparse.ArgumentParser(description="Benchmark print_goss_json_results.py against a synthetic Goss server farm.")
+    parser.add_argument("--sources", type=source_counts, default=[10, 100, 1000],
+                        help="Comma-separated numbers of sources to benchmark (default: 10,100,1000)")
+    parser.add_argument("--engine", choices=["threads", "asyncio", "both"], default="threads")
+    parser.add_argument("--max-threads", type=int, help="GOSS_SCRIPT_MAX_THREADS for the threads engine")
+    parser.add_argument("--read-timeout", type=float, default=5, help="GOSS_SCRIPT_READ_TIMEOUT (limits hung requests)")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of runs for each number of sources")
+    parser.add_argument("--json", help="Also write the results of every run to this file")
+    # Everything else is passed to the server farm
+    return parser.parse_known_args()
+
+def main() -> None:
+    args, farm_args = parse_args()
+    engines = ["threads", "asyncio"] if args.engine == "both" else [args.engine]
+    raise_open_file_limit()
+    print(f"{'sources':>8} {'engine':>8} {'wall (s)':>9} {'first out (s)':>13} {'peak RSS (MiB)':>14} {'exit code':>10}")
+    runs = list()
+    for sources in args.sources:
+        runs.extend(benchmark(sources, engines, args.repeat, farm_args, args.max_threads, args.read_timeout))
+    if args.repeat > 1:
+        print_summary(runs)
+    if args.json:
+        with open(args.json, "wt") as json_file:
+            json.dump(runs, json_file, indent=2)
+            json_file.write("\n")
+
+if __name__ == "__main__":
+    main()
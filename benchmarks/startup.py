@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Startup time benchmark for the Goss Python automated scripts
+
+run-ncn-tests.sh and the other helper scripts call these Python entry points many times per
+healthcheck, so the fixed cost of starting them matters. This measures the wall time of short
+invocations of each of them (which are dominated by interpreter startup and imports), along with
+that of a bare interpreter, for reference.
+
+Each command is run --repeat times, and the minimum and median are reported, in milliseconds.
+With --importtime, the slowest imports of print_goss_json_results.py (run on a results file)
+are also listed.
+
+Usage: startup.py [--repeat R] [--importtime]
+"""
+
+from typing import List, Tuple
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BENCHMARKS_DIR, "..", "goss-testing", "automated", "python")
+
+# A small set of Goss results, so that the results file run does almost no work besides starting up
+RESULTS = { "results": [ { "duration": 1000000, "meta": { "desc": "Startup benchmark test" }, "result": 0,
+                           "skipped": False, "successful": True,
+                           "summary-line": "Command: startup: exit-status: matches expectation: [0]",
+                           "title": "Startup benchmark test" } ],
+            "summary": { "failed-count": 0, "summary-line": "Count: 1, Failed: 0", "test-count": 1,
+                         "total-duration": 1000000 } }
+
+def script(name: str) -> str:
+    return os.path.join(SCRIPTS_DIR, name)
+
+def commands(results_file: str) -> List[Tuple[str, List[str]]]:
+    return [ ("python3 (no script)", [sys.executable, "-c", "pass"]),
+             ("print_goss_json_results.py --help", [sys.executable, script("print_goss_json_results.py"), "--help"]),
+             ("print_goss_json_results.py (usage error)",
+              [sys.executable, script("print_goss_json_results.py"), "/nonexistent/results.json"]),
+             ("print_goss_json_results.py (results file)",
+              [sys.executable, script("print_goss_json_results.py"), results_file]),
+             ("goss_suite_urls.py --help", [sys.executable, script("goss_suite_urls.py"), "--help"]),
+             ("goss_results_history.py --help", [sys.executable, script("goss_results_history.py"), "--help"]) ]
+
+def time_command(cmd: List[str], env: dict, repeat: int) -> List[float]:
+    times = list()
+    for _ in range(repeat):
+        started = time.monotonic()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.monotonic() - started) * 1000)
+    return times
+
+def show_importtime(results_file: str, env: dict, top: int = 15) -> None:
+    """
+    Lists the imports with the highest cumulative import time
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", script("print_goss_json_results.py"), results_file],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                          check=False)
+    imports = list()
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3:
+            continue
+        try:
+            imports.append((int(fields[1]), fields[2].rstrip()))
+        except ValueError:
+            continue
+    print(f"\nSlowest imports (cumulative microseconds) of print_goss_json_results.py with a results file:")
+    for cumulative, name in sorted(imports, reverse=True)[:top]:
+        print(f"{cumulative:>10} {name}")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the startup time of the Goss Python automated scripts.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of runs of each command")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports")
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="goss-startup-benchmark-") as tmp_dir:
+        results_file = os.path.join(tmp_dir, "results.json")
+        with open(results_file, "wt") as outfile:
+            json.dump(RESULTS, outfile)
+        env = dict(os.environ)
+        env.update({ "GOSS_LOG_BASE_DIR": os.path.join(tmp_dir, "logs"),
+                     "GOSS_GROK_EXPORTER_LOG_DIR": os.path.join(tmp_dir, "grok_exporter"),
+                     "GOSS_SCRIPT_HISTORY_DB": "" })
+        print(f"{'command':<45} {'min (ms)':>9} {'median (ms)':>12}")
+        for label, cmd in commands(results_file):
+            times = time_command(cmd, env, args.repeat)
+            print(f"{label:<45} {min(times):>9.1f} {statistics.median(times):>12.1f}", flush=True)
+        if args.importtime:
+            show_importtime(results_file, env)
+
+if __name__ == "__main__":
+    main()
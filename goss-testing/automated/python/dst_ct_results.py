@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Usage: dst_ct_results [--vars <Goss variables file>] [--node-type master|storage|worker|livecd]
+                      [--csm-version <version>] [OUTPUT_FILE]
+
+Runs the Goss suites which goss-servers serves on this node, and writes their results to a
+DST-compatible results file (by default, ${TEST_BASE_DIR:-/tmp}/api-results.json), which can then be
+picked up by the DST pipeline and sent to the results dashboard. This does the same as
+dst-ct-results.sh, but finds the suites from the Goss server configuration file (rather than from
+the running Goss servers), and runs them in parallel (GOSS_SCRIPT_MAX_THREADS at a time, or the
+thread pool default if it is 0), so the run takes about as long as the slowest suite. See
+lib/dst_results.py for details.
+
+The Goss variables file is --vars, or else GOSS_VARS. The run-ncn-tests.sh function of the same
+name creates one and calls this script. The CSM version is read from the product catalog, unless
+--csm-version is given.
+
+Exits 0 if the results file was written (whether or not any tests failed), non-0 otherwise.
+"""
+
+from lib.common import goss_script_max_threads,     \
+                       goss_script_read_timeout,    \
+                       goss_suites_dir,             \
+                       my_ncn_type,                 \
+                       NCN_TYPES,                   \
+                       ScriptException,             \
+                       stderr_print,                \
+                       stdout_print
+from lib.dst_results import latest_csm_version, \
+                            run_suites,         \
+                            suite_files,        \
+                            SuiteResults,       \
+                            write_dst_results
+from lib.endpoints import load_goss_endpoint_registry
+
+import argparse
+import os
+import sys
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Goss suites for this node and produce a DST-compatible results file.")
+    parser.add_argument("output_file", nargs="?",
+                        default=f"{os.environ.get('TEST_BASE_DIR') or '/tmp'}/api-results.json",
+                        help="DST results file to write.")
+    parser.add_argument("--vars", default=os.environ.get("GOSS_VARS", ""),
+                        help="Goss variables file (by default, GOSS_VARS).")
+    parser.add_argument("--node-type", choices=NCN_TYPES,
+                        help="Run the suites for this NCN type (by default, the type of this node).")
+    parser.add_argument("--csm-version", help="CSM version to report (by default, the latest in the product catalog).")
+    return parser.parse_args()
+
+def show_suite_results(results: SuiteResults) -> None:
+    if results.error:
+        stderr_print(f"{results.suite}: ERROR: {results.error}")
+        return
+    stdout_print(f"{results.suite}: {len(results.tests)} tests, {results.failed_count} failed "
+                 f"({results.seconds:.3f} seconds)")
+
+def run() -> None:
+    args = parse_args()
+    try:
+        if not args.vars:
+            raise ScriptException("No Goss variables file specified (use --vars or set GOSS_VARS)")
+        elif not os.path.isfile(args.vars):
+            raise ScriptException(f"Goss variables file does not exist or is not a file: {args.vars}")
+        csm_version = args.csm_version if args.csm_version is not None else latest_csm_version()
+        node_type = args.node_type or my_ncn_type()
+        suites = suite_files(load_goss_endpoint_registry(), node_type, goss_suites_dir())
+        stdout_print(f"Found {len(suites)} suites to run")
+        suite_results = run_suites(suites, args.vars, csm_version, goss_script_max_threads(),
+                                   goss_script_read_timeout(), on_complete=show_suite_results)
+        num_tests = write_dst_results(args.output_file, suite_results)
+    except ScriptException as e:
+        stderr_print(f"ERROR: {e}")
+        sys.exit(1)
+    num_failed = sum(results.failed_count for results in suite_results)
+    num_errors = sum(1 for results in suite_results if results.error)
+    stdout_print(f"{num_tests} tests ({num_failed} failed) from {len(suites) - num_errors} suites"
+                 + (f"; {num_errors} suites produced no results" if num_errors else ""))
+    stdout_print(f"DST-compatible results file has been saved to: {args.output_file}")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    run()
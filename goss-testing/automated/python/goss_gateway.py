@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Usage: goss_gateway --vars <Goss variables file> --listen-ip <IP address> [--format json|junit]
+                    [--node-type master|storage|worker|livecd]
+
+Serves every Goss endpoint for this node (or for the specified NCN type) from one process, on the
+ports and endpoint paths given by the Goss server configuration file. See lib/gateway.py for details.
+
+This is started by start-goss-servers.sh when GOSS_SERVERS_MODE is set to "gateway". It runs until
+it is stopped. If GOSS_GATEWAY_PRERUN_INTERVAL is set (or suites have the prerun-interval option),
+suites are also run in the background while the node is idle (see lib/gateway_prerun.py). The
+lowest port (8994 on NCNs) also serves /metrics, for Prometheus (see lib/gateway_metrics.py).
+
+Exits non-0 if the gateway cannot be started.
+"""
+
+from lib.common import goss_gateway_cache_ttl,               \
+                       goss_gateway_max_concurrent,          \
+                       goss_gateway_max_stale,               \
+                       goss_gateway_prerun_interval,         \
+                       goss_gateway_prerun_max_cpu_pressure, \
+                       goss_gateway_prerun_max_load,         \
+                       goss_gateway_results_dir,             \
+                       goss_gateway_run_timeout,             \
+                       goss_script_log_level,                \
+                       goss_script_metrics_file,             \
+                       goss_suites_dir,                      \
+                       my_ncn_type,                          \
+                       NCN_TYPES,                            \
+                       ScriptException,                      \
+                       stderr_print
+from lib.endpoints import load_goss_endpoint_registry
+from lib.gateway import gateway_endpoints,          \
+                        GossGateway,                \
+                        RESULTS_CONTENT_TYPES,      \
+                        SuiteScheduler
+from lib.gateway_cache import SuiteResultCache
+from lib.gateway_metrics import GatewayMetrics
+from lib.gateway_prerun import PrerunScheduler
+
+import argparse
+import logging
+import signal
+import sys
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve all Goss endpoints for this node from one process.")
+    parser.add_argument("--vars", required=True, help="Goss variables file.")
+    parser.add_argument("--listen-ip", required=True, help="IP address to listen on.")
+    parser.add_argument("--format", dest="results_format", choices=sorted(RESULTS_CONTENT_TYPES), default="json",
+                        help="Goss results format.")
+    parser.add_argument("--node-type", choices=NCN_TYPES,
+                        help="Serve the endpoints for this NCN type (by default, the type of this node).")
+    return parser.parse_args()
+
+def run() -> None:
+    args = parse_args()
+    # This runs as a service, so everything is logged to stderr (and from there to the journal)
+    logging.basicConfig(level=goss_script_log_level(), format="%(levelname)s %(threadName)s %(message)s")
+
+    try:
+        node_type = args.node_type or my_ncn_type()
+        endpoints = gateway_endpoints(load_goss_endpoint_registry(), node_type, goss_suites_dir(),
+                                      goss_gateway_cache_ttl(), goss_gateway_max_stale(),
+                                      goss_gateway_prerun_interval())
+        if not endpoints:
+            raise ScriptException(f"No Goss endpoints to serve for NCN type {node_type}")
+        scheduler = SuiteScheduler(args.vars, args.results_format, goss_gateway_max_concurrent(),
+                                   goss_gateway_run_timeout())
+        cache = SuiteResultCache(scheduler, goss_gateway_results_dir(), GatewayMetrics(goss_script_metrics_file()))
+        gateway = GossGateway(args.listen_ip, endpoints, cache)
+    except (ScriptException, OSError) as e:
+        stderr_print(f"ERROR: {e}")
+        sys.exit(1)
+
+    logging.info(f"Goss gateway started: {len(endpoints)} endpoints on {len(gateway.servers)} ports, "
+                 f"at most {scheduler.max_concurrent} suites running at once")
+    loaded = cache.load_saved(endpoints)
+    if loaded:
+        logging.info(f"Loaded saved results for {', '.join(loaded)}")
+    prerun = PrerunScheduler(cache, endpoints, goss_gateway_prerun_max_load(), goss_gateway_prerun_max_cpu_pressure())
+    if prerun.endpoints:
+        logging.info(f"Running {', '.join(endpoint.endpoint_name for endpoint in prerun.endpoints)} in the background")
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: gateway.stop())
+    prerun.start()
+    try:
+        gateway.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        prerun.stop()
+        gateway.close()
+    logging.info("Goss gateway stopped")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Usage: goss_ncn_inventory [--exclude-pit] [--masters] [--storage] [--workers] [--refresh]
+
+Outputs the list of NCNs, one per line, in sorted order. The base set of NCNs is based on the
+--masters, --storage, --workers flags. If none of those are specified, then all NCNs are included.
+If any of them are specified, then only the specified types of NCNs are output. Regardless of the
+above, if --exclude-pit is specified, and this is the PIT node, then ncn-m001 is excluded.
+
+The NCN list is taken from the NCN inventory cache, if it is fresh (unless --refresh is specified).
+Otherwise all of the inventory sources are queried at once, and the list is cached. See
+lib/ncn_inventory.py for details.
+
+Exits 0 on success, non-0 otherwise.
+"""
+
+from lib.common import ScriptException, \
+                       stderr_print
+from lib.ncn_inventory import get_ncns
+
+import argparse
+import sys
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Print list of NCNs.")
+    parser.add_argument("--exclude-pit", action="store_true",
+                        help="Exclude ncn-m001, if this is the PIT node.")
+    parser.add_argument("--masters", dest="types", action="append_const", const="master",
+                        help="Include master NCNs.")
+    parser.add_argument("--storage", dest="types", action="append_const", const="storage",
+                        help="Include storage NCNs.")
+    parser.add_argument("--workers", dest="types", action="append_const", const="worker",
+                        help="Include worker NCNs.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Do not use the cached NCN list (it is still updated).")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        ncns = get_ncns(types=args.types or [], exclude_pit=args.exclude_pit, refresh=args.refresh,
+                        warn=lambda s: stderr_print(f"WARNING: {s}"))
+    except ScriptException as e:
+        stderr_print(f"ERROR: {e}")
+        sys.exit(1)
+    print("\n".join(ncns))
+    sys.exit(0)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Usage: goss_results_history [--db <path>] slowest [--runs N] [--limit N]
+       goss_results_history [--db <path>] flapping [--runs N] [--min-changes N]
+       goss_results_history [--db <path>] regression [--runs N] [--baseline-runs N] [--ratio R] [--min-seconds S]
+       goss_results_history [--db <path>] runs [--runs N]
+
+Queries the historical results database, which print_goss_json_results adds every run to.
+By default the database in GOSS_SCRIPT_HISTORY_DB is used.
+
+slowest     The tests with the highest median execution time over the last N runs.
+flapping    The tests whose result changed from run to run over the last N runs.
+            Results are shown oldest first: P = pass, F = fail, S = skipped, ? = unknown.
+regression  The tests whose median execution time over the last N runs is at least R times
+            their median over the baseline runs before those.
+runs        The most recent runs in the database.
+
+Exits 0 on success, non-0 otherwise.
+"""
+
+from lib.common import argparse_nonnegative_float,  \
+                       argparse_positive_int,       \
+                       goss_script_history_db,      \
+                       ScriptException,             \
+                       stderr_print
+from lib.results_history import ResultsHistory,             \
+                                ResultsHistoryException
+
+import argparse
+import os
+import sys
+
+RESULT_LETTERS = { 0: "P", 1: "F", 2: "S" }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the historical Goss test results database.")
+    parser.add_argument("--db", default=None, help="Path to the results history database.")
+    subparsers = parser.add_subparsers(dest="query")
+    subparsers.required = True
+
+    slowest = subparsers.add_parser("slowest", help="Slowest tests over the last N runs.")
+    slowest.add_argument("--runs", type=argparse_positive_int, default=10, help="Number of runs (default: 10).")
+    slowest.add_argument("--limit", type=argparse_positive_int, default=20, help="Number of tests (default: 20).")
+
+    flapping = subparsers.add_parser("flapping", help="Tests whose result changed over the last N runs.")
+    flapping.add_argument("--runs", type=argparse_positive_int, default=10, help="Number of runs (default: 10).")
+    flapping.add_argument("--min-changes", type=argparse_positive_int, default=1,
+                          help="Minimum number of result changes (default: 1).")
+
+    regression = subparsers.add_parser("regression", help="Tests which got slower compared to earlier runs.")
+    regression.add_argument("--runs", type=argparse_positive_int, default=3,
+                            help="Number of recent runs to check (default: 3).")
+    regression.add_argument("--baseline-runs", type=argparse_positive_int, default=10,
+                            help="Number of runs before those to use as the baseline (default: 10).")
+    regression.add_argument("--ratio", type=argparse_nonnegative_float, default=1.5,
+                            help="Minimum ratio of recent to baseline median execution time (default: 1.5).")
+    regression.add_argument("--min-seconds", type=argparse_nonnegative_float, default=0.1,
+                            help="Ignore tests whose recent median execution time is less than this (default: 0.1).")
+
+    runs = subparsers.add_parser("runs", help="List the most recent runs.")
+    runs.add_argument("--runs", type=argparse_positive_int, default=10, help="Number of runs (default: 10).")
+
+    return parser.parse_args()
+
+def show_slowest(history: ResultsHistory, args: argparse.Namespace) -> None:
+    for trend in history.slowest_tests(num_runs=args.runs, limit=args.limit):
+        print(f"median {trend.median()}s, max {trend.maximum()}s, {len(trend.durations)} results: "
+              f"{trend.title} (Node: {trend.node}, Source: {trend.source})")
+
+def show_flapping(history: ResultsHistory, args: argparse.Namespace) -> None:
+    for (node, source, title), changes, results in history.flapping_tests(num_runs=args.runs,
+                                                                          min_changes=args.min_changes):
+        result_string = "".join(RESULT_LETTERS.get(result, "?") for result in results)
+        print(f"{changes} changes ({result_string}): {title} (Node: {node}, Source: {source})")
+
+def show_regression(history: ResultsHistory, args: argparse.Namespace) -> None:
+    for recent, baseline, ratio in history.duration_regressions(num_runs=args.runs,
+                                                                 baseline_runs=args.baseline_runs,
+                                                                 min_ratio=args.ratio,
+                                                                 min_duration_ns=int(args.min_seconds * 1000000000)):
+        print(f"{ratio:.2f}x (median {baseline.median()}s -> {recent.median()}s): "
+              f"{recent.title} (Node: {recent.node}, Source: {recent.source})")
+
+def show_runs(history: ResultsHistory, args: argparse.Namespace) -> None:
+    for run_id, timestamp, hostname, log_dir, num_results in history.runs(num_runs=args.runs):
+        print(f"Run {run_id}: {timestamp} on {hostname}, {num_results} results, logs in {log_dir}")
+
+QUERIES = { "slowest": show_slowest, "flapping": show_flapping, "regression": show_regression, "runs": show_runs }
+
+def main(args: argparse.Namespace) -> None:
+    db_path = args.db if args.db is not None else goss_script_history_db()
+    if not db_path:
+        raise ScriptException("The results history database is disabled (GOSS_SCRIPT_HISTORY_DB is empty)")
+    if not os.path.isfile(db_path):
+        raise ScriptException(f"Results history database does not exist: {db_path}")
+    try:
+        with ResultsHistory(db_path) as history:
+            QUERIES[args.query](history, args)
+    except ResultsHistoryException as e:
+        raise ScriptException(str(e))
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        main(args)
+    except ScriptException as e:
+        stderr_print(f"ERROR: {e}")
+        sys.exit(1)
+    sys.exit(0)
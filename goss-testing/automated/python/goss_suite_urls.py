@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -34,29 +34,17 @@ Exits 0 on success, non-0 otherwise.
 
 from lib.common import argparse_yaml_file_name,     \
                        argparse_valid_ncn_name,     \
-                       get_ncn_type,                \
-                       NCN_TYPES,                   \
-                       ScriptException
-from lib.endpoints  import load_goss_endpoints
+                       get_ncn_type
+from lib.endpoints  import goss_endpoint_url,       \
+                           load_goss_endpoint_registry
 
 from typing import List, Tuple
 
 import argparse
 import sys
 
-port_endpoint = dict()
-
 def get_port_endpoint(node: str, suite: str) -> Tuple[int, str]:
-    node_type = get_ncn_type(node)
-    try:
-        return port_endpoint[node_type]
-    except KeyError:
-        goss_endpoints_by_ncn_type = load_goss_endpoints()
-        for (suite_name, endpoint_name, port) in goss_endpoints_by_ncn_type[node_type]:
-            if suite_name == suite:
-                port_endpoint[node_type] = port, endpoint_name
-                return port, endpoint_name
-        raise ScriptException(f"No port/endpoint found for suite {suite} for NCN {node_type} nodes")
+    return load_goss_endpoint_registry().lookup(get_ncn_type(node), suite)
 
 def parse_args() -> Tuple[str, List[str]]:
     parser = argparse.ArgumentParser(description="Print list of Goss endpoints.")
@@ -69,7 +57,7 @@ def get_suite_urls_nodelist(suite: str, *nodes) -> List[str]:
     urls = list()
     for node in nodes:
         port, endpoint = get_port_endpoint(node, suite)
-        urls.append(f"http://{node}.hmn:{port}/{endpoint}")
+        urls.append(goss_endpoint_url(node, port, endpoint))
     return urls
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Usage: goss_url_plan <suite name>=<node>[,<node>]... [<suite name>=<node>[,<node>]...] ...
+
+Outputs a space-separated list of URLs to the endpoints on the nodes (on the .hmn network) for
+every entry of the plan. Each entry names a suite and the nodes to run it on (for suites which
+only run on one Ready node, the entry just lists that node). The URLs are in the order of the
+entries, and of the nodes within each entry. A URL which appears in more than one entry is only
+output once.
+
+This does the work of one goss_suite_urls call per entry, but reads the Goss server
+configuration file once, in a single process.
+
+Exits 0 on success, non-0 otherwise.
+"""
+
+from lib.common import argparse_valid_ncn_name,     \
+                       argparse_yaml_file_name,     \
+                       get_ncn_type,                \
+                       ScriptException,             \
+                       stderr_print,                \
+                       StringList
+from lib.endpoints  import goss_endpoint_url,       \
+                           load_goss_endpoint_registry
+
+from typing import List, Tuple
+
+import argparse
+import sys
+
+PlanEntry = Tuple[str, StringList]
+
+def argparse_plan_entry(s: str) -> PlanEntry:
+    suite, sep, node_list = s.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Plan entries must have the form <suite name>=<node>[,<node>]... Invalid: {s}")
+    suite = argparse_yaml_file_name(suite)
+    nodes = [ argparse_valid_ncn_name(node) for node in node_list.split(",") ]
+    return suite, nodes
+
+def parse_args() -> List[PlanEntry]:
+    parser = argparse.ArgumentParser(description="Print list of Goss endpoints for a plan of suites and nodes.")
+    parser.add_argument("plan", nargs="+", type=argparse_plan_entry, metavar="suite=nodes",
+                        help="Goss suite name and comma-separated list of target nodes.")
+    args = parser.parse_args()
+    return args.plan
+
+def plan_urls(plan: List[PlanEntry]) -> List[str]:
+    """
+    Raises ScriptException if any suite in the plan has no endpoint on one of its nodes
+    """
+    registry = load_goss_endpoint_registry()
+    urls = dict()
+    for suite, nodes in plan:
+        for node in nodes:
+            port, endpoint = registry.lookup(get_ncn_type(node), suite)
+            # A dict (rather than a set) keeps the URLs in plan order
+            urls.setdefault(goss_endpoint_url(node, port, endpoint), None)
+    return list(urls)
+
+if __name__ == "__main__":
+    plan = parse_args()
+    try:
+        urls = plan_urls(plan)
+    except ScriptException as e:
+        stderr_print(f"ERROR: {e}")
+        sys.exit(1)
+    print(' '.join(urls))
+    sys.exit(0)
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to running Goss test sources on a single asyncio event loop, rather
+than with one thread per source. Each URL source is fetched by a coroutine, using a minimal
+HTTP/1.1 client built on asyncio streams, and each local Goss file is run as a subprocess
+through the event loop. This keeps memory and scheduling overhead low when there are very many
+sources.
+
+The sources are handed to a handler object, which must provide these methods:
+
+url_response(input_url, status_code, reason, headers, body)
+    Called with the response to the GET request for a URL source
+url_error(input_url, exc)
+    Called if the GET request for a URL source raised an exception
+goss_output(suite_or_test, cmd_list, returncode, stdout, stderr)
+    Called with the results of running Goss for a local suite or test file
+source_timeout(source, message)
+    Called if a source timed out, or was cancelled because the run deadline was reached
+source_retried(input_url, reason)
+    Called each time a request to a URL source is about to be retried
+source_started(source)
+    Called when a source starts running (once it has an in-flight slot)
+source_phase(source, phase, seconds)
+    Called with the time taken to fetch a URL source ("fetch", including any retries),
+    or to run Goss for a local source ("exec")
+"""
+
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import asyncio
+import gzip
+import logging
+import ssl
+import time
+import traceback
+import urllib.parse
+
+from .common import fmt_exc
+from .retry import is_retryable_status, RetryPolicy
+from .timeouts import deadline_message, Deadline, timeout_message
+
+HTTP_USER_AGENT = "csm-testing-goss-results"
+HTTP_ACCEPT_ENCODING = "gzip"
+
+class HTTPProtocolError(Exception):
+    pass
+
+class HTTPConnectTimeout(Exception):
+    pass
+
+# Connection problems which may be transient, and so are worth retrying
+RETRYABLE_ERRORS = (ConnectionError, HTTPConnectTimeout, asyncio.IncompleteReadError)
+
+async def read_http_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """
+    Reads header lines up to and including the blank line that ends them.
+    Returns a dict mapping the lowercased header names to their values.
+    """
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise HTTPProtocolError("Connection closed while reading response headers")
+        line = line.decode("iso-8859-1").rstrip("\r\n")
+        if not line:
+            return headers
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPProtocolError(f"Malformed response header line: {line}")
+        name = name.strip().lower()
+        value = value.strip()
+        if name in headers:
+            headers[name] = f"{headers[name]}, {value}"
+        else:
+            headers[name] = value
+
+async def read_chunked_body(reader: asyncio.StreamReader) -> bytes:
+    chunks = list()
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise HTTPProtocolError("Connection closed while reading chunked response body")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPProtocolError(f"Invalid chunk size line: {size_line!r}")
+        if size == 0:
+            # Discard any trailer headers
+            await read_http_headers(reader)
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        # Each chunk is followed by CRLF
+        await reader.readexactly(2)
+
+async def http_get(url: str, connect_timeout: float = None) -> Tuple[int, str, Dict[str, str], bytes]:
+    """
+    Makes a GET request to the URL.
+    Returns status code, reason, headers (with lowercased names), and the decoded body.
+    Raises HTTPConnectTimeout if the connection is not made within connect_timeout seconds.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme == "https":
+        port = parts.port or 443
+        ssl_context = ssl.create_default_context()
+    elif parts.scheme == "http":
+        port = parts.port or 80
+        ssl_context = None
+    else:
+        raise HTTPProtocolError(f"Unsupported URL scheme: {parts.scheme}")
+    host_header = parts.netloc.rpartition("@")[2]
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port, ssl=ssl_context),
+                                                timeout=connect_timeout)
+    except asyncio.TimeoutError:
+        raise HTTPConnectTimeout(f"Timed out after {connect_timeout} seconds connecting to {parts.netloc}")
+    try:
+        request = (f"GET {path} HTTP/1.1\r\n"
+                   f"Host: {host_header}\r\n"
+                   f"User-Agent: {HTTP_USER_AGENT}\r\n"
+                   f"Accept-Encoding: {HTTP_ACCEPT_ENCODING}\r\n"
+                   "Accept: */*\r\n"
+                   "Connection: close\r\n\r\n")
+        writer.write(request.encode("iso-8859-1"))
+        await writer.drain()
+
+        status_line = (await reader.readline()).decode("iso-8859-1").rstrip("\r\n")
+        status_fields = status_line.split(" ", 2)
+        if len(status_fields) < 2 or not status_fields[0].startswith("HTTP/"):
+            raise HTTPProtocolError(f"Malformed response status line: {status_line}")
+        try:
+            status_code = int(status_fields[1])
+        except ValueError:
+            raise HTTPProtocolError(f"Malformed response status line: {status_line}")
+        reason = status_fields[2] if len(status_fields) > 2 else ""
+        headers = await read_http_headers(reader)
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await read_chunked_body(reader)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+    finally:
+        writer.close()
+
+    if headers.get("content-encoding", "").lower() == "gzip":
+        body = gzip.decompress(body)
+    return status_code, reason, headers, body
+
+async def fetch_url_source(input_url: str, handler, retry_policy: RetryPolicy, deadline: Deadline,
+                           connect_timeout: float, timeout: float) -> None:
+    retry_number = 0
+    fetch_started = time.monotonic()
+    while True:
+        logging.info(f"Making GET request to {input_url}")
+        final_exc = None
+        attempt_timeout = deadline.cap(timeout)
+        try:
+            status_code, reason, headers, body = await asyncio.wait_for(http_get(input_url, connect_timeout),
+                                                                        timeout=attempt_timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"Timed out making GET request to {input_url}")
+            handler.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+            if deadline.expired():
+                handler.source_timeout(input_url, deadline_message(input_url, deadline))
+            else:
+                handler.source_timeout(input_url, timeout_message(input_url, attempt_timeout))
+            return
+        except RETRYABLE_ERRORS as exc:
+            retry_reason = fmt_exc(exc)
+            final_exc = exc
+        except Exception as exc:
+            logging.error(f"Unexpected error attempting GET request to {input_url}: {traceback.format_exc()}")
+            handler.url_error(input_url, exc)
+            return
+        else:
+            if not is_retryable_status(status_code, body):
+                handler.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+                handler.url_response(input_url, status_code, reason, headers, body)
+                return
+            retry_reason = f"Status code {status_code}"
+
+        delay = retry_policy.next_delay(retry_number, deadline)
+        if delay is None:
+            # Out of retries (or out of time), so report the last outcome
+            handler.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+            if final_exc is None:
+                handler.url_response(input_url, status_code, reason, headers, body)
+            elif isinstance(final_exc, HTTPConnectTimeout):
+                handler.source_timeout(input_url, timeout_message(input_url, connect_timeout))
+            else:
+                logging.error(f"Error attempting GET request to {input_url}: {retry_reason}")
+                handler.url_error(input_url, final_exc)
+            return
+        logging.warning(f"GET request to {input_url} failed ({retry_reason}); retrying in {delay:.2f} seconds")
+        handler.source_retried(input_url, retry_reason)
+        await asyncio.sleep(delay)
+        retry_number += 1
+
+async def run_goss_source(suite_or_test: str, cmd_list: List[str], handler, retry_policy: RetryPolicy,
+                          deadline: Deadline, connect_timeout: float, timeout: float) -> None:
+    logging.debug(f"Running: {cmd_list}")
+    exec_started = time.monotonic()
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd_list, stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.PIPE)
+    except Exception as exc:
+        logging.error(f"Unexpected error running {cmd_list}: {traceback.format_exc()}")
+        handler.goss_output(suite_or_test, cmd_list, None, b"", fmt_exc(exc).encode())
+        return
+    try:
+        cmd_out, cmd_err = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logging.error(f"Timed out running {cmd_list}")
+        handler.source_timeout(suite_or_test, timeout_message(suite_or_test, timeout))
+        return
+    finally:
+        # Make sure that Goss does not keep running if we stopped waiting for it
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    handler.source_phase(suite_or_test, "exec", time.monotonic() - exec_started)
+    handler.goss_output(suite_or_test, cmd_list, proc.returncode, cmd_out, cmd_err)
+
+async def run_all_sources(url_sources: Iterable[str], goss_sources: Iterable[str], handler,
+                          goss_cmd: Callable[[str], List[str]], max_in_flight: int,
+                          on_complete: Callable[[str], None], connect_timeout: float,
+                          read_timeout: float, deadline: Deadline, retry_policy: RetryPolicy) -> None:
+    # Create the semaphore inside the running loop, so that it is bound to it on older Python versions
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def run_source(source: str, report_error: Callable[[Exception], None], coroutine_function, *args) -> None:
+        # An unexpected error in one source (or in reporting it) must not stop the others from being run
+        # and reported, so it is logged and reported as the result of that source, as the threads engine does
+        try:
+            async with in_flight:
+                handler.source_started(source)
+                if deadline.expired():
+                    handler.source_timeout(source, deadline_message(source, deadline))
+                else:
+                    # Each source gets its full timeout, unless that would take it past the deadline
+                    await coroutine_function(source, *args, retry_policy=retry_policy, deadline=deadline,
+                                             connect_timeout=deadline.cap(connect_timeout),
+                                             timeout=deadline.cap(read_timeout))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logging.error(f"Unexpected error running {source}: {traceback.format_exc()}")
+            try:
+                report_error(exc)
+            except Exception:
+                logging.error(f"Unexpected error recording the error for {source}: {traceback.format_exc()}")
+        try:
+            on_complete(source)
+        except Exception:
+            logging.error(f"Unexpected error reporting {source}: {traceback.format_exc()}")
+
+    def url_error_reporter(source: str) -> Callable[[Exception], None]:
+        return lambda exc: handler.url_error(source, exc)
+
+    def goss_error_reporter(source: str, cmd_list: List[str]) -> Callable[[Exception], None]:
+        return lambda exc: handler.goss_output(source, cmd_list, None, b"", fmt_exc(exc).encode())
+
+    tasks = [ run_source(source, url_error_reporter(source), fetch_url_source, handler) for source in url_sources ]
+    for source in goss_sources:
+        cmd_list = goss_cmd(source)
+        tasks.append(run_source(source, goss_error_reporter(source, cmd_list), run_goss_source, cmd_list, handler))
+    await asyncio.gather(*tasks)
+
+def run_sources(url_sources: Iterable[str], goss_sources: Iterable[str], handler,
+                goss_cmd: Callable[[str], List[str]], max_in_flight: int,
+                on_complete: Callable[[str], None], connect_timeout: float = 0,
+                read_timeout: float = 0, deadline: Deadline = None,
+                retry_policy: RetryPolicy = None) -> None:
+    """
+    Runs all of the sources on a new event loop, with no more than max_in_flight of them
+    in progress at a time. goss_cmd returns the command to run for a local Goss source.
+    on_complete(source) is called (from this thread) as soon as each source is finished with
+    the handler.
+
+    Each source is given connect_timeout seconds to connect (URL sources only) and read_timeout
+    seconds to finish, but never past the deadline, so all sources are finished or cancelled by
+    the time the deadline is reached. A timeout of 0 means no timeout.
+
+    Requests to URL sources which fail with connection errors, or with a status that means the
+    suite was not run (see is_retryable_status), are retried according to retry_policy, for as long
+    as the deadline allows.
+    """
+    if deadline is None:
+        deadline = Deadline(0)
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_retries=0, base_delay=0, max_delay=0)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(run_all_sources(url_sources=url_sources, goss_sources=goss_sources,
+                                                handler=handler, goss_cmd=goss_cmd,
+                                                max_in_flight=max_in_flight, on_complete=on_complete,
+                                                connect_timeout=connect_timeout,
+                                                read_timeout=read_timeout, deadline=deadline,
+                                                retry_policy=retry_policy))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
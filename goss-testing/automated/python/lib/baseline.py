@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to saving a compact snapshot (baseline) of the results of a run, and
+comparing the results of later runs against it.
+
+A baseline holds only the node, test title, result code, and execution time (in nanoseconds)
+of each test. It is loaded into a dict keyed by (node, title), so each result of the current run
+is compared with a single lookup.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import json
+import os
+
+from .common import atomic_write_json
+from .results import DurationSeconds, SourceResults
+
+# Bumped whenever the format or meaning of a saved baseline changes. Version 2 baselines hold the sum of
+# the execution times of the properties of each test (version 1 held the longest one), so version 1
+# baselines cannot be compared with and are rejected.
+BASELINE_VERSION = 2
+
+# Goss result codes
+RESULT_PASS = 0
+RESULT_SKIPPED = 2
+
+# (node, title)
+BaselineKey = Tuple[str, str]
+
+class BaselineException(Exception):
+    pass
+
+
+def is_passing(result: int) -> bool:
+    """
+    Skipped tests are not failures, so they count as passing here
+    """
+    return result in (RESULT_PASS, RESULT_SKIPPED)
+
+def merge_result(old: Tuple[int, int], new: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Goss records one result for each property of a test, all with the same title (and the same test
+    may also be run on a node from different sources). They are combined into one result, which fails
+    if any of them did not pass, and whose execution time is the sum of theirs (as in the results
+    history database, see lib/results_history.py).
+    """
+    old_result, old_duration = old
+    new_result, new_duration = new
+    result = old_result if not is_passing(old_result) or is_passing(new_result) else new_result
+    return result, old_duration + new_duration
+
+def index_results(source_results: Iterable[SourceResults]) -> Dict[BaselineKey, Tuple[int, int]]:
+    """
+    Returns a map from (node, title) to (result code, execution time in nanoseconds)
+    """
+    index = dict()
+    for results in source_results:
+        node_name = results.node_name
+        for entry in results.selected_results:
+            key = (node_name, entry.title)
+            value = (entry.result_raw, entry.duration_nanoseconds)
+            previous = index.get(key)
+            index[key] = value if previous is None else merge_result(previous, value)
+    return index
+
+
+class Baseline:
+    def __init__(self, timestamp: str, index: Dict[BaselineKey, Tuple[int, int]]):
+        self.timestamp = timestamp
+        self.index = index
+
+    @classmethod
+    def from_results(cls, timestamp: str, source_results: Iterable[SourceResults]):
+        return cls(timestamp, index_results(source_results))
+
+    @classmethod
+    def load(cls, path: str):
+        try:
+            with open(path, "rt") as infile:
+                data = json.load(infile)
+            if data.get("version") != BASELINE_VERSION:
+                raise BaselineException(f"Unsupported baseline version in {path}: {data.get('version')}")
+            index = { (node, title): (result, duration_ns)
+                      for node, title, result, duration_ns in data["results"] }
+            return cls(data["timestamp"], index)
+        except BaselineException:
+            raise
+        except Exception as e:
+            raise BaselineException(f"Unable to load baseline from {path}. {type(e).__name__}: {e}") from e
+
+    def save(self, path: str) -> None:
+        """
+        Writes the baseline to a temporary file, and then renames it, so that an existing
+        baseline is never left partially overwritten
+        """
+        data = { "version": BASELINE_VERSION,
+                 "timestamp": self.timestamp,
+                 "results": [ [node, title, result, duration_ns]
+                              for (node, title), (result, duration_ns) in sorted(self.index.items()) ] }
+        dir_name = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(dir_name, exist_ok=True)
+            atomic_write_json(path, data, separators=(",", ":"))
+        except Exception as e:
+            raise BaselineException(f"Unable to save baseline to {path}. {type(e).__name__}: {e}") from e
+
+
+class SlowerTest:
+    __slots__ = ("key", "baseline_duration", "duration", "ratio")
+
+    def __init__(self, key: BaselineKey, baseline_duration_ns: int, duration_ns: int):
+        self.key = key
+        self.baseline_duration = DurationSeconds(baseline_duration_ns)
+        self.duration = DurationSeconds(duration_ns)
+        self.ratio = duration_ns / max(1, baseline_duration_ns)
+
+
+class BaselineComparison:
+    """
+    The differences between the results of the current run and a baseline.
+    Each list is sorted by (node, title), except for the slower tests, which are sorted with the
+    largest slowdown first.
+    """
+
+    def __init__(self, baseline: Baseline, current: Baseline, slow_ratio: float, min_duration_ns: int):
+        self.newly_failing: List[BaselineKey] = list()
+        self.newly_passing: List[BaselineKey] = list()
+        self.missing: List[BaselineKey] = sorted(key for key in baseline.index if key not in current.index)
+        self.new: List[BaselineKey] = list()
+        self.slower: List[SlowerTest] = list()
+        for key in sorted(current.index):
+            result, duration_ns = current.index[key]
+            try:
+                baseline_result, baseline_duration_ns = baseline.index[key]
+            except KeyError:
+                self.new.append(key)
+                continue
+            if is_passing(baseline_result) and not is_passing(result):
+                self.newly_failing.append(key)
+            elif not is_passing(baseline_result) and is_passing(result):
+                self.newly_passing.append(key)
+            if duration_ns >= min_duration_ns and duration_ns >= slow_ratio * baseline_duration_ns:
+                self.slower.append(SlowerTest(key, baseline_duration_ns, duration_ns))
+        self.slower.sort(key=lambda slower_test: slower_test.ratio, reverse=True)
+
+    def summary_data(self) -> dict:
+        return { "Newly Failing": len(self.newly_failing),
+                 "Newly Passing": len(self.newly_passing),
+                 "Missing": len(self.missing),
+                 "New": len(self.new),
+                 "Slower": len(self.slower) }
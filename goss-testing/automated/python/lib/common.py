@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -27,10 +27,11 @@
 Helper functions for Goss Python automated scripts
 """
 
-from typing import Callable, List, Tuple
+from typing import Callable, List, Optional, Tuple
+
+from .output_sinks import write_line
 
 import argparse
-import colorama
 from datetime import datetime
 import json
 import logging
@@ -40,6 +41,7 @@ import re
 import socket
 import string
 import sys
+import tempfile
 import traceback
 
 # To help with function annotations
@@ -53,9 +55,99 @@ DEFAULT_LOG_LEVEL = "INFO"
 # This has no default value. If unset, we set the value as 0. In this case,
 # we leave it up to the Python default (5 * number of processors, currently).
 DEFAULT_GOSS_SCRIPT_MAX_THREADS = 0
+# For automated scripts with parallel execution, the engine used to run the sources in parallel.
+# "threads" uses a thread pool (sized by GOSS_SCRIPT_MAX_THREADS). "asyncio" runs all sources on a
+# single event loop, with at most GOSS_SCRIPT_MAX_IN_FLIGHT of them running at once.
+GOSS_SCRIPT_ENGINES = [ "threads", "asyncio" ]
+DEFAULT_GOSS_SCRIPT_ENGINE = "threads"
+DEFAULT_GOSS_SCRIPT_MAX_IN_FLIGHT = 128
+# How failed tests are displayed on the screen. With "grouped", each distinct failure is shown in full the
+# first time it is reported, and summarized with the list of nodes it failed on once every source is done.
+# With "per-node", every failure from every source is shown in full.
+GOSS_SCRIPT_FAILURE_VIEWS = [ "grouped", "per-node" ]
+DEFAULT_GOSS_SCRIPT_FAILURE_VIEW = "grouped"
+# Timeouts (in seconds) for automated scripts running Goss sources in parallel. The connect and read
+# timeouts apply to each source (for local Goss files, the read timeout limits how long Goss may run).
+# The deadline limits the entire run. A value of 0 means no timeout.
+DEFAULT_GOSS_SCRIPT_CONNECT_TIMEOUT = 10
+DEFAULT_GOSS_SCRIPT_READ_TIMEOUT = 1800
+DEFAULT_GOSS_SCRIPT_DEADLINE = 3600
+# Requests to Goss endpoints which fail with connection errors, a 502, or a 503 without results are retried,
+# up to GOSS_SCRIPT_MAX_RETRIES times, with randomized exponential backoff. The delay before each retry is
+# at most GOSS_SCRIPT_RETRY_BACKOFF * 2^n seconds (n = 0, 1, ...), capped at GOSS_SCRIPT_RETRY_MAX_BACKOFF.
+DEFAULT_GOSS_SCRIPT_MAX_RETRIES = 3
+DEFAULT_GOSS_SCRIPT_RETRY_BACKOFF = 2
+DEFAULT_GOSS_SCRIPT_RETRY_MAX_BACKOFF = 30
+# The results of every run are added to a SQLite database, in GOSS_LOG_BASE_DIR by default. Only the
+# most recent GOSS_SCRIPT_HISTORY_MAX_RUNS runs are kept, and older runs are also removed if the
+# database grows past GOSS_SCRIPT_HISTORY_MAX_MB megabytes. Setting GOSS_SCRIPT_HISTORY_DB to an
+# empty string disables this.
+GOSS_RESULTS_HISTORY_DB_NAME = "goss_results_history.db"
+# Compiled copy of the Goss server configuration file, so that it need not be parsed on every call
+# of the automated scripts. It is only used while the configuration file is unchanged. It is kept
+# in GOSS_LOG_BASE_DIR by default; setting GOSS_SCRIPT_ENDPOINTS_CACHE to an empty string disables it.
+GOSS_ENDPOINTS_CACHE_NAME = "goss_servers_config_cache.json"
+DEFAULT_GOSS_SCRIPT_HISTORY_MAX_RUNS = 200
+DEFAULT_GOSS_SCRIPT_HISTORY_MAX_MB = 64
+# The NCN list is found by querying all of its sources at once (basecamp, BSS and /etc/hosts, or on the
+# PIT node, the SLS input file and dnsmasq statics files), each with a timeout of
+# GOSS_SCRIPT_NCN_INVENTORY_TIMEOUT seconds (0 means no timeout). The list is cached for
+# GOSS_SCRIPT_NCN_INVENTORY_TTL seconds (0 disables the cache), in GOSS_LOG_BASE_DIR by default;
+# setting GOSS_SCRIPT_NCN_INVENTORY_CACHE to an empty string also disables it.
+NCN_INVENTORY_CACHE_NAME = "ncn_inventory_cache.json"
+DEFAULT_GOSS_SCRIPT_NCN_INVENTORY_TIMEOUT = 5
+DEFAULT_GOSS_SCRIPT_NCN_INVENTORY_TTL = 300
+# If GOSS_SCRIPT_BASELINE_COMPARE is set to a baseline file, the results of the run are compared with it.
+# Tests at least GOSS_SCRIPT_BASELINE_SLOW_RATIO times slower than in the baseline are reported, unless
+# they took less than GOSS_SCRIPT_BASELINE_MIN_SECONDS. If GOSS_SCRIPT_BASELINE_SAVE is set, the results
+# of the run are saved there as a new baseline (after any comparison, so both may name the same file).
+DEFAULT_GOSS_SCRIPT_BASELINE_SLOW_RATIO = 2.0
+DEFAULT_GOSS_SCRIPT_BASELINE_MIN_SECONDS = 1.0
+# Number of slowest tests listed in the performance report
+DEFAULT_GOSS_SCRIPT_PERF_REPORT_TOP = 10
+# Profilers which can be enabled (as a comma-separated list) for automated scripts. The profiler
+# output is written to the log directory of the run. Profiling is off by default.
+GOSS_SCRIPT_PROFILERS = [ "cprofile", "tracemalloc" ]
+# The Goss gateway serves all of the Goss endpoints for a node from one process. At most
+# GOSS_GATEWAY_MAX_CONCURRENT suites are run at once on the node (other requests wait for one of them
+# to finish), and each run is stopped after GOSS_GATEWAY_RUN_TIMEOUT seconds (0 means no timeout).
+DEFAULT_GOSS_GATEWAY_MAX_CONCURRENT = 4
+DEFAULT_GOSS_GATEWAY_RUN_TIMEOUT = 1800
+# The gateway caches the results of each suite for GOSS_GATEWAY_CACHE_TTL seconds (like "goss serve", which
+# caches them for 5 seconds by default), and may serve them for up to GOSS_GATEWAY_MAX_STALE seconds after
+# that while they are refreshed. Both can be set per suite in the Goss server configuration file.
+DEFAULT_GOSS_GATEWAY_CACHE_TTL = 5
+DEFAULT_GOSS_GATEWAY_MAX_STALE = 0
+# If GOSS_GATEWAY_PRERUN_INTERVAL is set, the gateway runs each suite in the background about that often
+# (in seconds, 0 means never), so that requests can be answered from the cache. Suites with the prerun-interval
+# option in the Goss server configuration file use that instead, so the suites whose results must be current
+# (such as the healthchecks) opt out with prerun-interval=0. Background runs are put off while the 1-minute
+# load average per CPU is over GOSS_GATEWAY_PRERUN_MAX_LOAD, or the CPU pressure (the percentage of the last
+# 10 seconds in which some tasks were waiting for a CPU, from /proc/pressure/cpu) is over
+# GOSS_GATEWAY_PRERUN_MAX_CPU_PRESSURE.
+DEFAULT_GOSS_GATEWAY_PRERUN_INTERVAL = 0
+DEFAULT_GOSS_GATEWAY_PRERUN_MAX_LOAD = 1.0
+DEFAULT_GOSS_GATEWAY_PRERUN_MAX_CPU_PRESSURE = 25.0
+# The latest results of each suite run by the gateway are saved in this directory, in GOSS_LOG_BASE_DIR by
+# default, and loaded when it starts. Setting GOSS_GATEWAY_RESULTS_DIR to an empty string disables this.
+GOSS_GATEWAY_RESULTS_DIR_NAME = "goss_gateway_results"
+# Each run of the automated scripts writes its timings (by phase) to this file, in GOSS_LOG_BASE_DIR by
+# default, for the /metrics endpoint of the gateway. Setting GOSS_SCRIPT_METRICS_FILE to an empty string
+# disables this. The results are also written to a log for grok-exporter, unless GOSS_SCRIPT_GROK_EXPORTER_LOG
+# is set to false (for systems which scrape the /metrics endpoint of the gateway instead).
+GOSS_SCRIPT_METRICS_FILE_NAME = "goss_aggregator_metrics.json"
+DEFAULT_GOSS_SCRIPT_GROK_EXPORTER_LOG = True
+TRUE_STRINGS = [ "1", "true", "yes", "on" ]
+FALSE_STRINGS = [ "0", "false", "no", "off" ]
 DEFAULT_GOSS_INSTALL_BASE_DIR = "/opt/cray/tests/install"
 PIT_NODE_RELEASE_FILE = "/etc/pit-release"
 
+GOSS_BINARY = "/usr/bin/goss"
+# Passed to each "goss validate" run by the Goss gateway and by dst_ct_results.py, as "goss serve" was
+# given it when each endpoint had its own server, so that running several suites at once does not also
+# run every test of each suite at once
+GOSS_MAX_CONCURRENT_TESTS = 4
+
 def goss_base_dirs(validate: bool = False) -> Tuple[str, str]:
     """
     Returns GOSS_INSTALL_BASE_DIR, GOSS_BASE
@@ -117,6 +209,203 @@ def goss_script_max_threads() -> int:
         max_threads = 0
     return max_threads
 
+def env_nonnegative_int(var_name: str, default: int) -> int:
+    """
+    Returns the value of the specified environment variable as a nonnegative integer.
+    If it is unset or invalid, the default value is returned.
+    """
+    value_str = os.environ.get(var_name, default)
+    try:
+        value = int(value_str)
+    except ValueError:
+        logging.warning(f"Non-integer value specified for {var_name} ({value_str}). Defaulting to {default}")
+        return default
+    if value < 0:
+        logging.warning(f"{var_name} must be a nonnegative integer. Invalid value ({value}). Defaulting to {default}.")
+        return default
+    return value
+
+def env_nonnegative_float(var_name: str, default: float) -> float:
+    """
+    Returns the value of the specified environment variable as a nonnegative number.
+    If it is unset or invalid, the default value is returned.
+    """
+    value_str = os.environ.get(var_name, default)
+    try:
+        value = float(value_str)
+    except ValueError:
+        logging.warning(f"Non-numeric value specified for {var_name} ({value_str}). Defaulting to {default}")
+        return default
+    if value < 0:
+        logging.warning(f"{var_name} must be a nonnegative number. Invalid value ({value}). Defaulting to {default}.")
+        return default
+    return value
+
+def goss_script_connect_timeout() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_CONNECT_TIMEOUT", DEFAULT_GOSS_SCRIPT_CONNECT_TIMEOUT)
+
+def goss_script_read_timeout() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_READ_TIMEOUT", DEFAULT_GOSS_SCRIPT_READ_TIMEOUT)
+
+def goss_script_deadline() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_DEADLINE", DEFAULT_GOSS_SCRIPT_DEADLINE)
+
+def goss_script_max_retries() -> int:
+    return env_nonnegative_int("GOSS_SCRIPT_MAX_RETRIES", DEFAULT_GOSS_SCRIPT_MAX_RETRIES)
+
+def goss_script_retry_backoff() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_RETRY_BACKOFF", DEFAULT_GOSS_SCRIPT_RETRY_BACKOFF)
+
+def goss_script_retry_max_backoff() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_RETRY_MAX_BACKOFF", DEFAULT_GOSS_SCRIPT_RETRY_MAX_BACKOFF)
+
+def goss_script_engine() -> str:
+    engine = os.environ.get("GOSS_SCRIPT_ENGINE", DEFAULT_GOSS_SCRIPT_ENGINE).lower()
+    if engine not in GOSS_SCRIPT_ENGINES:
+        logging.warning(f"Invalid value specified for GOSS_SCRIPT_ENGINE ({engine}). Must be one of: "
+                        f"{', '.join(GOSS_SCRIPT_ENGINES)}. Defaulting to {DEFAULT_GOSS_SCRIPT_ENGINE}")
+        return DEFAULT_GOSS_SCRIPT_ENGINE
+    return engine
+
+def goss_script_failure_view() -> str:
+    failure_view = os.environ.get("GOSS_SCRIPT_FAILURE_VIEW", DEFAULT_GOSS_SCRIPT_FAILURE_VIEW).lower()
+    if failure_view not in GOSS_SCRIPT_FAILURE_VIEWS:
+        logging.warning(f"Invalid value specified for GOSS_SCRIPT_FAILURE_VIEW ({failure_view}). Must be one of: "
+                        f"{', '.join(GOSS_SCRIPT_FAILURE_VIEWS)}. Defaulting to {DEFAULT_GOSS_SCRIPT_FAILURE_VIEW}")
+        return DEFAULT_GOSS_SCRIPT_FAILURE_VIEW
+    return failure_view
+
+def goss_script_endpoints_cache() -> str:
+    """
+    Returns an empty string if the compiled Goss server configuration cache is disabled
+    """
+    return os.environ.get("GOSS_SCRIPT_ENDPOINTS_CACHE", f"{goss_log_base_dir()}/{GOSS_ENDPOINTS_CACHE_NAME}")
+
+def goss_gateway_cache_ttl() -> int:
+    return env_nonnegative_int("GOSS_GATEWAY_CACHE_TTL", DEFAULT_GOSS_GATEWAY_CACHE_TTL)
+
+def goss_gateway_max_stale() -> int:
+    return env_nonnegative_int("GOSS_GATEWAY_MAX_STALE", DEFAULT_GOSS_GATEWAY_MAX_STALE)
+
+def goss_gateway_max_concurrent() -> int:
+    max_concurrent = env_nonnegative_int("GOSS_GATEWAY_MAX_CONCURRENT", DEFAULT_GOSS_GATEWAY_MAX_CONCURRENT)
+    if max_concurrent == 0:
+        logging.warning(f"GOSS_GATEWAY_MAX_CONCURRENT may not be 0. Defaulting to {DEFAULT_GOSS_GATEWAY_MAX_CONCURRENT}.")
+        return DEFAULT_GOSS_GATEWAY_MAX_CONCURRENT
+    return max_concurrent
+
+def goss_gateway_run_timeout() -> float:
+    return env_nonnegative_float("GOSS_GATEWAY_RUN_TIMEOUT", DEFAULT_GOSS_GATEWAY_RUN_TIMEOUT)
+
+def goss_gateway_prerun_interval() -> int:
+    return env_nonnegative_int("GOSS_GATEWAY_PRERUN_INTERVAL", DEFAULT_GOSS_GATEWAY_PRERUN_INTERVAL)
+
+def goss_gateway_prerun_max_load() -> float:
+    return env_nonnegative_float("GOSS_GATEWAY_PRERUN_MAX_LOAD", DEFAULT_GOSS_GATEWAY_PRERUN_MAX_LOAD)
+
+def goss_gateway_prerun_max_cpu_pressure() -> float:
+    return env_nonnegative_float("GOSS_GATEWAY_PRERUN_MAX_CPU_PRESSURE", DEFAULT_GOSS_GATEWAY_PRERUN_MAX_CPU_PRESSURE)
+
+def goss_gateway_results_dir() -> str:
+    """
+    Returns an empty string if saving the gateway results is disabled
+    """
+    return os.environ.get("GOSS_GATEWAY_RESULTS_DIR", f"{goss_log_base_dir()}/{GOSS_GATEWAY_RESULTS_DIR_NAME}")
+
+def goss_script_metrics_file() -> str:
+    """
+    Returns an empty string if writing the run metrics file is disabled
+    """
+    return os.environ.get("GOSS_SCRIPT_METRICS_FILE", f"{goss_log_base_dir()}/{GOSS_SCRIPT_METRICS_FILE_NAME}")
+
+def goss_script_grok_exporter_log() -> bool:
+    value = os.environ.get("GOSS_SCRIPT_GROK_EXPORTER_LOG", "").strip().lower()
+    if not value:
+        return DEFAULT_GOSS_SCRIPT_GROK_EXPORTER_LOG
+    if value in TRUE_STRINGS:
+        return True
+    if value in FALSE_STRINGS:
+        return False
+    logging.warning(f"Invalid value specified for GOSS_SCRIPT_GROK_EXPORTER_LOG ({value}). Must be one of: "
+                    f"{', '.join(TRUE_STRINGS + FALSE_STRINGS)}. Defaulting to {DEFAULT_GOSS_SCRIPT_GROK_EXPORTER_LOG}")
+    return DEFAULT_GOSS_SCRIPT_GROK_EXPORTER_LOG
+
+def goss_script_ncn_inventory_cache() -> str:
+    """
+    Returns an empty string if the NCN inventory cache is disabled
+    """
+    return os.environ.get("GOSS_SCRIPT_NCN_INVENTORY_CACHE", f"{goss_log_base_dir()}/{NCN_INVENTORY_CACHE_NAME}")
+
+def goss_script_ncn_inventory_timeout() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_NCN_INVENTORY_TIMEOUT", DEFAULT_GOSS_SCRIPT_NCN_INVENTORY_TIMEOUT)
+
+def goss_script_ncn_inventory_ttl() -> int:
+    return env_nonnegative_int("GOSS_SCRIPT_NCN_INVENTORY_TTL", DEFAULT_GOSS_SCRIPT_NCN_INVENTORY_TTL)
+
+def goss_script_history_db() -> str:
+    """
+    Returns an empty string if the results history database is disabled
+    """
+    return os.environ.get("GOSS_SCRIPT_HISTORY_DB", f"{goss_log_base_dir()}/{GOSS_RESULTS_HISTORY_DB_NAME}")
+
+def goss_script_history_max_runs() -> int:
+    max_runs = env_nonnegative_int("GOSS_SCRIPT_HISTORY_MAX_RUNS", DEFAULT_GOSS_SCRIPT_HISTORY_MAX_RUNS)
+    if max_runs == 0:
+        logging.warning(f"GOSS_SCRIPT_HISTORY_MAX_RUNS may not be 0. Defaulting to {DEFAULT_GOSS_SCRIPT_HISTORY_MAX_RUNS}.")
+        return DEFAULT_GOSS_SCRIPT_HISTORY_MAX_RUNS
+    return max_runs
+
+def goss_script_history_max_mb() -> int:
+    max_mb = env_nonnegative_int("GOSS_SCRIPT_HISTORY_MAX_MB", DEFAULT_GOSS_SCRIPT_HISTORY_MAX_MB)
+    if max_mb == 0:
+        logging.warning(f"GOSS_SCRIPT_HISTORY_MAX_MB may not be 0. Defaulting to {DEFAULT_GOSS_SCRIPT_HISTORY_MAX_MB}.")
+        return DEFAULT_GOSS_SCRIPT_HISTORY_MAX_MB
+    return max_mb
+
+def goss_script_baseline_compare() -> str:
+    return os.environ.get("GOSS_SCRIPT_BASELINE_COMPARE", "")
+
+def goss_script_baseline_save() -> str:
+    return os.environ.get("GOSS_SCRIPT_BASELINE_SAVE", "")
+
+def goss_script_baseline_slow_ratio() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_BASELINE_SLOW_RATIO", DEFAULT_GOSS_SCRIPT_BASELINE_SLOW_RATIO)
+
+def goss_script_baseline_min_seconds() -> float:
+    return env_nonnegative_float("GOSS_SCRIPT_BASELINE_MIN_SECONDS", DEFAULT_GOSS_SCRIPT_BASELINE_MIN_SECONDS)
+
+def goss_script_perf_report_json() -> str:
+    return os.environ.get("GOSS_SCRIPT_PERF_REPORT_JSON", "")
+
+def goss_script_perf_report_top() -> int:
+    return env_nonnegative_int("GOSS_SCRIPT_PERF_REPORT_TOP", DEFAULT_GOSS_SCRIPT_PERF_REPORT_TOP)
+
+def goss_script_profile() -> List[str]:
+    """
+    Returns the list of profilers to enable ("all" enables every one of them)
+    """
+    value = os.environ.get("GOSS_SCRIPT_PROFILE", "").lower()
+    profilers = list()
+    for name in ( name.strip() for name in value.split(",") ):
+        if not name:
+            continue
+        if name == "all":
+            return list(GOSS_SCRIPT_PROFILERS)
+        if name not in GOSS_SCRIPT_PROFILERS:
+            logging.warning(f"Invalid value specified in GOSS_SCRIPT_PROFILE ({name}). Must be one of: "
+                            f"all, {', '.join(GOSS_SCRIPT_PROFILERS)}. Ignoring it")
+            continue
+        if name not in profilers:
+            profilers.append(name)
+    return profilers
+
+def goss_script_max_in_flight() -> int:
+    max_in_flight = env_nonnegative_int("GOSS_SCRIPT_MAX_IN_FLIGHT", DEFAULT_GOSS_SCRIPT_MAX_IN_FLIGHT)
+    if max_in_flight == 0:
+        logging.warning(f"GOSS_SCRIPT_MAX_IN_FLIGHT may not be 0. Defaulting to {DEFAULT_GOSS_SCRIPT_MAX_IN_FLIGHT}.")
+        return DEFAULT_GOSS_SCRIPT_MAX_IN_FLIGHT
+    return max_in_flight
+
 def goss_servers_config(validate: bool = False) -> str:
     gibd = goss_install_base_dir()
     config_file = os.environ.get("GOSS_SERVERS_CONFIG", f"{gibd}/dat/goss-servers.cfg")
@@ -131,25 +420,26 @@ def goss_log_base_dir(validate: bool = False) -> str:
         raise ScriptException(f"GOSS_LOG_BASE_DIR directory does not exist or is not a directory: {log_dir}")
     return log_dir
 
-ERR_TEXT_CODE = colorama.Fore.LIGHTRED_EX
-WARN_TEXT_CODE = colorama.Fore.LIGHTYELLOW_EX
-OK_TEXT_CODE = colorama.Fore.LIGHTGREEN_EX
-RESET_TEXT_CODE = colorama.Style.RESET_ALL
-
 class ScriptException(Exception):
     pass
 
 class ScriptUsageException(ScriptException):
     pass
 
+# colorama is only imported when text is first colored, so that it does not slow down the startup of
+# every script
+def colored_text(s: str, color: str) -> str:
+    import colorama
+    return f"{getattr(colorama.Fore, color)}{s}{colorama.Style.RESET_ALL}"
+
 def err_text(s: str) ->str:
-    return f"{ERR_TEXT_CODE}{s}{RESET_TEXT_CODE}"
+    return colored_text(s, "LIGHTRED_EX")
 
 def warn_text(s: str) -> str:
-    return f"{WARN_TEXT_CODE}{s}{RESET_TEXT_CODE}"
+    return colored_text(s, "LIGHTYELLOW_EX")
 
 def ok_text(s: str) -> str:
-    return f"{OK_TEXT_CODE}{s}{RESET_TEXT_CODE}"
+    return colored_text(s, "LIGHTGREEN_EX")
 
 def is_pit_node() -> bool:
     return os.path.isfile(PIT_NODE_RELEASE_FILE)
@@ -160,10 +450,43 @@ def goss_suites_dir() -> str:
 def goss_env_variables() -> dict:
     return {
         "GOSS_BASE": goss_base(),
+        "GOSS_GATEWAY_CACHE_TTL": goss_gateway_cache_ttl(),
+        "GOSS_GATEWAY_MAX_CONCURRENT": goss_gateway_max_concurrent(),
+        "GOSS_GATEWAY_MAX_STALE": goss_gateway_max_stale(),
+        "GOSS_GATEWAY_PRERUN_INTERVAL": goss_gateway_prerun_interval(),
+        "GOSS_GATEWAY_PRERUN_MAX_CPU_PRESSURE": goss_gateway_prerun_max_cpu_pressure(),
+        "GOSS_GATEWAY_PRERUN_MAX_LOAD": goss_gateway_prerun_max_load(),
+        "GOSS_GATEWAY_RESULTS_DIR": goss_gateway_results_dir(),
+        "GOSS_GATEWAY_RUN_TIMEOUT": goss_gateway_run_timeout(),
         "GOSS_INSTALL_BASE_DIR": goss_install_base_dir(),
         "GOSS_LOG_BASE_DIR": goss_log_base_dir(),
+        "GOSS_SCRIPT_BASELINE_COMPARE": goss_script_baseline_compare(),
+        "GOSS_SCRIPT_BASELINE_MIN_SECONDS": goss_script_baseline_min_seconds(),
+        "GOSS_SCRIPT_BASELINE_SAVE": goss_script_baseline_save(),
+        "GOSS_SCRIPT_BASELINE_SLOW_RATIO": goss_script_baseline_slow_ratio(),
+        "GOSS_SCRIPT_CONNECT_TIMEOUT": goss_script_connect_timeout(),
+        "GOSS_SCRIPT_DEADLINE": goss_script_deadline(),
+        "GOSS_SCRIPT_ENDPOINTS_CACHE": goss_script_endpoints_cache(),
+        "GOSS_SCRIPT_ENGINE": goss_script_engine(),
+        "GOSS_SCRIPT_FAILURE_VIEW": goss_script_failure_view(),
+        "GOSS_SCRIPT_GROK_EXPORTER_LOG": goss_script_grok_exporter_log(),
+        "GOSS_SCRIPT_HISTORY_DB": goss_script_history_db(),
+        "GOSS_SCRIPT_HISTORY_MAX_MB": goss_script_history_max_mb(),
+        "GOSS_SCRIPT_HISTORY_MAX_RUNS": goss_script_history_max_runs(),
         "GOSS_SCRIPT_LOG_LEVEL": goss_script_log_level(),
+        "GOSS_SCRIPT_MAX_IN_FLIGHT": goss_script_max_in_flight(),
+        "GOSS_SCRIPT_MAX_RETRIES": goss_script_max_retries(),
         "GOSS_SCRIPT_MAX_THREADS": goss_script_max_threads(),
+        "GOSS_SCRIPT_METRICS_FILE": goss_script_metrics_file(),
+        "GOSS_SCRIPT_NCN_INVENTORY_CACHE": goss_script_ncn_inventory_cache(),
+        "GOSS_SCRIPT_NCN_INVENTORY_TIMEOUT": goss_script_ncn_inventory_timeout(),
+        "GOSS_SCRIPT_NCN_INVENTORY_TTL": goss_script_ncn_inventory_ttl(),
+        "GOSS_SCRIPT_PERF_REPORT_JSON": goss_script_perf_report_json(),
+        "GOSS_SCRIPT_PERF_REPORT_TOP": goss_script_perf_report_top(),
+        "GOSS_SCRIPT_PROFILE": goss_script_profile(),
+        "GOSS_SCRIPT_READ_TIMEOUT": goss_script_read_timeout(),
+        "GOSS_SCRIPT_RETRY_BACKOFF": goss_script_retry_backoff(),
+        "GOSS_SCRIPT_RETRY_MAX_BACKOFF": goss_script_retry_max_backoff(),
         "GOSS_SERVERS_CONFIG": goss_servers_config()
     }
 
@@ -210,12 +533,11 @@ def log_goss_env_variables(logmethod: Callable) -> None:
     log_values(logmethod=logmethod, **goss_env_variables())
 
 def stderr_print(s: str) -> None:
-    sys.stderr.write(f"{s}\n")
-    sys.stderr.flush()
+    # Errors are always flushed to the terminal right away
+    write_line(sys.stderr, s, flush=True)
 
 def stdout_print(s: str) -> None:
-    sys.stdout.write(f"{s}\n")
-    sys.stdout.flush()
+    write_line(sys.stdout, s)
 
 def multi_print(s: str, *methods) -> None:
     for m in methods:
@@ -286,6 +608,24 @@ def argparse_yaml_file_name(s: str) -> str:
         return s
     raise argparse.ArgumentTypeError(f"YAML file names are expected to have .yaml extension. Invalid: {s}")
 
+def argparse_positive_int(s: str) -> int:
+    try:
+        value = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid integer: {s}")
+    if value > 0:
+        return value
+    raise argparse.ArgumentTypeError(f"Value must be positive: {s}")
+
+def argparse_nonnegative_float(s: str) -> float:
+    try:
+        value = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number: {s}")
+    if value >= 0:
+        return value
+    raise argparse.ArgumentTypeError(f"Value may not be negative: {s}")
+
 def argparse_valid_ncn_name(n: str) -> str:
     if is_ncn_name(n):
         return n
@@ -293,3 +633,22 @@ def argparse_valid_ncn_name(n: str) -> str:
 
 def fmt_exc(e: Exception) -> str:
     return f"{type(e).__name__}: {e}"
+
+def atomic_write_json(path: str, data, mode: Optional[int] = None, indent: Optional[int] = None,
+                      separators: Optional[Tuple[str, str]] = None) -> None:
+    """
+    Writes data as JSON to a temporary file in the same directory, and then renames it to path, so that
+    readers never see a partially written file. The file is only readable by its owner, unless mode is
+    given. The directory must exist. Raises the exception if the file cannot be written.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wt") as f:
+            json.dump(data, f, indent=indent, separators=separators)
+            f.write("\n")
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
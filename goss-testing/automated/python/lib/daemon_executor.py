@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to running the Goss test sources on a pool of worker threads which cannot
+keep the process running once the run is over.
+
+concurrent.futures.ThreadPoolExecutor joins its worker threads when the interpreter exits, even
+after shutdown(wait=False). So a source which does not honor the run deadline (a server trickling
+out its response, for example, since the read timeout applies to each read rather than to the
+whole response) would keep the script running after it had been given up on. The workers of
+DaemonThreadPoolExecutor are daemon threads instead, so they are simply abandoned at exit.
+"""
+
+from .http_sessions import default_max_workers
+
+import concurrent.futures
+import queue
+import threading
+
+class DaemonThreadPoolExecutor(concurrent.futures.Executor):
+    """
+    Runs the submitted calls on at most max_workers daemon threads (if max_workers is 0, the same
+    number that ThreadPoolExecutor would use). Threads are started as calls are submitted, until
+    there are max_workers of them.
+    """
+
+    def __init__(self, max_workers: int = 0, thread_name_prefix: str = "worker"):
+        self.max_workers = max_workers if max_workers > 0 else default_max_workers()
+        self.thread_name_prefix = thread_name_prefix
+        self.work_queue = queue.Queue()
+        self.threads = list()
+        self.shutdown_lock = threading.Lock()
+        self.is_shutdown = False
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        with self.shutdown_lock:
+            if self.is_shutdown:
+                raise RuntimeError("Cannot submit calls after shutdown")
+            future = concurrent.futures.Future()
+            self.work_queue.put((future, fn, args, kwargs))
+            if len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self.worker, name=f"{self.thread_name_prefix}_{len(self.threads)}",
+                                          daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return future
+
+    def worker(self) -> None:
+        while True:
+            item = self.work_queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Lets the workers exit once the calls already submitted are done (or cancelled). If wait is
+        false, any calls still running are left to finish (or not) on their own.
+        """
+        with self.shutdown_lock:
+            if self.is_shutdown:
+                return
+            self.is_shutdown = True
+            for _ in self.threads:
+                self.work_queue.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to producing results for the DST (ct-results) dashboard from the Goss suites
+which are served on this node.
+
+The suites are found from the Goss server configuration file (the same ones which goss-servers
+serves for the node type), and run with "goss validate", several at a time. As each suite finishes,
+its results are converted to DST test records, so the results of every suite are merged in one
+pass, in memory, and the DST results file is only written once, at the end.
+"""
+
+from .common import atomic_write_json,          \
+                    fmt_exc,                    \
+                    GOSS_BINARY,                \
+                    GOSS_MAX_CONCURRENT_TESTS,  \
+                    ScriptException,            \
+                    StringList
+from .endpoints import GossEndpointRegistry
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import json
+import logging
+import os
+import re
+import subprocess
+import time
+
+# Where the CSM version is found (the keys of the csm entry are the installed CSM versions)
+PRODUCT_CATALOG_CMD = [ "kubectl", "-n", "services", "get", "cm", "cray-product-catalog",
+                        "-o", "jsonpath={.data.csm}" ]
+PRODUCT_CATALOG_TIMEOUT = 60
+
+# Unindented YAML mapping keys (optionally quoted), which are the versions in the product catalog entry
+CATALOG_VERSION_RE = re.compile(r"""^(['"]?)([^\s'":#][^'":]*)\1:(\s|$)""")
+
+class SuiteResults:
+    """
+    The DST test records for the results of one suite, how many of the tests failed, and how long
+    the suite took to run. If the suite produced no results, error says why.
+    """
+    __slots__ = ("suite", "tests", "failed_count", "seconds", "error")
+
+    def __init__(self, suite: str, tests: List[dict], failed_count: int, seconds: float, error: str = ""):
+        self.suite = suite
+        self.tests = tests
+        self.failed_count = failed_count
+        self.seconds = seconds
+        self.error = error
+
+def version_sort_key(version: str) -> Tuple[Tuple[int, int, str], ...]:
+    """
+    Sorts versions like "sort -V", except that a release sorts after its pre-releases (1.6.0 after 1.6.0-rc.1)
+    """
+    if "-" not in version:
+        version += "_"
+    return tuple( (0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.findall(r"\d+|\D+", version) )
+
+def latest_csm_version() -> str:
+    """
+    Returns the latest CSM version in the product catalog
+    """
+    try:
+        proc = subprocess.run(PRODUCT_CATALOG_CMD, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True, timeout=PRODUCT_CATALOG_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise ScriptException(f"Unable to read the CSM version from the product catalog: {fmt_exc(e)}")
+    if proc.returncode != 0:
+        raise ScriptException(f"Unable to read the CSM version from the product catalog: {proc.stderr.strip()}")
+    versions = [ match.group(2).strip() for match in map(CATALOG_VERSION_RE.match, proc.stdout.splitlines())
+                 if match is not None ]
+    if not versions:
+        raise ScriptException("No CSM versions found in the product catalog")
+    return max(versions, key=version_sort_key)
+
+def suite_files(registry: GossEndpointRegistry, node_type: str, suite_dir: str) -> StringList:
+    """
+    Returns the suite files which are served for the node type, in the order of the configuration file.
+    Suites whose files are missing or empty are skipped (as they are by goss-servers).
+    """
+    files = list()
+    for suite, endpoint_name, port in registry.endpoints_by_type[node_type]:
+        suite_file = f"{suite_dir}/{suite}"
+        if not os.path.isfile(suite_file) or os.path.getsize(suite_file) == 0:
+            logging.warning(f"Skipping suite because its file is empty or does not exist: {suite_file}")
+            continue
+        if suite_file not in files:
+            files.append(suite_file)
+    return files
+
+def dst_test(result: dict, csm_version: str) -> dict:
+    """
+    Returns the DST test record for one Goss test result
+    """
+    successful = bool(result.get("successful"))
+    return { "product_name": "CSM",
+             "product_version": csm_version,
+             "release_name": "",
+             "release_version": "",
+             "output": "omitted" if successful else result.get("stderr"),
+             "status": "pass" if successful else "fail",
+             "label": result.get("resource-id"),
+             "test_name": result.get("title") }
+
+def goss_validate_cmd(suite_file: str, vars_file: str) -> StringList:
+    cmd = [ GOSS_BINARY, "-g", suite_file ]
+    if vars_file:
+        cmd.extend([ "--vars", vars_file ])
+    return cmd + [ "validate", "--format", "json", "--max-concurrent", str(GOSS_MAX_CONCURRENT_TESTS) ]
+
+def run_suite(suite_file: str, vars_file: str, csm_version: str, timeout: Optional[float]) -> SuiteResults:
+    """
+    Runs the suite and converts its results to DST test records. Goss exits non-0 when tests fail,
+    so the results are used whenever there are any; otherwise the error is recorded.
+    """
+    suite = os.path.basename(suite_file)
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(goss_validate_cmd(suite_file, vars_file), stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return SuiteResults(suite, list(), 0, time.monotonic() - started,
+                            f"Goss did not finish within {timeout} seconds")
+    except OSError as e:
+        return SuiteResults(suite, list(), 0, time.monotonic() - started, f"Unable to run Goss: {fmt_exc(e)}")
+    seconds = time.monotonic() - started
+    try:
+        results = json.loads(proc.stdout)["results"]
+        tests = [ dst_test(result, csm_version) for result in results ]
+    except Exception as e:
+        stderr = proc.stderr.decode(errors="replace").strip()
+        return SuiteResults(suite, list(), 0, seconds,
+                            f"No results (Goss return code {proc.returncode}): {stderr or fmt_exc(e)}")
+    return SuiteResults(suite, tests, sum(1 for test in tests if test["status"] == "fail"), seconds)
+
+def run_suites(suite_files: StringList, vars_file: str, csm_version: str, max_workers: int, timeout: float,
+               on_complete: Callable[[SuiteResults], None]) -> List[SuiteResults]:
+    """
+    Runs the suites in parallel, with at most max_workers at once (0 means the thread pool default),
+    calling on_complete with the results of each one as it finishes. Returns the results of every
+    suite, in the order of suite_files. A timeout of 0 means no timeout.
+    """
+    import concurrent.futures
+    exec_args = { "max_workers": max_workers } if max_workers > 0 else dict()
+    suite_results: Dict[int, SuiteResults] = dict()
+    with concurrent.futures.ThreadPoolExecutor(**exec_args) as executor:
+        futures = { executor.submit(run_suite, suite_file, vars_file, csm_version, timeout or None): index
+                    for index, suite_file in enumerate(suite_files) }
+        for future in concurrent.futures.as_completed(futures):
+            results = future.result()
+            suite_results[futures[future]] = results
+            on_complete(results)
+    return [ suite_results[index] for index in range(len(suite_files)) ]
+
+def write_dst_results(path: str, suite_results: List[SuiteResults]) -> int:
+    """
+    Writes the DST results file (atomically), and returns the number of tests in it
+    """
+    tests = [ test for results in suite_results for test in results.tests ]
+    data = { "run_id": "", "tests": tests, "triage": dict() }
+    try:
+        atomic_write_json(path, data, mode=0o644, indent=2)
+    except OSError as e:
+        raise ScriptException(f"Unable to write DST results file {path}: {fmt_exc(e)}")
+    return len(tests)
@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -27,21 +27,35 @@
 Helper functions for Goss Python automated scripts
 
 These functions relate to the Goss server endpoints.
+
+The Goss server configuration file is loaded into a GossEndpointRegistry, which indexes the
+endpoints by (NCN type, suite) and by (NCN type, port). The parsed configuration is also saved to a
+cache file (see GOSS_SCRIPT_ENDPOINTS_CACHE), which is used instead of parsing the configuration
+file again for as long as the configuration file is unchanged.
 """
 
 from .common import argparse_yaml_file_name,     \
+                    atomic_write_json,           \
+                    fmt_exc,                     \
+                    get_ncn_type,                \
+                    goss_script_endpoints_cache, \
                     goss_servers_config,         \
                     NCN_TYPES,                   \
                     ScriptException,             \
                     StringList
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import argparse
+import json
+import logging
+import os
 import re
+import urllib.parse
 
 # To help with function annotations
 EndpointTuple = Tuple[str, str, int]
+EndpointOptions = Dict[str, int]
 
 # We assume our Goss server ports will be between 1000 and 65535 (the maximum TCP port number)
 
@@ -61,11 +75,22 @@ port_patterns = [
 port_pattern = "^(" + "|".join(port_patterns) + ")$"
 port_re_prog = re.compile(port_pattern)
 
-goss_endpoints_by_ncn_type = None
+# Bumped whenever the format of the cache file changes
+ENDPOINTS_CACHE_VERSION = 2
+
+# Optional settings which may follow the NCN types on a line of the configuration file, as <name>=<value>.
+# Each one is a number of seconds, and is only used by the Goss gateway (see lib/gateway_cache.py and
+# lib/gateway_prerun.py).
+# cache-ttl       How long the results of the suite are served from the cache
+# max-stale       How long after that the cached results may still be served, while they are refreshed
+# prerun-interval How often the suite is run in the background (0 means never)
+ENDPOINT_OPTIONS = [ "cache-ttl", "max-stale", "prerun-interval" ]
 
-def parse_config_file_line(line: str) -> Tuple[int, str, StringList]:
+goss_endpoint_registry = None
+
+def parse_config_file_line(line: str) -> Tuple[int, str, StringList, EndpointOptions]:
     """
-    Returns port, suite file, and list of NCN types
+    Returns port, suite file, list of NCN types, and endpoint options
     Raises ScriptException in case of error
     """
     fields = line.split()
@@ -73,6 +98,7 @@ def parse_config_file_line(line: str) -> Tuple[int, str, StringList]:
     # 1. Port number
     # 2. YAML suite file
     # 3. List of NCN types
+    # 4. Optionally, endpoint options (<name>=<value>)
 
     if len(fields) < 3:
         raise ScriptException(f"Line must have at least three fields.")
@@ -87,12 +113,188 @@ def parse_config_file_line(line: str) -> Tuple[int, str, StringList]:
     except argparse.ArgumentTypeError as e:
         raise ScriptException(f"{e}. Invalid YAML suite file name.")
 
-    type_list = fields[2:]
-    if not all(t in NCN_TYPES for t in type_list):
+    option_fields = [ field for field in fields[2:] if "=" in field ]
+    type_list = fields[2:len(fields) - len(option_fields)]
+    if any("=" in field for field in type_list) or any("=" not in field for field in option_fields):
+        raise ScriptException(f"NCN types must come before options.")
+    elif not type_list:
+        raise ScriptException(f"Line must have at least one NCN type.")
+    elif not all(t in NCN_TYPES for t in type_list):
         raise ScriptException(f"Line includes invalid NCN type.")
     elif len(type_list) != len(set(type_list)):
         raise ScriptException(f"Line includes duplicate NCN types.")
-    return port, suite, type_list
+
+    options = dict()
+    for field in option_fields:
+        name, _, value = field.partition("=")
+        if name not in ENDPOINT_OPTIONS:
+            raise ScriptException(f"Line includes invalid option {name} (valid options: {', '.join(ENDPOINT_OPTIONS)}).")
+        elif name in options:
+            raise ScriptException(f"Line includes duplicate option {name}.")
+        elif not value.isdigit():
+            raise ScriptException(f"Option {name} must be a nonnegative integer number of seconds.")
+        options[name] = int(value)
+    return port, suite, type_list, options
+
+class GossEndpointRegistry:
+    """
+    The Goss server endpoints for each NCN type, from the Goss server configuration file
+    """
+
+    def __init__(self, config_file: str):
+        self.config_file = config_file
+        # For each NCN type, its endpoints, in the order that they appear in the configuration file
+        self.endpoints_by_type: Dict[str, List[EndpointTuple]] = { ntype: list() for ntype in NCN_TYPES }
+        # Maps (NCN type, suite) to (port, endpoint name)
+        self.by_type_suite: Dict[Tuple[str, str], Tuple[int, str]] = dict()
+        # Maps (NCN type, port) to (suite, endpoint name)
+        self.by_type_port: Dict[Tuple[str, int], Tuple[str, str]] = dict()
+        # Maps (NCN type, suite) to its endpoint options, if it has any
+        self.options_by_type_suite: Dict[Tuple[str, str], EndpointOptions] = dict()
+
+    def add(self, ntype: str, suite: str, port: int, options: Optional[EndpointOptions] = None) -> None:
+        """
+        Raises ScriptException if the NCN type already has an endpoint for the suite or the port
+        """
+        if (ntype, suite) in self.by_type_suite:
+            raise ScriptException(f"Multiple lines for suite {suite} on NCN type {ntype}.")
+        if (ntype, port) in self.by_type_port:
+            raise ScriptException(f"Multiple lines for port {port} on NCN type {ntype}.")
+        # Endpoint name is the suite name, minus the .yaml extension
+        endpoint_name = suite[:-5]
+        self.endpoints_by_type[ntype].append( (suite, endpoint_name, port) )
+        self.by_type_suite[(ntype, suite)] = port, endpoint_name
+        self.by_type_port[(ntype, port)] = suite, endpoint_name
+        if options:
+            self.options_by_type_suite[(ntype, suite)] = dict(options)
+
+    def __len__(self) -> int:
+        return len(self.by_type_suite)
+
+    @classmethod
+    def parse(cls, config_file: str) -> "GossEndpointRegistry":
+        """
+        Reads and validates the configuration file
+        Raises ScriptException in case of error
+        """
+        registry = cls(config_file)
+        with open(config_file, "rt") as f:
+            for line in f.readlines():
+                line = line.strip()
+                if len(line) == 0 or line[0] == "#":
+                    continue
+                try:
+                    port, suite, type_list, options = parse_config_file_line(line)
+                    for ntype in type_list:
+                        registry.add(ntype, suite, port, options)
+                except ScriptException as e:
+                    raise ScriptException(f"Configuration file ({config_file}) error: {e} Invalid line: {line}")
+        if len(registry) == 0:
+            raise ScriptException(f"Server configuration ({config_file}) error: No endpoints specified")
+        return registry
+
+    def lookup(self, ntype: str, suite: str) -> Tuple[int, str]:
+        """
+        Returns the port and endpoint name for the suite on NCNs of the specified type
+        Raises ScriptException if there is none
+        """
+        try:
+            return self.by_type_suite[(ntype, suite)]
+        except KeyError:
+            raise ScriptException(f"No port/endpoint found for suite {suite} for NCN {ntype} nodes")
+
+    def options(self, ntype: str, suite: str) -> EndpointOptions:
+        """
+        Returns the endpoint options for the suite on NCNs of the specified type (empty if it has none)
+        """
+        return self.options_by_type_suite.get((ntype, suite), dict())
+
+    def suite_for_port(self, ntype: str, port: int) -> Optional[Tuple[str, str]]:
+        """
+        Returns the suite and endpoint name on the port for NCNs of the specified type, or None if there is none
+        """
+        return self.by_type_port.get((ntype, port))
+
+    def suite_for_url(self, url: str) -> Optional[str]:
+        """
+        Returns the suite for a Goss endpoint URL (as returned by goss_endpoint_url), or None if it
+        is not the URL of a configured endpoint
+        """
+        try:
+            parsed = urllib.parse.urlsplit(url)
+            port = parsed.port
+            ntype = get_ncn_type(parsed.hostname.split(".")[0])
+        except (AttributeError, ValueError, ScriptException):
+            return None
+        match = self.suite_for_port(ntype, port)
+        if match is None or parsed.path.strip("/") != match[1]:
+            return None
+        return match[0]
+
+    def cache_key(self) -> dict:
+        stat = os.stat(self.config_file)
+        return { "version": ENDPOINTS_CACHE_VERSION, "config_file": os.path.abspath(self.config_file),
+                 "mtime_ns": stat.st_mtime_ns, "size": stat.st_size }
+
+    @classmethod
+    def load_cache(cls, config_file: str, cache_file: str) -> Optional["GossEndpointRegistry"]:
+        """
+        Returns the registry from the cache file, or None if the cache file does not exist, cannot be
+        read, or is not for the current version of the configuration file
+        """
+        registry = cls(config_file)
+        try:
+            with open(cache_file, "rt") as f:
+                cached = json.load(f)
+            if cached["key"] != registry.cache_key():
+                return None
+            for ntype, suite, port, options in cached["endpoints"]:
+                registry.add(ntype, suite, port, options)
+        except Exception as e:
+            logging.debug(f"Not using Goss endpoints cache {cache_file}: {fmt_exc(e)}")
+            return None
+        return registry
+
+    def save_cache(self, cache_file: str) -> None:
+        """
+        Writes the cache file atomically. Problems are logged, but not raised, since the cache is only
+        an optimization.
+        """
+        data = { "key": self.cache_key(),
+                 "endpoints": [ (ntype, suite, port, self.options(ntype, suite))
+                                for ntype, eplist in self.endpoints_by_type.items()
+                                for (suite, endpoint_name, port) in eplist ] }
+        try:
+            atomic_write_json(cache_file, data)
+        except Exception as e:
+            logging.debug(f"Unable to write Goss endpoints cache {cache_file}: {fmt_exc(e)}")
+
+    @classmethod
+    def load(cls, config_file: str, cache_file: str = "") -> "GossEndpointRegistry":
+        """
+        Uses the cache file, if it is for the current version of the configuration file. Otherwise parses
+        the configuration file, and updates the cache file. If cache_file is empty, no cache is used.
+        Raises ScriptException in case of error
+        """
+        if cache_file:
+            registry = cls.load_cache(config_file, cache_file)
+            if registry is not None:
+                return registry
+        registry = cls.parse(config_file)
+        if cache_file:
+            registry.save_cache(cache_file)
+        return registry
+
+def load_goss_endpoint_registry() -> GossEndpointRegistry:
+    """
+    Returns the GossEndpointRegistry for the Goss server configuration file. It is only loaded once per process.
+    Raises ScriptException in case of error
+    """
+    global goss_endpoint_registry
+    if goss_endpoint_registry is None:
+        goss_endpoint_registry = GossEndpointRegistry.load(goss_servers_config(validate=True),
+                                                           goss_script_endpoints_cache())
+    return goss_endpoint_registry
 
 def load_goss_endpoints() -> Dict[str, List[EndpointTuple]]:
     """
@@ -100,36 +302,10 @@ def load_goss_endpoints() -> Dict[str, List[EndpointTuple]]:
     port number to endpoint name + suite name.
     These mappings are returned.
     """
-    global goss_endpoints_by_ncn_type
-    if goss_endpoints_by_ncn_type != None:
-        return goss_endpoints_by_ncn_type
-    config_file = goss_servers_config(validate=True)
-    
-    endpoints_by_type = { ntype: list() for ntype in NCN_TYPES }
-    with open(config_file, "rt") as f:
-        for line in f.readlines():
-            line = line.strip()
-            if len(line) == 0 or line[0] == "#":
-                continue
-            try:
-                port, suite, type_list = parse_config_file_line(line)
-            except ScriptException as e:
-                raise ScriptException(f"Configuration file ({config_file}) error: {e}. Invalid line: {line}")
-            # Endpoint name is the suite name, minus the .yaml extension
-            endpoint_name = suite[:-5]
-
-            for ntype in type_list:
-                for (s, e, p) in endpoints_by_type[ntype]:
-                    if s == suite:
-                        raise ScriptException(f"Configuration file ({config_file}) error: Multiple lines for suite {s} on NCN type {ntype}. Invalid line: {line}")
-                    elif p == port:
-                        raise ScriptException(f"Configuration file ({config_file}) error: Multiple lines for port {p} on NCN type {ntype}. Invalid line: {line}")
-
-                # Add it to the list of endpoints for this NCN type
-                endpoints_by_type[ntype].append( (suite, endpoint_name, port) )
-
-    if sum(len(eplist) for eplist in endpoints_by_type.values()) == 0:
-        raise ScriptException(f"Server configuration ({config_file}) error: No endpoints specified")
-
-    goss_endpoints_by_ncn_type = endpoints_by_type
-    return goss_endpoints_by_ncn_type
+    return load_goss_endpoint_registry().endpoints_by_type
+
+def goss_endpoint_url(node: str, port: int, endpoint_name: str) -> str:
+    """
+    Returns the URL of the endpoint on the node (on the .hmn network)
+    """
+    return f"http://{node}.hmn:{port}/{endpoint_name}"
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to grouping identical test failures from different nodes, so that
+each one can be displayed in full once (the first time it is seen), and then summarized along with
+the nodes it failed on.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import re
+
+from .results import DurationSeconds, ResultsEntry
+
+# Splits a node name into a prefix and a trailing number (e.g. "ncn-w" and "012")
+node_number_prog = re.compile("^(.*?)([0-9]+)$")
+
+def number_ranges(numbers: List[int]) -> List[Tuple[int, int]]:
+    """
+    Given a sorted list of distinct integers, returns a list of (first, last) tuples
+    for each run of consecutive integers
+    """
+    ranges = list()
+    for n in numbers:
+        if ranges and ranges[-1][1] == n - 1:
+            ranges[-1] = (ranges[-1][0], n)
+        else:
+            ranges.append((n, n))
+    return ranges
+
+def compact_node_list(node_names: Iterable[str]) -> str:
+    """
+    Returns a compact, comma-separated list of the node names, in which nodes whose names differ
+    only in their trailing number are combined using ranges in brackets.
+    For example: ncn-m[001-003],ncn-w[001-002,005],pit
+    """
+    numbered = dict()
+    unnumbered = set()
+    for node_name in set(node_names):
+        match = node_number_prog.match(node_name)
+        if match is None:
+            unnumbered.add(node_name)
+            continue
+        prefix, number = match.groups()
+        # Names are only combined if their numbers have the same width
+        numbered.setdefault((prefix, len(number)), set()).add(int(number))
+
+    compact_names = list(unnumbered)
+    for (prefix, width), numbers in numbered.items():
+        if len(numbers) == 1:
+            compact_names.append(f"{prefix}{min(numbers):0{width}d}")
+            continue
+        range_strings = [ f"{first:0{width}d}" if first == last else f"{first:0{width}d}-{last:0{width}d}"
+                          for first, last in number_ranges(sorted(numbers)) ]
+        compact_names.append(f"{prefix}[{','.join(range_strings)}]")
+    return ",".join(sorted(compact_names))
+
+
+class FailureGroup:
+    """
+    Every occurrence of one failed test, with the same title and summary line
+    """
+    __slots__ = ("entry", "node_names", "sources", "durations")
+
+    def __init__(self, entry: ResultsEntry):
+        # The first occurrence provides the result string and description
+        self.entry = entry
+        self.node_names = set()
+        self.sources = set()
+        self.durations = list()
+
+    def add(self, entry: ResultsEntry, source: str, node_name: str) -> None:
+        self.node_names.add(node_name)
+        self.sources.add(source)
+        self.durations.append(entry.duration_nanoseconds)
+
+    def duration_stats(self) -> Tuple[DurationSeconds, DurationSeconds, DurationSeconds]:
+        """
+        Returns the (minimum, median, maximum) execution time
+        """
+        # Only needed when there are failures, so it is not imported up front
+        import statistics
+        return ( DurationSeconds(min(self.durations)),
+                 DurationSeconds(int(statistics.median(self.durations))),
+                 DurationSeconds(max(self.durations)) )
+
+    def multiline_string(self) -> str:
+        """
+        Return a string of the grouped results formatted as a multi-line string,
+        followed by a blank line
+        """
+        min_duration, median_duration, max_duration = self.duration_stats()
+        source_line = f"Source: {next(iter(self.sources))}\n" if len(self.sources) == 1 \
+                      else f"Sources: {len(self.sources)}\n"
+        return ( f"Result: {self.entry.result_string}\n"
+                 f"{source_line}"
+                 f"Test Name: {self.entry.title}\n"
+                 f"Description: {self.entry.description}\n"
+                 f"Test Summary: {self.entry.summary}\n"
+                 f"Execution Time (min/median/max): {min_duration} / {median_duration} / {max_duration} seconds\n"
+                 f"Nodes ({len(self.node_names)}): {compact_node_list(self.node_names)}\n\n" )
+
+    def summary_line(self) -> str:
+        return ( f"{self.entry.result_string}: {self.entry.title} ({self.entry.summary}) on "
+                 f"{len(self.node_names)} node(s): {compact_node_list(self.node_names)}" )
+
+
+class FailureGroups:
+    """
+    Failed (or unknown) test results from every source, grouped by (title, summary line)
+    """
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str], FailureGroup] = dict()
+
+    def add(self, entry: ResultsEntry, source: str, node_name: str) -> bool:
+        """
+        Returns True if this is the first occurrence of the failure
+        """
+        key = (entry.title, entry.summary)
+        first = key not in self.groups
+        if first:
+            group = self.groups[key] = FailureGroup(entry)
+        else:
+            group = self.groups[key]
+        group.add(entry, source, node_name)
+        return first
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def sorted_groups(self) -> List[FailureGroup]:
+        """
+        Returns the groups sorted by test name, and then by summary line
+        """
+        return [ self.groups[key] for key in sorted(self.groups) ]
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the Goss gateway, which serves every Goss endpoint of a node from a single
+process, in place of one "goss serve" process per endpoint.
+
+The gateway listens on every port which the Goss server configuration file gives for the node type,
+and serves the same endpoint paths there, so the URLs of the endpoints are unchanged. A request for
+an endpoint runs "goss validate" on its suite, and responds like "goss serve" does: 200 if every
+test passed, 503 if any failed, and 500 if Goss could not run the suite.
+
+All suite runs go through one scheduler, which allows at most GOSS_GATEWAY_MAX_CONCURRENT of them
+at a time on the node. Other requests wait for a run to finish, so that a healthcheck of the whole
+cluster cannot start every suite at once on the same NCN.
+
+Requests are answered from the result cache (see lib/gateway_cache.py), which only starts a run
+when the cached results are too old, and never runs the same suite twice at once. Suites may also
+be run in the background, to keep the cache fresh (see lib/gateway_prerun.py).
+
+The lowest port of the gateway also serves /metrics, with the results of the suites in the
+OpenMetrics text format (see lib/gateway_metrics.py). It is only served on one port, so that a scraper
+gets each series once per node: on NCNs this is port 8994, so the scrape target is
+http://<node>:8994/metrics.
+"""
+
+from .common import fmt_exc,                    \
+                    GOSS_BINARY,                \
+                    GOSS_MAX_CONCURRENT_TESTS,  \
+                    StringList
+from .endpoints import GossEndpointRegistry
+from .gateway_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, \
+                             GatewayMetrics
+
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import http.server
+import logging
+import math
+import os
+import selectors
+import socketserver
+import subprocess
+import threading
+import time
+import urllib.parse
+
+if TYPE_CHECKING:
+    from .gateway_cache import SuiteResultCache
+
+METRICS_PATH = "/metrics"
+
+RESULTS_CONTENT_TYPES = { "json": "application/json", "junit": "application/xml" }
+
+# Background runs of each suite are this fraction of its prerun interval earlier or later than the interval
+PRERUN_JITTER = 0.1
+
+class GatewayEndpoint:
+    """
+    A Goss endpoint served by the gateway: the suite file, the endpoint name and port, how long its
+    results are cached (see lib/gateway_cache.py), and how often it is run in the background (see
+    lib/gateway_prerun.py). Results from background runs are always cached until the next one is due.
+    """
+    __slots__ = ("suite", "suite_file", "endpoint_name", "port", "cache_ttl", "max_stale", "prerun_interval")
+
+    def __init__(self, suite: str, suite_file: str, endpoint_name: str, port: int, cache_ttl: int, max_stale: int,
+                 prerun_interval: int = 0):
+        self.suite = suite
+        self.suite_file = suite_file
+        self.endpoint_name = endpoint_name
+        self.port = port
+        self.prerun_interval = prerun_interval
+        self.cache_ttl = max(cache_ttl, math.ceil(prerun_interval * (1 + PRERUN_JITTER)))
+        self.max_stale = max_stale
+
+    @property
+    def path(self) -> str:
+        return f"/{self.endpoint_name}"
+
+class SuiteRun:
+    """
+    The response for one run of a suite, and how long it waited for the scheduler and then ran
+    """
+    __slots__ = ("status", "body", "content_type", "wait_seconds", "run_seconds")
+
+    def __init__(self, status: int, body: bytes, content_type: str, wait_seconds: float, run_seconds: float):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.wait_seconds = wait_seconds
+        self.run_seconds = run_seconds
+
+class SuiteScheduler:
+    """
+    Runs suites with "goss validate", at most max_concurrent of them at a time. A run_timeout of 0
+    means no timeout.
+    """
+
+    def __init__(self, vars_file: str, results_format: str, max_concurrent: int, run_timeout: float):
+        self.vars_file = vars_file
+        self.results_format = results_format
+        self.content_type = RESULTS_CONTENT_TYPES.get(results_format, "text/plain")
+        self.max_concurrent = max_concurrent
+        self.run_timeout = run_timeout if run_timeout > 0 else None
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+
+    def goss_cmd(self, endpoint: GatewayEndpoint) -> StringList:
+        return [ GOSS_BINARY, "-g", endpoint.suite_file, "--vars", self.vars_file, "validate",
+                 "--format", self.results_format, "--max-concurrent", str(GOSS_MAX_CONCURRENT_TESTS) ]
+
+    def run(self, endpoint: GatewayEndpoint) -> SuiteRun:
+        waiting = time.monotonic()
+        with self.slots:
+            started = time.monotonic()
+            status, body = self.run_goss(endpoint)
+            finished = time.monotonic()
+        return SuiteRun(status, body, self.content_type, started - waiting, finished - started)
+
+    def run_goss(self, endpoint: GatewayEndpoint) -> Tuple[int, bytes]:
+        """
+        Returns the HTTP status and body for the run
+        """
+        cmd = self.goss_cmd(endpoint)
+        try:
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=self.run_timeout)
+        except subprocess.TimeoutExpired:
+            logging.error(f"{endpoint.endpoint_name}: Goss did not finish within {self.run_timeout} seconds")
+            return 504, f"Goss did not finish within {self.run_timeout} seconds\n".encode()
+        except OSError as e:
+            logging.error(f"{endpoint.endpoint_name}: Unable to run Goss: {fmt_exc(e)}")
+            return 500, f"Unable to run Goss: {fmt_exc(e)}\n".encode()
+        # goss validate exits 1 if any tests failed, and also if it could not run the suite at all (in which
+        # case it writes no results)
+        if proc.returncode == 0:
+            return 200, proc.stdout
+        elif proc.returncode == 1 and proc.stdout.strip():
+            return 503, proc.stdout
+        stderr = proc.stderr.decode(errors="replace").strip()
+        logging.error(f"{endpoint.endpoint_name}: Goss exited with return code {proc.returncode}: {stderr}")
+        return 500, (stderr + "\n").encode()
+
+class GatewayRequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "goss-gateway"
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == METRICS_PATH and self.server.metrics is not None:
+            self.send_metrics()
+            return
+        endpoint = self.server.endpoints.get(url.path)
+        if endpoint is None:
+            self.send_error(404)
+            return
+        fresh = urllib.parse.parse_qs(url.query).get("fresh", [""])[-1].lower() in ("1", "true")
+        run, age, cache_status = self.server.cache.get(endpoint, fresh=fresh)
+        logging.info(f"{endpoint.endpoint_name}: {run.status} ({cache_status}, age {age:.3f} seconds; the run took "
+                     f"{run.run_seconds:.3f} seconds, after waiting {run.wait_seconds:.3f} seconds to start)")
+        self.send_response(run.status)
+        self.send_header("Content-Type", run.content_type)
+        self.send_header("Content-Length", str(len(run.body)))
+        self.send_header("Age", str(int(age)))
+        self.send_header("X-Goss-Cache", cache_status)
+        self.end_headers()
+        self.wfile.write(run.body)
+
+    def send_metrics(self) -> None:
+        body = self.server.metrics.render()
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug(f"{self.address_string()} {format % args}")
+
+class GatewayHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """
+    Listens on one port. Each request is handled on its own thread, but they all share the result
+    cache (and so the scheduler). /metrics is only served if serve_metrics is True.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: tuple, endpoints: Dict[str, GatewayEndpoint], cache: "SuiteResultCache",
+                 serve_metrics: bool = False):
+        self.endpoints = endpoints
+        self.cache = cache
+        self.metrics: Optional[GatewayMetrics] = cache.metrics if serve_metrics else None
+        super().__init__(address, GatewayRequestHandler)
+
+def gateway_endpoints(registry: GossEndpointRegistry, node_type: str, suite_dir: str, default_cache_ttl: int,
+                      default_max_stale: int, default_prerun_interval: int) -> List[GatewayEndpoint]:
+    """
+    Returns the endpoints for the node type. Suites whose files are missing or empty are skipped
+    (as they were when each endpoint had its own Goss server). The cache-ttl, max-stale and
+    prerun-interval options of each suite in the configuration file override the defaults.
+    """
+    endpoints = list()
+    for suite, endpoint_name, port in registry.endpoints_by_type[node_type]:
+        suite_file = f"{suite_dir}/{suite}"
+        if not os.path.isfile(suite_file) or os.path.getsize(suite_file) == 0:
+            logging.warning(f"Skipping goss server entry because suite file is empty or does not exist. "
+                            f"suite={suite_file} endpoint={endpoint_name} port={port}")
+            continue
+        options = registry.options(node_type, suite)
+        endpoints.append(GatewayEndpoint(suite, suite_file, endpoint_name, port,
+                                         options.get("cache-ttl", default_cache_ttl),
+                                         options.get("max-stale", default_max_stale),
+                                         options.get("prerun-interval", default_prerun_interval)))
+    return endpoints
+
+class GossGateway:
+    """
+    One GatewayHTTPServer per port, all of them served by a single thread. Only the lowest port serves
+    /metrics.
+    """
+
+    def __init__(self, listen_ip: str, endpoints: List[GatewayEndpoint], cache: "SuiteResultCache"):
+        self.cache = cache
+        endpoints_by_port: Dict[int, Dict[str, GatewayEndpoint]] = dict()
+        for endpoint in endpoints:
+            endpoints_by_port.setdefault(endpoint.port, dict())[endpoint.path] = endpoint
+        self.servers = list()
+        try:
+            for port, port_endpoints in sorted(endpoints_by_port.items()):
+                serve_metrics = not self.servers and cache.metrics is not None
+                self.servers.append(GatewayHTTPServer((listen_ip, port), port_endpoints, cache, serve_metrics))
+                if serve_metrics:
+                    logging.info(f"Serving metrics on {listen_ip}:{port}{METRICS_PATH}")
+                for endpoint in port_endpoints.values():
+                    logging.info(f"Serving {endpoint.endpoint_name} on {listen_ip}:{port} "
+                                 f"(cache-ttl {endpoint.cache_ttl}, max-stale {endpoint.max_stale}, "
+                                 f"prerun-interval {endpoint.prerun_interval})")
+        except BaseException:
+            self.close()
+            raise
+        self.stopped = threading.Event()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """
+        Accepts the connections on every port, until stop is called
+        """
+        with selectors.DefaultSelector() as selector:
+            for server in self.servers:
+                selector.register(server, selectors.EVENT_READ)
+            while not self.stopped.is_set():
+                for key, _ in selector.select(poll_interval):
+                    key.fileobj.handle_request()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.server_close()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the result cache of the Goss gateway.
+
+The last results of each endpoint are kept. For cache-ttl seconds after the run which produced
+them finished, they are served without running the suite. For max-stale seconds after that, they
+are still served right away, but a run is started in the background to refresh them. Older results
+are not served: the request waits for a new run. Requests with ?fresh=1 always wait for a new run.
+
+There is never more than one run of a suite at a time. A request which needs a run while one is
+already in progress waits for that run, rather than starting another (single-flight).
+
+Only results are cached (200 and 503 responses). If Goss could not run the suite, the error is
+returned to the requests which were waiting for that run, and the next request runs the suite again.
+
+If a results directory is given, the latest results of each endpoint are also saved there, and
+loaded when the gateway starts, as long as the suite file and results format have not changed
+since. So the cache is not empty after the service restarts.
+
+If metrics are given, every run (and every set of saved results loaded) is recorded in them, for the
+/metrics endpoint (see lib/gateway_metrics.py).
+
+Every response has an Age header (the number of seconds since the run which produced it finished)
+and an X-Goss-Cache header, which is one of:
+hit     Served from the cache
+stale   Served from the cache, and a refresh was started (or was already running)
+miss    Waited for a run
+fresh   Waited for a run, because of ?fresh=1
+"""
+
+from .common import atomic_write_json, \
+                    fmt_exc,           \
+                    StringList
+from .gateway import GatewayEndpoint, \
+                     SuiteRun,        \
+                     SuiteScheduler
+from .gateway_metrics import GatewayMetrics
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import json
+import logging
+import os
+import threading
+import time
+
+# Bumped whenever the format of the saved results files changes
+SAVED_RESULTS_VERSION = 1
+
+# Statuses of runs whose results are cached
+CACHED_STATUSES = (200, 503)
+
+class CachedRun:
+    __slots__ = ("run", "finished")
+
+    def __init__(self, run: SuiteRun, finished: float):
+        self.run = run
+        # When the run finished, on the monotonic clock
+        self.finished = finished
+
+    def age(self) -> float:
+        return max(time.monotonic() - self.finished, 0.0)
+
+class Flight:
+    """
+    A run of a suite which is in progress. Every request waiting for it gets its result.
+    """
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[CachedRun] = None
+
+class SuiteResultCache:
+    """
+    The last results of each endpoint, and the runs in progress, both keyed by endpoint path.
+    If results_dir is empty, results are not saved.
+    """
+
+    def __init__(self, scheduler: SuiteScheduler, results_dir: str = "", metrics: Optional[GatewayMetrics] = None):
+        self.scheduler = scheduler
+        self.results_dir = results_dir
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.results: Dict[str, CachedRun] = dict()
+        self.flights: Dict[str, Flight] = dict()
+
+    def get(self, endpoint: GatewayEndpoint, fresh: bool = False) -> Tuple[SuiteRun, float, str]:
+        """
+        Returns the results to serve for the endpoint, their age in seconds, and the X-Goss-Cache value
+        """
+        with self.lock:
+            cached = self.results.get(endpoint.path)
+            if cached is not None and not fresh and endpoint.cache_ttl > 0:
+                age = cached.age()
+                if age <= endpoint.cache_ttl:
+                    return cached.run, age, "hit"
+                elif age <= endpoint.cache_ttl + endpoint.max_stale:
+                    self.flight(endpoint)
+                    return cached.run, age, "stale"
+            flight = self.flight(endpoint)
+        flight.done.wait()
+        return flight.result.run, flight.result.age(), "fresh" if fresh else "miss"
+
+    def age(self, endpoint: GatewayEndpoint) -> Optional[float]:
+        """
+        Returns the age in seconds of the cached results of the endpoint, or None if there are none
+        """
+        with self.lock:
+            cached = self.results.get(endpoint.path)
+        return None if cached is None else cached.age()
+
+    def refresh(self, endpoint: GatewayEndpoint) -> SuiteRun:
+        """
+        Runs the suite (or waits for the run already in progress), and returns the results
+        """
+        with self.lock:
+            flight = self.flight(endpoint)
+        flight.done.wait()
+        return flight.result.run
+
+    def flight(self, endpoint: GatewayEndpoint) -> Flight:
+        """
+        Returns the run of the suite in progress, starting one if there is none. Must be called with the lock held.
+        """
+        flight = self.flights.get(endpoint.path)
+        if flight is None:
+            flight = self.flights[endpoint.path] = Flight()
+            threading.Thread(target=self.fly, args=(endpoint, flight), name=f"run-{endpoint.endpoint_name}",
+                             daemon=True).start()
+        return flight
+
+    def fly(self, endpoint: GatewayEndpoint, flight: Flight) -> None:
+        try:
+            run = self.scheduler.run(endpoint)
+        except Exception as e:
+            logging.exception(f"{endpoint.endpoint_name}: Unexpected error running suite")
+            run = SuiteRun(500, f"Unexpected error running suite: {fmt_exc(e)}\n".encode(), "text/plain", 0, 0)
+        result = CachedRun(run, time.monotonic())
+        with self.lock:
+            if run.status in CACHED_STATUSES:
+                self.results[endpoint.path] = result
+            del self.flights[endpoint.path]
+        flight.result = result
+        flight.done.set()
+        if self.metrics is not None:
+            self.metrics.observe(endpoint, run, time.time())
+        if self.results_dir and run.status in CACHED_STATUSES:
+            self.save(endpoint, result)
+
+    def results_file(self, endpoint: GatewayEndpoint) -> str:
+        return f"{self.results_dir}/{endpoint.endpoint_name}.json"
+
+    def save(self, endpoint: GatewayEndpoint, result: CachedRun) -> None:
+        """
+        Writes the results file for the endpoint atomically. Problems are logged, but not raised.
+        """
+        run = result.run
+        try:
+            data = { "version": SAVED_RESULTS_VERSION,
+                     "suite_file": endpoint.suite_file,
+                     "suite_mtime_ns": os.stat(endpoint.suite_file).st_mtime_ns,
+                     "finished": time.time() - result.age(),
+                     "status": run.status,
+                     "content_type": run.content_type,
+                     "wait_seconds": run.wait_seconds,
+                     "run_seconds": run.run_seconds,
+                     "body": run.body.decode(errors="replace") }
+            os.makedirs(self.results_dir, exist_ok=True)
+            atomic_write_json(self.results_file(endpoint), data)
+        except Exception as e:
+            logging.warning(f"{endpoint.endpoint_name}: Unable to save results to {self.results_dir}: {fmt_exc(e)}")
+
+    def load_saved(self, endpoints: Iterable[GatewayEndpoint]) -> StringList:
+        """
+        Loads the saved results of the endpoints into the cache, unless they are for a different version
+        of the suite file. Returns the names of the endpoints which had saved results.
+        """
+        loaded = list()
+        if not self.results_dir:
+            return loaded
+        for endpoint in endpoints:
+            try:
+                with open(self.results_file(endpoint), "rt") as f:
+                    data = json.load(f)
+                if data["version"] != SAVED_RESULTS_VERSION or data["suite_file"] != endpoint.suite_file \
+                        or data["suite_mtime_ns"] != os.stat(endpoint.suite_file).st_mtime_ns \
+                        or data["content_type"] != self.scheduler.content_type:
+                    continue
+                run = SuiteRun(data["status"], data["body"].encode(), data["content_type"], data["wait_seconds"],
+                               data["run_seconds"])
+                finished_time = min(data["finished"], time.time())
+                finished = time.monotonic() - (time.time() - finished_time)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logging.warning(f"{endpoint.endpoint_name}: Unable to load saved results: {fmt_exc(e)}")
+                continue
+            with self.lock:
+                self.results[endpoint.path] = CachedRun(run, finished)
+            if self.metrics is not None:
+                self.metrics.observe(endpoint, run, finished_time, count_run=False)
+            loaded.append(endpoint.endpoint_name)
+        return loaded
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the /metrics endpoint of the Goss gateway, which exports the results of
+the suites it runs (and the timings of the last run of the automated scripts on the node) in the
+OpenMetrics text format, so that they can be scraped directly, rather than written to a log and
+parsed by grok-exporter. It is served on the lowest port of the gateway only (8994 on NCNs), so the
+scrape target of a node is http://<node>:8994/metrics.
+
+The metrics are updated when each run of a suite finishes (or its saved results are loaded), not
+when they are scraped, so a scrape never runs a suite. They are:
+goss_test_result                        Latest result of each test (0 pass, 1 fail, 2 skipped)
+goss_test_duration_seconds              Histogram of the durations of the tests in each suite
+goss_suite_run_duration_seconds         Histogram of how long each suite took to run
+goss_suite_last_run_timestamp_seconds   When the latest run of each suite finished
+goss_suite_tests                        Number of tests in the latest run of each suite, by result
+goss_suite_runs                         Number of runs of each suite, by HTTP status
+goss_aggregator_*                       The timings of the last run of the automated scripts
+
+Labels are limited to the suite, the test title, the result, the HTTP status and the phase, and
+at most MAX_TESTS_PER_SUITE tests are exported for each suite, so the number of series is bounded by
+the suites in the Goss server configuration file. Per-test results are only exported for JSON
+results (for JUnit results, only the suite metrics are).
+"""
+
+from .common import atomic_write_json, \
+                    fmt_exc
+from .perf_report import PHASES
+from .results import RESULT_STRINGS
+
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import json
+import logging
+import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .gateway import GatewayEndpoint, SuiteRun
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Bumped whenever the format of the run metrics file written by the automated scripts changes
+AGGREGATOR_METRICS_VERSION = 1
+
+# Bounds on the test label of the per-test metrics
+MAX_TESTS_PER_SUITE = 500
+MAX_TEST_TITLE_LENGTH = 200
+
+# Histogram buckets, in seconds
+TEST_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+SUITE_DURATION_BUCKETS = (0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Goss result codes, in the order in which they take precedence when a test has several results
+# (one per property checked): any failure makes the test fail, and it is only skipped if every one was
+GOSS_RESULT_PRECEDENCE = (1, 0, 2)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [ 0 ] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+class SuiteMetrics:
+    """
+    The metrics of one suite. tests maps each test title to its latest Goss result code.
+    """
+    __slots__ = ("tests", "test_durations", "run_durations", "last_run", "runs")
+
+    def __init__(self):
+        self.tests: Dict[str, int] = dict()
+        self.test_durations = Histogram(TEST_DURATION_BUCKETS)
+        self.run_durations = Histogram(SUITE_DURATION_BUCKETS)
+        self.last_run: Optional[float] = None
+        self.runs: Dict[int, int] = dict()
+
+def test_results(run: "SuiteRun") -> Optional[Dict[str, Tuple[int, float]]]:
+    """
+    Returns the Goss result code and duration in seconds of each test in the run, by title, or None
+    if the run has no JSON results
+    """
+    if run.status not in (200, 503) or not run.content_type.startswith("application/json"):
+        return None
+    try:
+        results = json.loads(run.body)["results"]
+    except Exception as e:
+        logging.debug(f"Unable to decode results for metrics: {fmt_exc(e)}")
+        return None
+    tests = dict()
+    for entry in results:
+        try:
+            title = str(entry.get("title") or entry["resource-id"])[:MAX_TEST_TITLE_LENGTH]
+            result = entry["result"]
+            seconds = entry.get("duration", 0) / 1000000000.0
+        except (AttributeError, KeyError, TypeError):
+            continue
+        if title in tests:
+            current, current_seconds = tests[title]
+            result = min(result, current, key=lambda code: GOSS_RESULT_PRECEDENCE.index(code)
+                         if code in GOSS_RESULT_PRECEDENCE else -1)
+            seconds += current_seconds
+        elif len(tests) >= MAX_TESTS_PER_SUITE:
+            continue
+        tests[title] = (result, seconds)
+    return tests
+
+class GatewayMetrics:
+    """
+    The metrics of every suite run by the gateway, keyed by suite file name. aggregator_metrics_file
+    is the run metrics file written by the automated scripts (empty if there is none).
+    """
+
+    def __init__(self, aggregator_metrics_file: str = ""):
+        self.aggregator_metrics_file = aggregator_metrics_file
+        self.lock = threading.Lock()
+        self.suites: Dict[str, SuiteMetrics] = dict()
+
+    def observe(self, endpoint: "GatewayEndpoint", run: "SuiteRun", finished: float, count_run: bool = True) -> None:
+        """
+        Records a run of the suite, which finished at the specified time (in seconds since the epoch).
+        If count_run is false (for saved results), only the latest results are updated.
+        """
+        tests = test_results(run)
+        with self.lock:
+            suite = self.suites.get(endpoint.suite)
+            if suite is None:
+                suite = self.suites[endpoint.suite] = SuiteMetrics()
+            if count_run:
+                suite.runs[run.status] = suite.runs.get(run.status, 0) + 1
+                suite.run_durations.observe(run.run_seconds)
+                for _, seconds in (tests or dict()).values():
+                    suite.test_durations.observe(seconds)
+            if tests is not None:
+                suite.tests = { title: result for title, (result, _) in tests.items() }
+            if run.status in (200, 503):
+                suite.last_run = finished
+
+    def render(self) -> bytes:
+        """
+        Returns the metrics in the OpenMetrics text format
+        """
+        lines = list()
+        with self.lock:
+            suites = sorted(self.suites.items())
+            metric_family(lines, "goss_test_result", "gauge",
+                          "Latest Goss result of the test (0 pass, 1 fail, 2 skipped).",
+                          ( ("", (("suite", name), ("test", title)), result)
+                            for name, suite in suites for title, result in sorted(suite.tests.items()) ))
+            histogram_family(lines, "goss_test_duration_seconds", "Durations of the tests in the suite.",
+                             ( ((("suite", name),), suite.test_durations) for name, suite in suites ))
+            histogram_family(lines, "goss_suite_run_duration_seconds", "How long the suite took to run.",
+                             ( ((("suite", name),), suite.run_durations) for name, suite in suites ))
+            metric_family(lines, "goss_suite_last_run_timestamp_seconds", "gauge",
+                          "When the latest run of the suite with results finished.",
+                          ( ("", (("suite", name),), suite.last_run) for name, suite in suites
+                            if suite.last_run is not None ))
+            metric_family(lines, "goss_suite_tests", "gauge", "Number of tests in the latest run of the suite.",
+                          ( ("", (("suite", name), ("result", RESULT_STRINGS[code].lower())),
+                             sum(1 for result in suite.tests.values() if result == code))
+                            for name, suite in suites for code in range(len(RESULT_STRINGS)) ))
+            metric_family(lines, "goss_suite_runs", "counter", "Number of runs of the suite, by HTTP status.",
+                          ( ("_total", (("suite", name), ("status", str(status))), count)
+                            for name, suite in suites for status, count in sorted(suite.runs.items()) ))
+        self.render_aggregator_metrics(lines)
+        lines.append("# EOF\n")
+        return "\n".join(lines).encode()
+
+    def render_aggregator_metrics(self, lines: List[str]) -> None:
+        """
+        Adds the metrics from the run metrics file, if there is one. It is read on each scrape,
+        since the automated scripts may have run since the last one.
+        """
+        if not self.aggregator_metrics_file:
+            return
+        try:
+            with open(self.aggregator_metrics_file, "rt") as f:
+                data = json.load(f)
+            if data["version"] != AGGREGATOR_METRICS_VERSION:
+                return
+            phases = [ (phase, float(data["phases"].get(phase, 0))) for phase in PHASES ]
+            samples = [ ("goss_aggregator_last_run_timestamp_seconds", "When the last run finished.",
+                         float(data["finished"])),
+                        ("goss_aggregator_run_seconds", "How long the last run took.", float(data["run_seconds"])),
+                        ("goss_aggregator_sources", "Number of sources in the last run.", int(data["sources"])) ]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Unable to read run metrics from {self.aggregator_metrics_file}: {fmt_exc(e)}")
+            return
+        metric_family(lines, "goss_aggregator_phase_seconds", "gauge",
+                      "Seconds spent in each phase by the last run, summed over all sources.",
+                      ( ("", (("phase", phase),), seconds) for phase, seconds in phases ))
+        for name, help_text, value in samples:
+            metric_family(lines, name, "gauge", help_text, [ ("", (), value) ])
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def sample_line(name: str, labels: Labels, value) -> str:
+    if labels:
+        name += "{" + ",".join(f'{label}="{escape_label_value(label_value)}"' for label, label_value in labels) + "}"
+    return f"{name} {value}"
+
+def metric_family(lines: List[str], name: str, metric_type: str, help_text: str,
+                  samples: Iterable[Tuple[str, Labels, float]]) -> None:
+    """
+    Adds the metric family, if it has any samples. Each sample is (name suffix, labels, value).
+    """
+    sample_lines = [ sample_line(name + suffix, labels, value) for suffix, labels, value in samples ]
+    if not sample_lines:
+        return
+    lines.append(f"# TYPE {name} {metric_type}")
+    lines.append(f"# HELP {name} {help_text}")
+    lines.extend(sample_lines)
+
+def histogram_family(lines: List[str], name: str, help_text: str,
+                     histograms: Iterable[Tuple[Labels, Histogram]]) -> None:
+    samples = list()
+    for labels, histogram in histograms:
+        for bucket, count in zip(histogram.buckets, histogram.counts):
+            samples.append(("_bucket", labels + (("le", str(float(bucket))),), count))
+        samples.append(("_bucket", labels + (("le", "+Inf"),), histogram.count))
+        samples.append(("_count", labels, histogram.count))
+        samples.append(("_sum", labels, histogram.sum))
+    metric_family(lines, name, "histogram", help_text, samples)
+
+def write_aggregator_metrics(path: str, run_seconds: float, sources: int, phases: Dict[str, float]) -> None:
+    """
+    Writes the run metrics file atomically, so that a scrape never reads part of it
+    """
+    data = { "version": AGGREGATOR_METRICS_VERSION,
+             "finished": time.time(),
+             "run_seconds": run_seconds,
+             "sources": sources,
+             "phases": phases }
+    atomic_write_json(path, data, mode=0o644)
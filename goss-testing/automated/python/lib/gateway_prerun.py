@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to running the suites of the Goss gateway in the background, so that
+requests can be answered from the result cache (see lib/gateway_cache.py) rather than waiting for
+the suite to run.
+
+Each suite with a prerun interval is run about that often. Its runs are jittered by up to
+PRERUN_JITTER of the interval, and the first runs of the suites are staggered over the interval, so
+that the suites are not all run at the same moment. A suite is not run if its cached results are
+still recent (because a request ran it, for example). Only one suite is run in the background at a
+time, and its run goes through the same scheduler as the runs for requests.
+
+Background runs are only done while the node is idle. If the load average per CPU, or the CPU
+pressure, is too high, the run is put off, for twice as long each time (up to the interval).
+Requests with ?fresh=1 still run the suite right away.
+"""
+
+from .gateway import GatewayEndpoint, \
+                     PRERUN_JITTER
+from .gateway_cache import SuiteResultCache
+
+from typing import List, Optional
+
+import heapq
+import logging
+import os
+import random
+import threading
+import time
+
+CPU_PRESSURE_FILE = "/proc/pressure/cpu"
+
+# The first time a background run is put off, it is put off by this many seconds (or the interval, if smaller)
+MIN_BACKOFF_SECONDS = 15
+
+def load_per_cpu() -> float:
+    """
+    Returns the 1-minute load average, divided by the number of CPUs
+    """
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
+
+def cpu_pressure() -> Optional[float]:
+    """
+    Returns the percentage of the last 10 seconds in which some tasks were waiting for a CPU, or None if the
+    kernel does not report CPU pressure
+    """
+    try:
+        with open(CPU_PRESSURE_FILE, "rt") as f:
+            for line in f:
+                fields = line.split()
+                if fields and fields[0] == "some":
+                    return float(dict(field.split("=", 1) for field in fields[1:])["avg10"])
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+class PrerunScheduler:
+    """
+    Runs the suites with a prerun interval in the background, on a single thread, until stop is called
+    """
+
+    def __init__(self, cache: SuiteResultCache, endpoints: List[GatewayEndpoint], max_load: float,
+                 max_cpu_pressure: float):
+        self.cache = cache
+        self.endpoints = [ endpoint for endpoint in endpoints if endpoint.prerun_interval > 0 ]
+        self.max_load = max_load
+        self.max_cpu_pressure = max_cpu_pressure
+        self.backoff = [ 0 ] * len(self.endpoints)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="prerun", daemon=True)
+        # Heap of (when the next run is due, on the monotonic clock, index of endpoint)
+        now = time.monotonic()
+        count = len(self.endpoints)
+        self.due = [ (now + endpoint.prerun_interval * index / count + self.jitter(endpoint), index)
+                     for index, endpoint in enumerate(self.endpoints) ]
+        heapq.heapify(self.due)
+
+    @staticmethod
+    def jitter(endpoint: GatewayEndpoint) -> float:
+        return random.uniform(0, endpoint.prerun_interval * PRERUN_JITTER)
+
+    @staticmethod
+    def next_interval(endpoint: GatewayEndpoint) -> float:
+        return endpoint.prerun_interval * random.uniform(1 - PRERUN_JITTER, 1 + PRERUN_JITTER)
+
+    def busy_reason(self) -> Optional[str]:
+        """
+        Returns why the node is too busy for a background run, or None if it is idle
+        """
+        load = load_per_cpu()
+        if load > self.max_load:
+            return f"load average per CPU is {load:.2f} (limit {self.max_load})"
+        pressure = cpu_pressure()
+        if pressure is not None and pressure > self.max_cpu_pressure:
+            return f"CPU pressure is {pressure:.2f}% (limit {self.max_cpu_pressure}%)"
+        return None
+
+    def start(self) -> None:
+        if self.endpoints:
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            due, index = self.due[0]
+            if self.stopped.wait(max(due - time.monotonic(), 0)):
+                return
+            endpoint = self.endpoints[index]
+            heapq.heappop(self.due)
+            heapq.heappush(self.due, (time.monotonic() + self.run_endpoint(index, endpoint), index))
+
+    def run_endpoint(self, index: int, endpoint: GatewayEndpoint) -> float:
+        """
+        Runs the suite if it is due and the node is idle. Returns the number of seconds until it should be
+        considered again.
+        """
+        age = self.cache.age(endpoint)
+        if age is not None and age < endpoint.prerun_interval * (1 - PRERUN_JITTER):
+            # A request ran the suite recently, so the next run is due one interval after that
+            return endpoint.prerun_interval - age + self.jitter(endpoint)
+
+        reason = self.busy_reason()
+        if reason is not None:
+            self.backoff[index] = min(max(self.backoff[index] * 2, MIN_BACKOFF_SECONDS), endpoint.prerun_interval)
+            logging.info(f"{endpoint.endpoint_name}: Putting off background run for {self.backoff[index]} seconds, "
+                         f"because the {reason}")
+            return self.backoff[index]
+        self.backoff[index] = 0
+
+        try:
+            run = self.cache.refresh(endpoint)
+        except Exception:
+            logging.exception(f"{endpoint.endpoint_name}: Unexpected error in background run")
+        else:
+            logging.info(f"{endpoint.endpoint_name}: Background run: {run.status} in {run.run_seconds:.3f} seconds "
+                         f"(waited {run.wait_seconds:.3f} seconds to start)")
+        return self.next_interval(endpoint)
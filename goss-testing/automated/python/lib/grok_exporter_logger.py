@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022-2023 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022-2023,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -30,19 +30,34 @@ These functions relate to generating log files to be consumed by
 grok-exporter. These log files 
 """
 
-from collections import OrderedDict
-import copy
 import json
+import json.encoder
 import logging
-from typing import Any, Dict, TextIO, Tuple
+import os
+from typing import Any, Callable, Dict, List, TextIO, Tuple
 
 from .common import fmt_exc, stderr_print, timestamp_string
+from .output_sinks import write_line
 
 
 # Simplified type hints to use for JSON-able dicts.
 JSONDict = Dict[str, Any]
 
-GROK_EXPORTER_LOG_DIR = "/opt/cray/tests/install/logs/grok_exporter"
+DEFAULT_GROK_EXPORTER_LOG_DIR = "/opt/cray/tests/install/logs/grok_exporter"
+# This can be overridden for runs off of a system (by the benchmarks, for example)
+GROK_EXPORTER_LOG_DIR = os.environ.get("GOSS_GROK_EXPORTER_LOG_DIR", DEFAULT_GROK_EXPORTER_LOG_DIR)
+
+# The same string encoder that json.dumps uses by default (the C version, if it is available)
+encode_json_string = json.encoder.encode_basestring_ascii
+
+# Encoders for the most common primitive types, matching what json.dumps produces for them.
+# These are looked up by exact type, so subclasses (like bool, for int) do not match by accident.
+# Anything else (including floats, because of NaN and infinity) is left to the json module.
+PRIMITIVE_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    str: encode_json_string,
+    int: int.__repr__,
+    bool: lambda obj: "true" if obj else "false",
+    type(None): lambda obj: "null" }
 
 def data_to_json(obj) -> str:
     """
@@ -52,6 +67,11 @@ def data_to_json(obj) -> str:
     the JSON module does not offer this as an option. Instead, this function will
     generate a JSON string from any object passed into it.
     """
+    # Most values are primitive types, so check for those first, rather than probing
+    # every value for a to_json method
+    encoder = PRIMITIVE_ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
     # Use the to_json method if it exists
     try:
         return obj.to_json()
@@ -77,6 +97,11 @@ def data_to_json(obj) -> str:
 class LogEntry:
     field_position = { "log_timestamp": 1, "Product": 2, "log_script": 3, "log_message": 4 }
 
+    # Maps the tuple of data field names of each entry to the list of (name, JSON key prefix)
+    # tuples for those fields, in the order they are written. Most log entries (like the one for
+    # each test result) have the same fields every time, so their ordering is only worked out once.
+    compiled_field_orders: Dict[Tuple[str, ...], List[Tuple[str, str]]] = dict()
+
     @classmethod
     def field_order_key(cls, field_name: str) -> Tuple[int, str]:
         """
@@ -90,6 +115,21 @@ class LogEntry:
         # names will end up being how they are sorted.
         return (cls.field_position.get(field_name, len(cls.field_position)+1), field_name)
 
+    @classmethod
+    def compiled_field_order(cls, data_fields: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        """
+        Returns the (name, JSON key prefix) tuples for the given data fields, excluding the fixed
+        fields, sorted by field_order_key. The result is cached.
+        """
+        try:
+            return cls.compiled_field_orders[data_fields]
+        except KeyError:
+            pass
+        field_order = [ (field_name, f"{data_to_json(field_name)}: ")
+                        for field_name in sorted(data_fields, key=cls.field_order_key)
+                        if field_name not in cls.field_position ]
+        cls.compiled_field_orders[data_fields] = field_order
+        return field_order
 
     def __init__(self, message: str, script_name: str, product: str, data: JSONDict=None
                  ) -> None:
@@ -99,12 +139,11 @@ class LogEntry:
         log_message (from the message argument)
         log_script (from script_name argument)
         Product (from the product argument)
+
+        The data argument is not modified (or copied) -- the log string is generated directly from it.
         """
         if data is None:
-            logdata = dict()
-        else:
-            # Make a copy since we will be editing it in place
-            logdata = copy.deepcopy(data)
+            data = dict()
 
         # Add/update fields
         updated_fields = { "log_timestamp": timestamp_string(),
@@ -112,19 +151,18 @@ class LogEntry:
                             "log_script": script_name,
                             "log_message": message }
         for field_name, field_value in updated_fields.items():
-            if field_name in logdata:
+            if field_name in data:
                 logging.warning(f"grok_exporter_logger.set_data_field: Field '{field_name}' "
-                                f"already set to '{logdata[field_name]}'; "
+                                f"already set to '{data[field_name]}'; "
                                 f"overwriting it to '{field_value}'")
-            logdata[field_name] = field_value
-
-        # Generate ordered dict of the data
-        ordered_data = OrderedDict(sorted(logdata.items(),
-                                          key=lambda item: LogEntry.field_order_key(item[0])))
 
         # Generate the log string
         try:
-            self.json_string = data_to_json(ordered_data)
+            items_json_list = [ f'"{field_name}": {data_to_json(field_value)}'
+                                for field_name, field_value in updated_fields.items() ]
+            items_json_list.extend(f"{key_prefix}{data_to_json(data[field_name])}"
+                                   for field_name, key_prefix in LogEntry.compiled_field_order(tuple(data)))
+            self.json_string = "{%s}" % ", ".join(items_json_list)
         except TypeError as exc:
             msg = f"Error encoding data for grok-exporter log. {fmt_exc(exc)}"
             logging.error(msg)
@@ -151,8 +189,7 @@ def grok_exporter_log(message: str, script_name: str, outfile: TextIO,
     log_entry = LogEntry(message=message, script_name=script_name, product=product, data=data)
     log_string = log_entry.to_json_str()
     try:
-        outfile.write(f"{log_string}\n")
-        outfile.flush()
+        write_line(outfile, log_string)
     except Exception as exc:
         msg = f"Error writing to output file. {fmt_exc(exc)}"
         logging.error(msg)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to making HTTP requests to the Goss server endpoints. All requests
+made during a run share a single requests.Session, so that connections to the same endpoint
+are kept alive and reused, and host names are only resolved once per run. The resolved addresses
+are only used by the connections of that session, not by anything else in the process.
+
+requests takes a long time to import (relative to the run time of a script with only file sources),
+so it is only imported once a session is needed.
+"""
+
+from typing import Iterable, List, TYPE_CHECKING
+
+import os
+import socket
+import sys
+import threading
+import urllib.parse
+
+if TYPE_CHECKING:
+    import requests
+
+# The Goss servers support gzip, and the JSON results compress very well
+GOSS_HTTP_ACCEPT_ENCODING = "gzip"
+
+_session = None
+_session_lock = threading.Lock()
+
+class HostAddressCache:
+    """
+    The addresses of each host, resolved once. The Goss endpoints on a node listen on several
+    different ports, so the lookups are done without the port. Each cache belongs to one session,
+    and lives only as long as it does (one run of a short-lived script), so entries never expire.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.addresses = dict()
+        self.host_locks = dict()
+
+    def lookup(self, host: str) -> List[str]:
+        """
+        Returns the addresses of the host, in the order that getaddrinfo gave them (without duplicates)
+        """
+        try:
+            return self.addresses[host]
+        except KeyError:
+            pass
+        # Only one thread per host does the lookup. The others wait for it and use its result.
+        with self.lock:
+            host_lock = self.host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            try:
+                return self.addresses[host]
+            except KeyError:
+                pass
+            addresses = list()
+            for _, _, _, _, sockaddr in socket.getaddrinfo(host, 0, 0, socket.SOCK_STREAM):
+                if sockaddr[0] not in addresses:
+                    addresses.append(sockaddr[0])
+            self.addresses[host] = addresses
+            return addresses
+
+def default_max_workers() -> int:
+    """
+    The number of worker threads that ThreadPoolExecutor uses when max_workers is not specified
+    (this changed in Python 3.8)
+    """
+    if sys.version_info >= (3, 8):
+        return min(32, (os.cpu_count() or 1) + 4)
+    return (os.cpu_count() or 1) * 5
+
+def cached_dns_adapter(address_cache: HostAddressCache, **kwargs) -> "requests.adapters.HTTPAdapter":
+    """
+    Returns an HTTPAdapter (with the specified arguments) whose connections resolve their hosts
+    through the address cache. Each connection still tries every address of its host in turn, as
+    it would if it did the lookup itself.
+    """
+    import requests.adapters
+    import urllib3.connection
+    import urllib3.connectionpool
+
+    class CachedDnsConnectionMixin:
+        def _new_conn(self):
+            host = self._dns_host
+            try:
+                addresses = address_cache.lookup(host)
+            except OSError:
+                # Let urllib3 look up the host itself, so that the failure is reported as usual
+                addresses = list()
+            try:
+                for number, address in enumerate(addresses, start=1):
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except Exception:
+                        if number == len(addresses):
+                            raise
+            finally:
+                self._dns_host = host
+            return super()._new_conn()
+
+    class CachedDnsHTTPConnection(CachedDnsConnectionMixin, urllib3.connection.HTTPConnection):
+        pass
+
+    class CachedDnsHTTPSConnection(CachedDnsConnectionMixin, urllib3.connection.HTTPSConnection):
+        pass
+
+    class CachedDnsHTTPConnectionPool(urllib3.connectionpool.HTTPConnectionPool):
+        ConnectionCls = CachedDnsHTTPConnection
+
+    class CachedDnsHTTPSConnectionPool(urllib3.connectionpool.HTTPSConnectionPool):
+        ConnectionCls = CachedDnsHTTPSConnection
+
+    class CachedDnsHTTPAdapter(requests.adapters.HTTPAdapter):
+        def init_poolmanager(self, *args, **pool_kwargs):
+            super().init_poolmanager(*args, **pool_kwargs)
+            self.poolmanager.pool_classes_by_scheme = { "http": CachedDnsHTTPConnectionPool,
+                                                        "https": CachedDnsHTTPSConnectionPool }
+
+    return CachedDnsHTTPAdapter(**kwargs)
+
+def url_host_count(urls: Iterable[str]) -> int:
+    """
+    Returns the number of distinct scheme/host/port combinations in the URLs.
+    requests keeps a separate connection pool for each of these.
+    """
+    return len({ urllib.parse.urlsplit(url)[:2] for url in urls })
+
+def goss_http_session(max_workers: int = 0, num_hosts: int = 10) -> "requests.Session":
+    """
+    Returns the shared requests.Session for this process, creating it if needed.
+
+    The session keeps one connection pool per host (num_hosts of them, so that pools are not
+    discarded partway through a run), and each pool holds up to max_workers connections, so that
+    every worker thread can have its own connection to a host at the same time. If max_workers
+    is 0, the ThreadPoolExecutor default is used.
+
+    The underlying connection pool is thread-safe, so the session can be used from all of the
+    worker threads.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            return _session
+        import requests
+        if max_workers == 0:
+            max_workers = default_max_workers()
+        adapter = cached_dns_adapter(HostAddressCache(), pool_connections=max(num_hosts, 1),
+                                     pool_maxsize=max_workers)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = GOSS_HTTP_ACCEPT_ENCODING
+        _session = session
+        return _session
+
+def is_timeout_error(exc: Exception) -> bool:
+    """
+    Returns True if the exception raised by a request means that it timed out
+    (either connecting or waiting for the response)
+    """
+    # If requests has not been imported, then the exception cannot have come from it
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(exc, requests.exceptions.Timeout)
+
+def is_retryable_error(exc: Exception) -> bool:
+    """
+    Returns True if the exception raised by a request is a connection problem which may be
+    transient (refused, reset, or timed out while connecting). A timeout waiting for the response
+    is not retried -- the server was reachable, it just did not answer in time.
+    """
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(exc, requests.exceptions.ConnectionError)
+
+def close_goss_http_session() -> None:
+    """
+    Closes the shared session (if there is one), along with all of its pooled connections
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            return
+        _session.close()
+        _session = None
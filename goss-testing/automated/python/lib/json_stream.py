@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to decoding large Goss JSON results documents incrementally,
+without reading the whole document into memory first.
+
+Goss JSON output is a single object, with the individual test results in its "results" array
+and the totals in its "summary" object. iter_json_object walks the members of the top-level
+object as they are read, and yields the items of the requested arrays one at a time, so the
+caller only ever holds one test result in its decoded form.
+"""
+
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+
+import json
+
+DEFAULT_CHUNK_SIZE = 64*1024
+
+# Appended to the key that is yielded for each item of an array that is being streamed
+ARRAY_ITEM_SUFFIX = "[]"
+
+JSON_WHITESPACE = " \t\n\r"
+JSON_DELIMITERS = JSON_WHITESPACE + ",:]}"
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class JsonStreamReader:
+    """
+    Buffers text read from a file object, and decodes JSON values from it one at a time.
+    Only the undecoded part of the document (plus at most one chunk) is kept in memory.
+    """
+
+    def __init__(self, infile: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.infile = infile
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # Offset in the document of the start of the buffer, for error messages
+        self.offset = 0
+
+    def read_more(self, size: int = 0) -> bool:
+        """
+        Appends the next chunk of the file to the buffer, discarding what has already been decoded.
+        Returns False if the end of the file has been reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.infile.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> JsonStreamError:
+        return JsonStreamError(f"{message} (at character {self.offset + self.pos})")
+
+    def peek(self) -> str:
+        """
+        Skips whitespace, and returns the next character without consuming it.
+        Returns an empty string at the end of the file.
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read_more():
+                return self.buffer[self.pos:self.pos+1]
+
+    def expect(self, expected: str) -> str:
+        """
+        Consumes the next non-whitespace character, which must be one of the expected characters.
+        Returns the character.
+        """
+        c = self.peek()
+        if not c:
+            raise self.error(f"Unexpected end of JSON data, expecting one of: {expected}")
+        if c not in expected:
+            raise self.error(f"Unexpected character '{c}', expecting one of: {expected}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """
+        Decodes and returns the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Grow the buffer geometrically, so that a large value is not re-decoded once per chunk
+                if self.read_more(len(self.buffer) - self.pos):
+                    continue
+                raise self.error(f"Invalid JSON value: {e.msg}") from e
+            # A number at the end of the buffer may continue in the next chunk, so unless this
+            # is the end of the file, only accept a value once it is followed by a delimiter.
+            if (end < len(self.buffer) and self.buffer[end] in JSON_DELIMITERS) or \
+               not self.read_more(len(self.buffer) - self.pos):
+                self.pos = end
+                return value
+
+
+def iter_json_array(reader: JsonStreamReader) -> Iterator[Any]:
+    """
+    Yields the items of the JSON array which starts at the current position of the reader
+    """
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_json_object(infile: TextIO, array_keys: Iterable[str] = (),
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (key, value) for each member of the JSON object in infile, as it is read.
+
+    For members named in array_keys whose values are arrays, the array itself is not yielded.
+    Instead, (key + ARRAY_ITEM_SUFFIX, item) is yielded for each item in the array.
+
+    Raises JsonStreamError if the data is not a valid JSON object.
+    """
+    array_keys = frozenset(array_keys)
+    reader = JsonStreamReader(infile, chunk_size=chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise reader.error("Expecting a string for JSON object key")
+            reader.expect(":")
+            if key in array_keys and reader.peek() == "[":
+                item_key = key + ARRAY_ITEM_SUFFIX
+                for item in iter_json_array(reader):
+                    yield item_key, item
+            else:
+                yield key, reader.value()
+            if reader.expect(",}") == "}":
+                break
+    if reader.peek():
+        raise reader.error("Extra data after JSON object")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to finding the list of NCNs (the NCN inventory).
+
+Off the PIT node, the sources are the basecamp and BSS meta-data endpoints (which are authoritative)
+and /etc/hosts. On the PIT node, they are the SLS input file (which is authoritative) and the
+dnsmasq statics files. All of the sources are queried at once, each in its own thread. The first
+authoritative source to answer is used, without waiting for the others. If none of them answers,
+the other sources are used, in order of preference.
+
+The NCN list is cached (see GOSS_SCRIPT_NCN_INVENTORY_CACHE and GOSS_SCRIPT_NCN_INVENTORY_TTL), so
+that repeated calls do not wait for sources which are down (for example, basecamp after the PIT
+node has been redeployed). Only lists which were found are cached.
+"""
+
+from .common import atomic_write_json,                 \
+                    fmt_exc,                           \
+                    get_hostname,                      \
+                    goss_script_ncn_inventory_cache,   \
+                    goss_script_ncn_inventory_timeout, \
+                    goss_script_ncn_inventory_ttl,     \
+                    is_pit_node,                       \
+                    ncn_num_pattern,                   \
+                    ScriptException,                   \
+                    StringList
+from .timeouts import Deadline
+
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+# Bumped whenever the format of the cache file changes
+NCN_INVENTORY_CACHE_VERSION = 1
+
+BASECAMP_META_DATA_URL = "http://ncn-m001:8888/meta-data"
+BSS_META_DATA_URL = "http://api-gw-service-nmn.local:8888/meta-data"
+DNSMASQ_STATICS_FILE = "/etc/dnsmasq.d/statics.conf"
+HOSTS_FILE = "/etc/hosts"
+
+NCN_INVENTORY_TYPES = [ "master", "storage", "worker" ]
+
+# Unlike the patterns in common.py, this is not anchored, since it is used to find NCN names in text
+ncn_find_re_prog = re.compile(f"ncn-[msw]{ncn_num_pattern}")
+
+def find_ncn_names(text: str) -> StringList:
+    """
+    Returns the sorted list of unique NCN names found anywhere in the text
+    """
+    return sorted({ m.group(0) for m in ncn_find_re_prog.finditer(text) })
+
+class InventorySource:
+    """
+    A source of the NCN list. read is called with the timeout in seconds (or None), and returns
+    text containing the NCN names. It raises an exception if the source cannot be read.
+    If warn is False, failures of this source are only logged (because they are expected).
+    """
+    __slots__ = ("name", "read", "authoritative", "warn")
+
+    def __init__(self, name: str, read: Callable[[Optional[float]], str], authoritative: bool, warn: bool = True):
+        self.name = name
+        self.read = read
+        self.authoritative = authoritative
+        self.warn = warn
+
+    def resolve(self, timeout: Optional[float]) -> StringList:
+        """
+        Raises ScriptException if the source cannot be read, or has no NCN names
+        """
+        try:
+            ncns = find_ncn_names(self.read(timeout))
+        except ScriptException:
+            raise
+        except Exception as e:
+            raise ScriptException(f"Unable to obtain NCN list from {self.name}: {fmt_exc(e)}")
+        if not ncns:
+            raise ScriptException(f"Unable to obtain NCN list from {self.name}")
+        return ncns
+
+def read_meta_data_aliases(url: str, timeout: Optional[float]) -> str:
+    """
+    Returns the NCN aliases (the second alias of each host record) from a cloud-init meta-data endpoint
+    """
+    import urllib.request
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        data = json.load(response)
+    return "\n".join(str(record["aliases"][1]) for record in data["Global"]["host_records"]
+                     if len(record.get("aliases", [])) > 1)
+
+def read_sls_management_aliases(sls_json: str) -> str:
+    """
+    Returns the aliases of the management nodes in an SLS input file
+    """
+    with open(sls_json, "rt") as f:
+        hardware = json.load(f)["Hardware"]
+    if isinstance(hardware, dict):
+        hardware = hardware.values()
+    return "\n".join(str(alias) for hw in hardware
+                     if hw.get("Type") == "comptype_node" and hw.get("TypeString") == "Node"
+                     and hw.get("ExtraProperties", {}).get("Role") == "Management"
+                     for alias in hw["ExtraProperties"].get("Aliases", []))
+
+def read_nonempty_file(path: str) -> str:
+    if not os.path.isfile(path) or os.path.getsize(path) == 0:
+        raise ScriptException(f"The '{path}' file does not exist or is empty")
+    with open(path, "rt") as f:
+        return f.read()
+
+def pit_prep_dir() -> str:
+    """
+    Raises ScriptException if the PITDATA or SYSTEM_NAME environment variables are not set
+    """
+    pitdata = os.environ.get("PITDATA", "")
+    system_name = os.environ.get("SYSTEM_NAME", "")
+    if not pitdata:
+        raise ScriptException("The PITDATA environment variable is not set.")
+    elif not system_name:
+        raise ScriptException("The SYSTEM_NAME environment variable is not set.")
+    return f"{pitdata}/prep/{system_name}"
+
+def inventory_sources(pit: bool) -> List[InventorySource]:
+    """
+    Returns the NCN inventory sources, in order of preference
+    """
+    if pit:
+        def read_sls(timeout: Optional[float]) -> str:
+            sls_json = f"{pit_prep_dir()}/sls_input_file.json"
+            read_nonempty_file(sls_json)
+            return read_sls_management_aliases(sls_json)
+
+        return [ InventorySource("SLS input file", read_sls, authoritative=True),
+                 InventorySource("system prep dnsmasq statics file",
+                                 lambda timeout: read_nonempty_file(f"{pit_prep_dir()}/dnsmasq.d/statics.conf"),
+                                 authoritative=False),
+                 InventorySource(DNSMASQ_STATICS_FILE, lambda timeout: read_nonempty_file(DNSMASQ_STATICS_FILE),
+                                 authoritative=False) ]
+    # basecamp is expected to fail once the PIT node is redeployed, so no warning is given for it
+    return [ InventorySource("basecamp", lambda timeout: read_meta_data_aliases(BASECAMP_META_DATA_URL, timeout),
+                             authoritative=True, warn=False),
+             InventorySource("BSS", lambda timeout: read_meta_data_aliases(BSS_META_DATA_URL, timeout),
+                             authoritative=True),
+             InventorySource(HOSTS_FILE, lambda timeout: read_nonempty_file(HOSTS_FILE), authoritative=False) ]
+
+class InventoryResult:
+    """
+    The full NCN list, which source it came from, and the sources which failed (with why) before
+    a non-authoritative source was used. passed_over is True if a source which answered was not
+    used because it had none of the NCNs that were asked for.
+    """
+    __slots__ = ("ncns", "source", "failures", "passed_over")
+
+    def __init__(self, ncns: StringList, source: str, failures: List[Tuple[InventorySource, str]],
+                 passed_over: bool = False):
+        self.ncns = ncns
+        self.source = source
+        self.failures = failures
+        self.passed_over = passed_over
+
+    def warnings(self) -> StringList:
+        return [ reason for source, reason in self.failures if source.warn ]
+
+def resolve_inventory(sources: List[InventorySource], timeout: float,
+                      wanted: Callable[[StringList], StringList] = lambda ncns: ncns,
+                      type_string: str = "NCN") -> InventoryResult:
+    """
+    Queries all of the sources concurrently. Returns as soon as an authoritative source answers.
+    Otherwise, once every source has answered, failed, or timed out, the first source (in order of
+    preference) which answered is used. A timeout of 0 means no timeout.
+
+    wanted returns the NCNs which were asked for, from the full list of a source. A source whose list
+    has none of them counts as failed (type_string names them in its reason), so that the next source
+    is used, as if the source had not answered.
+
+    Raises ScriptException if no source answers. Its message lists why each source failed.
+    """
+    read_timeout = timeout if timeout > 0 else None
+    deadline = Deadline(timeout)
+    answers = queue.Queue()
+
+    def query(index: int, source: InventorySource) -> None:
+        try:
+            ncns = source.resolve(read_timeout)
+        except ScriptException as e:
+            answers.put((index, None, str(e), False))
+            return
+        if not wanted(ncns):
+            answers.put((index, None, f"Unable to obtain {type_string} list from {source.name}", True))
+            return
+        answers.put((index, ncns, None, False))
+
+    # Daemon threads (rather than a thread pool), so that sources which have not answered in time
+    # do not stop the process from exiting
+    for index, source in enumerate(sources):
+        threading.Thread(target=query, args=(index, source), name=f"ncn-inventory-{source.name}", daemon=True).start()
+
+    results = dict()
+    while len(results) < len(sources):
+        try:
+            index, ncns, reason, unwanted = answers.get(timeout=deadline.remaining())
+        except queue.Empty:
+            break
+        results[index] = (ncns, reason, unwanted)
+        if reason is not None:
+            logging.debug(reason)
+        elif sources[index].authoritative:
+            logging.debug(f"NCN list from {sources[index].name}: {ncns}")
+            return InventoryResult(ncns, sources[index].name, list(),
+                                   passed_over=any(unwanted for _, _, unwanted in results.values()))
+
+    failures = list()
+    passed_over = False
+    for index, source in enumerate(sources):
+        ncns, reason, unwanted = results.get(index, (None, f"Unable to obtain NCN list from {source.name}: "
+                                                           f"No answer within {timeout} seconds", False))
+        if ncns:
+            logging.debug(f"NCN list from {source.name}: {ncns}")
+            return InventoryResult(ncns, source.name, failures, passed_over)
+        failures.append((source, reason))
+        passed_over = passed_over or unwanted
+    raise ScriptException(f"Unable to obtain {type_string} list from any source: " +
+                          "; ".join(reason for _, reason in failures))
+
+def inventory_cache_key(pit: bool) -> dict:
+    key = { "version": NCN_INVENTORY_CACHE_VERSION, "hostname": get_hostname(), "pit": pit }
+    if pit:
+        key["PITDATA"] = os.environ.get("PITDATA", "")
+        key["SYSTEM_NAME"] = os.environ.get("SYSTEM_NAME", "")
+    return key
+
+def load_cached_inventory(cache_file: str, key: dict, ttl: int) -> Optional[InventoryResult]:
+    """
+    Returns the cached inventory, or None if the cache file does not exist, cannot be read, is for
+    a different key, or is more than ttl seconds old
+    """
+    try:
+        with open(cache_file, "rt") as f:
+            cached = json.load(f)
+        if cached["key"] != key:
+            return None
+        age = time.time() - cached["time"]
+        if not 0 <= age < ttl:
+            return None
+        ncns = cached["ncns"]
+        if not ncns or ncns != find_ncn_names("\n".join(ncns)):
+            return None
+    except Exception as e:
+        logging.debug(f"Not using NCN inventory cache {cache_file}: {fmt_exc(e)}")
+        return None
+    return InventoryResult(ncns, f"{cached['source']} (cached)", list())
+
+def save_cached_inventory(cache_file: str, key: dict, result: InventoryResult) -> None:
+    """
+    Writes the cache file atomically. Problems are logged, but not raised, since the cache is only
+    an optimization.
+    """
+    data = { "key": key, "time": time.time(), "source": result.source, "ncns": result.ncns }
+    try:
+        atomic_write_json(cache_file, data)
+    except Exception as e:
+        logging.debug(f"Unable to write NCN inventory cache {cache_file}: {fmt_exc(e)}")
+
+def load_ncn_inventory(refresh: bool = False, wanted: Callable[[StringList], StringList] = lambda ncns: ncns,
+                       type_string: str = "NCN") -> InventoryResult:
+    """
+    Returns the full NCN list, from the cache if it is fresh (unless refresh is True) and has some of
+    the wanted NCNs, and otherwise from the inventory sources (see resolve_inventory). The cache is
+    only updated with a list that would also have been found without wanted, so that a fallback
+    source used for one type of NCN is not then used for every other type.
+    Raises ScriptException if the list cannot be found
+    """
+    pit = is_pit_node()
+    cache_file = goss_script_ncn_inventory_cache()
+    ttl = goss_script_ncn_inventory_ttl()
+    use_cache = bool(cache_file) and ttl > 0
+    if use_cache:
+        key = inventory_cache_key(pit)
+        if not refresh:
+            result = load_cached_inventory(cache_file, key, ttl)
+            if result is not None and wanted(result.ncns):
+                return result
+    result = resolve_inventory(inventory_sources(pit), goss_script_ncn_inventory_timeout(), wanted, type_string)
+    if use_cache and not result.passed_over:
+        save_cached_inventory(cache_file, key, result)
+    return result
+
+def ncn_type_string(types: Iterable[str]) -> str:
+    types = list(types)
+    if set(types) == set(NCN_INVENTORY_TYPES):
+        return "NCN"
+    return "/".join(t for t in NCN_INVENTORY_TYPES if t in types) + " NCN"
+
+def filter_ncns(ncns: Iterable[str], types: Iterable[str], exclude_m001: bool) -> StringList:
+    prefixes = tuple(f"ncn-{t[0]}" for t in types)
+    return [ ncn for ncn in ncns if ncn.startswith(prefixes) and not (exclude_m001 and ncn == "ncn-m001") ]
+
+def get_ncns(types: Iterable[str] = NCN_INVENTORY_TYPES, exclude_pit: bool = False, refresh: bool = False,
+             warn: Callable[[str], None] = logging.warning) -> StringList:
+    """
+    Returns the sorted list of NCNs of the specified types (all NCNs by default). If exclude_pit is True and
+    this is the PIT node, ncn-m001 is excluded.
+
+    If the GOSS_TEST_NCN_LIST environment variable is set, the NCNs are taken from it instead. This allows
+    users to run the automated scripts in cases where the usual sources of the NCN list do not work.
+
+    Sources which failed (or had no NCNs of the specified types) are passed to warn, if the list was not
+    found from an authoritative source.
+    Raises ScriptException if no source has NCNs of the specified types.
+    """
+    types = [ t for t in NCN_INVENTORY_TYPES if t in types ] or NCN_INVENTORY_TYPES
+    type_string = ncn_type_string(types)
+    exclude_m001 = exclude_pit and is_pit_node()
+
+    test_ncn_list = os.environ.get("GOSS_TEST_NCN_LIST", "")
+    if test_ncn_list:
+        ncns = filter_ncns(find_ncn_names(test_ncn_list), types, exclude_m001)
+        if ncns:
+            return ncns
+        warn(f"GOSS_TEST_NCN_LIST variable is set, but unable to obtain {type_string} list from it: '{test_ncn_list}'")
+
+    # Sources which have none of the NCNs that were asked for are passed over, and the next one is used
+    result = load_ncn_inventory(refresh=refresh, wanted=lambda ncns: filter_ncns(ncns, types, exclude_m001),
+                                type_string=type_string)
+    for message in result.warnings():
+        warn(message)
+    return filter_ncns(result.ncns, types, exclude_m001)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to writing output lines (to the screen, the out file, and the
+grok-exporter log) from a background thread, so that callers do not pay for a flush per line.
+
+Lines for every stream go through a single bounded queue, and are written by a single writer
+thread in the order they were queued, so the relative order of lines is preserved both within
+and across streams. The streams are flushed once enough bytes have been written, once the flush
+interval has passed, or when a line is written with flush=True (in which case the caller also
+waits until it has been flushed). Until start_output_sinks is called (and after stop_output_sinks
+is called), write_line simply writes and flushes the line directly.
+"""
+
+from typing import Optional, TextIO
+
+import logging
+import queue
+import sys
+import threading
+import time
+
+DEFAULT_MAX_QUEUED_LINES = 10000
+DEFAULT_FLUSH_BYTES = 64*1024
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.25
+
+class OutputSinks:
+    """
+    A bounded queue of (stream, line, done event) items, and the thread which writes them
+    """
+
+    def __init__(self, max_queued_lines: int = DEFAULT_MAX_QUEUED_LINES,
+                 flush_bytes: int = DEFAULT_FLUSH_BYTES,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS):
+        self.queue = queue.Queue(maxsize=max_queued_lines)
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        # Streams which have been written to since they were last flushed
+        self.unflushed = dict()
+        # Streams which could not be written to. Any further lines for them are discarded.
+        self.failed = set()
+        self.thread = threading.Thread(target=self.writer, name="output-sinks", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def write_line(self, stream: TextIO, s: str, flush: bool = False) -> None:
+        """
+        Queues s (followed by a newline) to be written to stream. If flush is True, waits until it has
+        been written and every stream has been flushed.
+        """
+        done = threading.Event() if flush else None
+        self.queue.put((stream, f"{s}\n", done))
+        if done is not None:
+            done.wait()
+
+    def drain(self) -> None:
+        """
+        Waits until everything queued so far has been written and flushed
+        """
+        done = threading.Event()
+        self.queue.put((None, None, done))
+        done.wait()
+
+    def stop(self) -> None:
+        """
+        Writes and flushes everything queued so far, then stops the writer thread
+        """
+        done = threading.Event()
+        self.queue.put((None, None, done))
+        self.queue.put(None)
+        done.wait()
+        self.thread.join()
+
+    def stream_error(self, stream: TextIO, exc: Exception) -> None:
+        """
+        Called from the writer thread, so it must not queue anything itself
+        """
+        self.failed.add(stream)
+        self.unflushed.pop(stream, None)
+        msg = f"Error writing to output file. {type(exc).__name__}: {exc}"
+        logging.error(msg)
+        if stream is not sys.stderr and sys.stderr not in self.failed:
+            try:
+                sys.stderr.write(f"{msg}\n")
+                sys.stderr.flush()
+            except Exception:
+                pass
+
+    def flush_all(self) -> None:
+        for stream in list(self.unflushed):
+            try:
+                stream.flush()
+            except Exception as exc:
+                self.stream_error(stream, exc)
+        self.unflushed.clear()
+
+    def writer(self) -> None:
+        unflushed_bytes = 0
+        flush_time = None
+        while True:
+            try:
+                if flush_time is None:
+                    item = self.queue.get()
+                else:
+                    item = self.queue.get(timeout=max(0, flush_time - time.monotonic()))
+            except queue.Empty:
+                item = (None, None, None)
+            if item is None:
+                return
+            stream, line, done = item
+            if stream is not None and stream not in self.failed:
+                try:
+                    stream.write(line)
+                except Exception as exc:
+                    self.stream_error(stream, exc)
+                else:
+                    self.unflushed[stream] = True
+                    unflushed_bytes += len(line)
+                    if flush_time is None:
+                        flush_time = time.monotonic() + self.flush_interval
+            if done is not None or unflushed_bytes >= self.flush_bytes or \
+               (flush_time is not None and time.monotonic() >= flush_time):
+                self.flush_all()
+                unflushed_bytes = 0
+                flush_time = None
+            if done is not None:
+                done.set()
+
+
+output_sinks: Optional[OutputSinks] = None
+
+def start_output_sinks(**kwargs) -> None:
+    """
+    From this point on, write_line queues lines for the writer thread
+    """
+    global output_sinks
+    sinks = OutputSinks(**kwargs)
+    sinks.start()
+    output_sinks = sinks
+
+def stop_output_sinks() -> None:
+    """
+    Writes and flushes everything that has been queued. From this point on, write_line writes
+    directly to the stream again. This must be called before any of the streams are closed.
+    """
+    global output_sinks
+    sinks, output_sinks = output_sinks, None
+    if sinks is not None:
+        sinks.stop()
+
+def drain_output_sinks() -> None:
+    if output_sinks is not None:
+        output_sinks.drain()
+
+def write_line(stream: TextIO, s: str, flush: bool = False) -> None:
+    """
+    Writes s, followed by a newline, to stream. If the output sinks are running, this is done by the
+    writer thread, and the line is only flushed right away if flush is True. Otherwise the line is
+    written and flushed before returning, and any exceptions are raised to the caller.
+    """
+    sinks = output_sinks
+    if sinks is None or threading.current_thread() is sinks.thread:
+        stream.write(f"{s}\n")
+        stream.flush()
+        return
+    sinks.write_line(stream, s, flush=flush)
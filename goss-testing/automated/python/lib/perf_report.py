@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the performance report for a run: the slowest tests, the slowest
+source on each node, the critical path (the source which finished last, and so bounded the
+run), and how the time for each source was spent.
+
+The time for each source is split into these phases:
+wait    Waiting to start (for a worker thread, or for a free in-flight slot)
+fetch   Making the GET request to a URL source (including any retries)
+exec    Running Goss for a local suite or test file
+decode  Decoding the JSON results (for results files and stdin, this includes extracting them)
+extract Extracting the test results from the decoded JSON
+report  Reporting the results (screen and out file), not counting grok-exporter log writes
+grok    Writing the results to the grok-exporter log
+
+The first four phases end when the source finishes. The report and grok phases come afterwards, on
+the reporting thread.
+
+Every phase is also recorded as a span: the stage name, when it started (in seconds since the start
+of the run, from a monotonic clock), and how long it took. The spans for each source are written to
+the grok-exporter log and debug log as a structured record, so that where the time went can be
+examined per source (when choosing GOSS_SCRIPT_MAX_THREADS, for example).
+"""
+
+from typing import Dict, Iterable, Iterator, List
+
+import contextlib
+import heapq
+import time
+
+from .results import DurationSeconds, SourceResults
+
+PHASES = ("wait", "fetch", "exec", "decode", "extract", "report", "grok")
+
+class SourceTimings:
+    """
+    When a source started and finished (in seconds since the start of the run), how many
+    seconds were spent in each phase, and the spans for each phase, as (phase, start, seconds) tuples
+    """
+    __slots__ = ("started", "finished", "phases", "spans")
+
+    def __init__(self):
+        self.started = None
+        self.finished = None
+        self.phases = dict()
+        self.spans = list()
+
+    def add(self, phase: str, seconds: float, start: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+        self.spans.append((phase, start, seconds))
+
+    def wall_seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0
+        return self.finished - self.started
+
+
+class RunTimer:
+    """
+    Tracks the SourceTimings of every source, relative to the start of the run. This is shared by
+    the worker threads (or event loop) and the reporting thread. Each source only ever has its
+    timings updated by one thread at a time.
+    """
+
+    def __init__(self):
+        self.run_started = time.monotonic()
+        self.timings: Dict[str, SourceTimings] = dict()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.run_started
+
+    def source_timings(self, source: str) -> SourceTimings:
+        try:
+            return self.timings[source]
+        except KeyError:
+            return self.timings.setdefault(source, SourceTimings())
+
+    def source_started(self, source: str) -> None:
+        timings = self.source_timings(source)
+        timings.started = self.elapsed()
+        timings.add("wait", timings.started, 0)
+
+    def source_phase(self, source: str, phase: str, seconds: float) -> None:
+        """
+        Records a phase of the source which just ended, having taken the specified number of seconds
+        """
+        self.source_timings(source).add(phase, seconds, self.elapsed() - seconds)
+
+    @contextlib.contextmanager
+    def span(self, source: str, phase: str) -> Iterator[None]:
+        """
+        Records the time spent in the with block as a phase of the source
+        """
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            self.source_timings(source).add(phase, self.elapsed() - start, start)
+
+    def source_finished(self, source: str) -> None:
+        timings = self.source_timings(source)
+        timings.finished = self.elapsed()
+        if timings.started is None:
+            timings.started = timings.finished
+
+
+def seconds_str(seconds: float) -> str:
+    return f"{seconds:.3f}"
+
+def timings_dict(timings: SourceTimings) -> dict:
+    data = { phase: round(timings.phases.get(phase, 0), 6) for phase in PHASES }
+    data["wall"] = round(timings.wall_seconds(), 6)
+    return data
+
+def source_timing_records(run_timer: RunTimer, nodes: Dict[str, str]) -> Iterator[dict]:
+    """
+    Yields a structured record of the spans for each source, as JSON-able dicts, sorted by node and source
+    """
+    for source, timings in sorted(run_timer.timings.items(), key=lambda item: (nodes.get(item[0], ""), item[0])):
+        yield { "Source": source,
+                "Node": nodes.get(source, ""),
+                "Started (seconds)": None if timings.started is None else round(timings.started, 6),
+                "Finished (seconds)": None if timings.finished is None else round(timings.finished, 6),
+                "Phases (seconds)": timings_dict(timings),
+                "Spans": [ { "Stage": phase, "Start (seconds)": round(start, 6), "Seconds": round(seconds, 6) }
+                           for phase, start, seconds in timings.spans ] }
+
+def perf_report_data(source_results: Iterable[SourceResults], nodes: Dict[str, str], run_timer: RunTimer,
+                     top: int) -> dict:
+    """
+    Returns the performance report, as a JSON-able dict. nodes maps each source to its node name
+    (sources which did not produce results, such as ones which timed out, are included in the
+    critical path and phase totals).
+    """
+    source_results = list(source_results)
+    slowest_tests = heapq.nlargest(top, ( (entry.duration_nanoseconds, entry.title, results.node_name, results.source)
+                                           for results in source_results
+                                           for entry in results.selected_results ))
+    slowest_source_per_node = dict()
+    for results in source_results:
+        current = slowest_source_per_node.get(results.node_name)
+        if current is None or results.total_duration.to_nanoseconds() > current.total_duration.to_nanoseconds():
+            slowest_source_per_node[results.node_name] = results
+
+    phase_totals = { phase: 0 for phase in PHASES }
+    for timings in run_timer.timings.values():
+        for phase, seconds in timings.phases.items():
+            phase_totals[phase] = phase_totals.get(phase, 0) + seconds
+
+    critical_path = None
+    finished = [ (timings.finished, source) for source, timings in run_timer.timings.items()
+                 if timings.finished is not None ]
+    if finished:
+        finished_seconds, source = max(finished)
+        critical_path = { "Source": source,
+                          "Node": nodes.get(source, ""),
+                          "Finished (seconds)": round(finished_seconds, 6),
+                          "Phases (seconds)": timings_dict(run_timer.timings[source]) }
+
+    return {
+        "Run Time (seconds)": round(run_timer.elapsed(), 6),
+        "Slowest Tests": [ { "Test Name": title, "Node": node_name, "Source": source,
+                             "Execution Time (seconds)": DurationSeconds(duration_ns) }
+                           for duration_ns, title, node_name, source in slowest_tests ],
+        "Slowest Source Per Node": [ { "Node": node_name, "Source": results.source,
+                                       "Total Execution Time (seconds)": results.total_duration,
+                                       "Phases (seconds)": timings_dict(run_timer.source_timings(results.source)) }
+                                     for node_name, results in sorted(slowest_source_per_node.items()) ],
+        "Critical Path": critical_path,
+        "Time By Phase (seconds)": { phase: round(seconds, 6) for phase, seconds in phase_totals.items() } }
+
+def phases_str(phases: dict) -> str:
+    return ", ".join(f"{phase} {seconds_str(seconds)}" for phase, seconds in phases.items())
+
+def perf_report_lines(report: dict) -> List[str]:
+    """
+    Returns the performance report formatted as lines of text
+    """
+    lines = [ f"Performance report (run time {seconds_str(report['Run Time (seconds)'])} seconds)" ]
+    if report["Slowest Tests"]:
+        lines.append(f"Slowest tests (top {len(report['Slowest Tests'])}):")
+        lines.extend(f"    {test['Execution Time (seconds)']} seconds: {test['Test Name']} "
+                     f"(Node: {test['Node']}, Source: {test['Source']})"
+                     for test in report["Slowest Tests"])
+    if report["Slowest Source Per Node"]:
+        lines.append("Slowest source per node:")
+        lines.extend(f"    Node: {source['Node']}, Source: {source['Source']}, "
+                     f"Total Execution Time: {source['Total Execution Time (seconds)']} seconds "
+                     f"({phases_str(source['Phases (seconds)'])})"
+                     for source in report["Slowest Source Per Node"])
+    critical_path = report["Critical Path"]
+    if critical_path is not None:
+        lines.append(f"Critical path: Source: {critical_path['Source']} (Node: {critical_path['Node']}) "
+                     f"finished {seconds_str(critical_path['Finished (seconds)'])} seconds into the run "
+                     f"({phases_str(critical_path['Phases (seconds)'])})")
+    lines.append(f"Time by phase, summed over all sources: {phases_str(report['Time By Phase (seconds)'])}")
+    return lines
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to optional profiling of a script run, using cProfile (CPU time by function)
+and tracemalloc (memory allocations by source line). The profiler output is written to files in the
+log directory of the run:
+
+profile.pstats      cProfile statistics, which can be loaded with the pstats module (or snakeviz, etc.)
+profile.txt         The functions with the highest cumulative time, as text
+tracemalloc.snap    tracemalloc snapshot, which can be loaded with tracemalloc.Snapshot.load
+tracemalloc.txt     The current and peak traced memory, and the source lines with the largest allocations
+
+cProfile only profiles the thread which runs the script itself. With the threads engine, the time the
+worker threads spend fetching and decoding results does not appear in it (the asyncio engine runs
+everything on the main thread). tracemalloc traces allocations from every thread.
+
+The profiler modules are only imported when profiling is enabled.
+"""
+
+from typing import Iterator, List, TYPE_CHECKING
+
+import contextlib
+import io
+import logging
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+from .common import fmt_exc
+
+# Number of entries written to the text summaries
+PROFILE_TOP = 50
+# Number of frames stored for each traced memory allocation
+TRACEMALLOC_FRAMES = 1
+
+def write_cprofile(profiler: "cProfile.Profile", log_dir: str) -> List[str]:
+    import pstats
+    pstats_path = f"{log_dir}/profile.pstats"
+    text_path = f"{log_dir}/profile.txt"
+    profiler.dump_stats(pstats_path)
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    with open(text_path, "wt") as text_file:
+        text_file.write(text.getvalue())
+    return [ pstats_path, text_path ]
+
+def write_tracemalloc(snapshot: "tracemalloc.Snapshot", current: int, peak: int, log_dir: str) -> List[str]:
+    snapshot_path = f"{log_dir}/tracemalloc.snap"
+    text_path = f"{log_dir}/tracemalloc.txt"
+    snapshot.dump(snapshot_path)
+    with open(text_path, "wt") as text_file:
+        text_file.write(f"Current traced memory: {current} bytes\n")
+        text_file.write(f"Peak traced memory: {peak} bytes\n")
+        text_file.write(f"Top {PROFILE_TOP} source lines by allocated memory:\n")
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+            text_file.write(f"{stat}\n")
+    return [ snapshot_path, text_path ]
+
+@contextlib.contextmanager
+def profiled_run(profilers: List[str], log_dir: str) -> Iterator[List[str]]:
+    """
+    Runs the with block under the specified profilers ("cprofile" and/or "tracemalloc"), and then writes
+    their output to log_dir. Yields a list, to which the paths of the files written are added on exit.
+    Problems writing the profiler output are logged, but never raised, so that profiling cannot change
+    the outcome of the run.
+    """
+    written = list()
+    if not profilers:
+        yield written
+        return
+    import cProfile
+    import tracemalloc
+    profiler = cProfile.Profile() if "cprofile" in profilers else None
+    if "tracemalloc" in profilers:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield written
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        # Take the tracemalloc snapshot first, so that it does not include writing the cProfile output
+        snapshot = None
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        if profiler is not None:
+            try:
+                written.extend(write_cprofile(profiler, log_dir))
+            except Exception as e:
+                logging.warning(f"Unable to write cProfile output to {log_dir}: {fmt_exc(e)}")
+        if snapshot is not None:
+            try:
+                written.extend(write_tracemalloc(snapshot, current, peak, log_dir))
+            except Exception as e:
+                logging.warning(f"Unable to write tracemalloc output to {log_dir}: {fmt_exc(e)}")
+        for path in written:
+            logging.info(f"Profiler output written to {path}")
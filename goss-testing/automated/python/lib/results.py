@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the compact in-memory representation of Goss test results.
+
+Only the fields which are reported are kept for each test, and the strings are interned,
+so that the same test run on many nodes (or many sources) shares a single copy of its title,
+description, and summary. This keeps memory use proportional to the number of distinct tests,
+rather than to the size of the raw JSON returned by Goss.
+"""
+
+from typing import Tuple
+
+import sys
+
+# Goss result 0 -> pass, 1 -> fail, 2 -> skip
+RESULT_STRINGS = ("PASS", "FAIL", "SKIPPED")
+
+class DurationSeconds:
+    """
+    Ensures that when the entries are dumped as JSON in grok_exporter_logger.py,
+    the desired formatting of the duration in seconds is preserved.
+    """
+    __slots__ = ("nanoseconds",)
+
+    def __init__(self, nanoseconds: int):
+        self.nanoseconds = nanoseconds
+
+    @property
+    def seconds(self) -> float:
+        return self.nanoseconds / 1000000000.0
+
+    def to_nanoseconds(self) -> int:
+        return self.nanoseconds
+
+    def __repr__(self) -> str:
+        # Print 9 decimal places because the minimum possible value is 0.000000001 (1 nanosecond)
+        return f"{self.seconds:.9f}"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def to_json(self):
+        """
+        Used by the custom-JSON-encoding function in the grok_exporter_logger module
+        """
+        return self.__repr__()
+
+
+def intern_string(s) -> str:
+    """
+    Interns s if it is a string. Anything else is converted to a string first, since
+    Goss metadata is free-form and may not always be a string.
+    """
+    return sys.intern(s if isinstance(s, str) else str(s))
+
+
+class ResultsEntry:
+    """
+    The result of a single Goss test. The duration is stored as an integer number of
+    nanoseconds, and only turned into a DurationSeconds object when it is needed.
+    """
+    __slots__ = ("result_raw", "title", "summary", "duration_nanoseconds", "description")
+
+    def __init__(self, result_entry_raw: dict):
+        self.result_raw = result_entry_raw["result"]
+        self.title = intern_string(result_entry_raw["title"])
+        self.summary = intern_string(result_entry_raw["summary-line"])
+        self.duration_nanoseconds = result_entry_raw["duration"]
+        self.description = intern_string(result_entry_raw["meta"]["desc"])
+
+    @property
+    def duration_seconds(self) -> DurationSeconds:
+        return DurationSeconds(self.duration_nanoseconds)
+
+    @property
+    def result_string(self) -> str:
+        if 0 <= self.result_raw < len(RESULT_STRINGS):
+            return RESULT_STRINGS[self.result_raw]
+        # This should never happpen
+        return f"UNKNOWN (Goss result = {self.result_raw})"
+
+    def sort_key(self) -> Tuple[str, int]:
+        return self.title, self.result_raw
+
+    def multiline_string(self, source: str, node_name: str) -> str:
+        """
+        Return a string of the results formatted as a multi-line string,
+        followed by a blank line
+        """
+        return ( f"Result: {self.result_string}\n"
+                 f"Source: {source}\n"
+                 f"Test Name: {self.title}\n"
+                 f"Description: {self.description}\n"
+                 f"Test Summary: {self.summary}\n"
+                 f"Execution Time: {self.duration_seconds} seconds\n"
+                 f"Node: {node_name}\n\n" )
+
+    def dict(self, source: str, node_name: str) -> dict:
+        """
+        Return the results in dict format.
+
+        To avoid JSON printing the seconds duration in scientific notation (which causes problems
+        for the grok exporter that parses the log), we record it here as a string in the non-scientific format.
+        """
+        return { "Result Code": self.result_raw,
+                 "Result String": self.result_string,
+                 "Source": source,
+                 "Test Name": self.title,
+                 "Description": self.description,
+                 "Test Summary": self.summary,
+                 "Execution Time (seconds)": self.duration_seconds,
+                 "Execution Time (nanoseconds)": self.duration_nanoseconds,
+                 "Node": node_name }
+
+    def __repr__(self) -> str:
+        return f"ResultsEntry({self.result_string}: {self.title})"
+
+
+class SourceResults:
+    """
+    The extracted test results for a single source. The results are held in a tuple, sorted by
+    title and result. This is all that is kept for a source once its raw JSON has been discarded.
+    """
+    __slots__ = ("source", "node_name", "selected_results", "failed_count", "total_duration", "retries")
+
+    def __init__(self, source: str, node_name: str, selected_results: Tuple[ResultsEntry, ...],
+                 failed_count: int, total_duration: DurationSeconds, retries: int = 0):
+        self.source = source
+        self.node_name = intern_string(node_name)
+        self.selected_results = selected_results
+        self.failed_count = failed_count
+        self.total_duration = total_duration
+        self.retries = retries
+
+    def sort_key(self) -> Tuple[str, str]:
+        return self.node_name, self.source
+
+    def __repr__(self) -> str:
+        return (f"SourceResults(source={self.source}, node_name={self.node_name}, "
+                f"num_results={len(self.selected_results)}, failed_count={self.failed_count}, "
+                f"total_duration={self.total_duration}, retries={self.retries})")
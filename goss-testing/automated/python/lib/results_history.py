@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to the historical results database, which records the result and
+execution time of every test from every run of print_goss_json_results.py, so that trends
+across runs can be queried (see goss_results_history.py).
+
+The database is a local SQLite file. Test names and node/source pairs are each stored once and
+referred to by ID, so each test result only costs a few integers. Each run is added in a single
+transaction, and old runs are deleted afterwards, so that the file stays within a fixed number
+of runs and a fixed size.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import os
+import sqlite3
+
+from .results import DurationSeconds, SourceResults
+
+SCHEMA_VERSION = 1
+
+# Goss result codes
+RESULT_PASS = 0
+RESULT_FAIL = 1
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+           run_id INTEGER PRIMARY KEY,
+           timestamp TEXT NOT NULL,
+           hostname TEXT NOT NULL,
+           log_dir TEXT NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS tests (
+           test_id INTEGER PRIMARY KEY,
+           title TEXT NOT NULL UNIQUE)""",
+    """CREATE TABLE IF NOT EXISTS sources (
+           source_id INTEGER PRIMARY KEY,
+           node TEXT NOT NULL,
+           source TEXT NOT NULL,
+           UNIQUE (node, source))""",
+    """CREATE TABLE IF NOT EXISTS results (
+           run_id INTEGER NOT NULL,
+           source_id INTEGER NOT NULL,
+           test_id INTEGER NOT NULL,
+           result INTEGER NOT NULL,
+           duration_ns INTEGER NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id)",
+    "CREATE INDEX IF NOT EXISTS results_by_test ON results (source_id, test_id, run_id)" ]
+
+# When the database is over its size limit, this fraction of the remaining runs (or at least one run)
+# is deleted at a time, until it is back under the limit
+PRUNE_FRACTION = 0.1
+
+# (node, source, title) for a single test on a single source
+TestKey = Tuple[str, str, str]
+
+class ResultsHistoryException(Exception):
+    pass
+
+
+class DurationTrend:
+    """
+    The execution times of a single test on a single source, over some number of runs
+    """
+    __slots__ = ("node", "source", "title", "durations")
+
+    def __init__(self, node: str, source: str, title: str):
+        self.node = node
+        self.source = source
+        self.title = title
+        self.durations = list()
+
+    def median(self) -> DurationSeconds:
+        # Only needed by the history queries, so it is not imported when recording a run
+        import statistics
+        return DurationSeconds(int(statistics.median(self.durations)))
+
+    def maximum(self) -> DurationSeconds:
+        return DurationSeconds(max(self.durations))
+
+
+class ResultsHistory:
+    """
+    The results history database. Use as a context manager, so that it is always closed.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30):
+        self.db_path = db_path
+        try:
+            self.conn = sqlite3.connect(db_path, timeout=timeout)
+            self.create_schema()
+        except sqlite3.Error as e:
+            raise ResultsHistoryException(f"Unable to open results history database {db_path}: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def create_schema(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        if version != 0:
+            raise ResultsHistoryException(f"Results history database {self.db_path} has unsupported schema "
+                                          f"version {version} (expected {SCHEMA_VERSION})")
+        # auto_vacuum has to be set before any tables are created. INCREMENTAL lets pruning give
+        # space back to the filesystem without rewriting the whole file.
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        with self.conn:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def lookup_ids(self, table: str, id_column: str, columns: Tuple[str, ...],
+                   values: Iterable[Tuple]) -> Dict[Tuple, int]:
+        """
+        Returns a map from each tuple of column values to its ID in the table, adding any that are missing
+        """
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        ids = dict()
+        for value in values:
+            if value in ids:
+                continue
+            self.conn.execute(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                              f"VALUES ({', '.join('?' for _ in columns)})", value)
+            ids[value] = self.conn.execute(f"SELECT {id_column} FROM {table} WHERE {where}", value).fetchone()[0]
+        return ids
+
+    def add_run(self, timestamp: str, hostname: str, log_dir: str,
+                source_results: Iterable[SourceResults]) -> int:
+        """
+        Adds the results of a run, in a single transaction. Returns the ID of the new run.
+        """
+        source_results = list(source_results)
+        with self.conn:
+            run_id = self.conn.execute("INSERT INTO runs (timestamp, hostname, log_dir) VALUES (?, ?, ?)",
+                                       (timestamp, hostname, log_dir)).lastrowid
+            source_ids = self.lookup_ids("sources", "source_id", ("node", "source"),
+                                         ((results.node_name, results.source) for results in source_results))
+            test_ids = self.lookup_ids("tests", "test_id", ("title",),
+                                       ((entry.title,) for results in source_results
+                                                       for entry in results.selected_results))
+            for results in source_results:
+                source_id = source_ids[(results.node_name, results.source)]
+                self.conn.executemany(
+                    "INSERT INTO results (run_id, source_id, test_id, result, duration_ns) VALUES (?, ?, ?, ?, ?)",
+                    ((run_id, source_id, test_ids[(entry.title,)], entry.result_raw, entry.duration_nanoseconds)
+                     for entry in results.selected_results))
+        return run_id
+
+    def size_bytes(self) -> int:
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def delete_oldest_runs(self, keep: int) -> int:
+        """
+        Deletes all but the most recent keep runs. Returns the number of runs deleted.
+        """
+        with self.conn:
+            oldest_kept = self.conn.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT 1 OFFSET ?",
+                                            (keep - 1,)).fetchone()
+            if oldest_kept is None:
+                return 0
+            self.conn.execute("DELETE FROM results WHERE run_id < ?", oldest_kept)
+            deleted = self.conn.execute("DELETE FROM runs WHERE run_id < ?", oldest_kept).rowcount
+            if deleted:
+                self.conn.execute("DELETE FROM tests WHERE test_id NOT IN (SELECT DISTINCT test_id FROM results)")
+                self.conn.execute("DELETE FROM sources WHERE source_id NOT IN (SELECT DISTINCT source_id FROM results)")
+        if deleted:
+            self.conn.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    def prune(self, max_runs: int, max_bytes: int) -> int:
+        """
+        Deletes the oldest runs, so that at most max_runs remain, and the database is no
+        larger than max_bytes (unless a single run is larger than that).
+        Returns the number of runs deleted.
+        """
+        deleted = self.delete_oldest_runs(keep=max_runs)
+        while self.size_bytes() > max_bytes:
+            num_runs = self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            if num_runs <= 1:
+                break
+            deleted += self.delete_oldest_runs(keep=num_runs - max(1, int(num_runs * PRUNE_FRACTION)))
+        return deleted
+
+    def recent_run_ids(self, num_runs: int, skip_runs: int = 0) -> List[int]:
+        """
+        Returns the IDs of the most recent num_runs runs (after skipping the skip_runs most recent runs),
+        in order from oldest to newest
+        """
+        rows = self.conn.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ? OFFSET ?",
+                                 (num_runs, skip_runs)).fetchall()
+        return [ row[0] for row in reversed(rows) ]
+
+    def runs(self, num_runs: int) -> List[Tuple[int, str, str, str, int]]:
+        """
+        Returns (run ID, timestamp, hostname, log directory, number of results) for the most
+        recent num_runs runs, newest first
+        """
+        return self.conn.execute(
+            "SELECT run_id, timestamp, hostname, log_dir, "
+            "(SELECT COUNT(*) FROM results WHERE results.run_id = runs.run_id) "
+            "FROM runs ORDER BY run_id DESC LIMIT ?", (num_runs,)).fetchall()
+
+    def test_results(self, run_ids: List[int]) -> Iterable[Tuple[str, str, str, int, int, int]]:
+        """
+        Yields (node, source, title, run ID, result, duration in nanoseconds) for every test
+        in the given runs, ordered by node, source, title, and run.
+
+        Goss records one result for each property it checks, all with the same title, so the
+        results of a test in a run are combined first: it fails if any property failed (otherwise
+        it passes if any property passed, otherwise it was skipped), and its duration is the sum of
+        the property durations. This is the same as the gateway metrics (see gateway_metrics.py).
+        """
+        if not run_ids:
+            return iter(())
+        return self.conn.execute(
+            "SELECT s.node, s.source, t.title, r.run_id, "
+            f"CASE WHEN MAX(r.result = {RESULT_FAIL}) THEN {RESULT_FAIL} "
+            f"WHEN MAX(r.result = {RESULT_PASS}) THEN {RESULT_PASS} ELSE MAX(r.result) END, "
+            "SUM(r.duration_ns) "
+            "FROM results r JOIN sources s USING (source_id) JOIN tests t USING (test_id) "
+            "WHERE r.run_id BETWEEN ? AND ? "
+            "GROUP BY s.node, s.source, t.title, r.run_id "
+            "ORDER BY s.node, s.source, t.title, r.run_id", (run_ids[0], run_ids[-1]))
+
+    def duration_trends(self, run_ids: List[int]) -> Dict[TestKey, DurationTrend]:
+        trends = dict()
+        for node, source, title, _, _, duration_ns in self.test_results(run_ids):
+            key = (node, source, title)
+            try:
+                trend = trends[key]
+            except KeyError:
+                trend = trends[key] = DurationTrend(node, source, title)
+            trend.durations.append(duration_ns)
+        return trends
+
+    def slowest_tests(self, num_runs: int, limit: int) -> List[DurationTrend]:
+        """
+        Returns the tests with the highest median execution time over the last num_runs runs
+        """
+        trends = self.duration_trends(self.recent_run_ids(num_runs))
+        return sorted(trends.values(), key=lambda trend: trend.median().to_nanoseconds(), reverse=True)[:limit]
+
+    def flapping_tests(self, num_runs: int, min_changes: int) -> List[Tuple[TestKey, int, List[int]]]:
+        """
+        Returns ((node, source, title), number of result changes, results) for the tests whose result
+        changed at least min_changes times over the last num_runs runs, with the most changes first
+        """
+        flapping = list()
+        previous_key, results = None, list()
+        rows = self.test_results(self.recent_run_ids(num_runs))
+        for node, source, title, _, result, _ in list(rows) + [(None, None, None, None, None, None)]:
+            key = (node, source, title)
+            if key != previous_key:
+                changes = sum(1 for a, b in zip(results, results[1:]) if a != b)
+                if previous_key is not None and changes >= min_changes:
+                    flapping.append((previous_key, changes, results))
+                previous_key, results = key, list()
+            results.append(result)
+        return sorted(flapping, key=lambda entry: (-entry[1], entry[0]))
+
+    def duration_regressions(self, num_runs: int, baseline_runs: int, min_ratio: float,
+                             min_duration_ns: int) -> List[Tuple[DurationTrend, DurationTrend, float]]:
+        """
+        Compares the median execution time of each test over the last num_runs runs with its median
+        over the baseline_runs runs before those. Returns (recent trend, baseline trend, ratio) for the
+        tests which got at least min_ratio times slower (and whose recent median is at least
+        min_duration_ns), with the largest ratio first.
+        """
+        recent = self.duration_trends(self.recent_run_ids(num_runs))
+        baseline = self.duration_trends(self.recent_run_ids(baseline_runs, skip_runs=num_runs))
+        regressions = list()
+        for key, recent_trend in recent.items():
+            baseline_trend = baseline.get(key)
+            if baseline_trend is None:
+                continue
+            recent_ns = recent_trend.median().to_nanoseconds()
+            baseline_ns = max(1, baseline_trend.median().to_nanoseconds())
+            ratio = recent_ns / baseline_ns
+            if ratio >= min_ratio and recent_ns >= min_duration_ns:
+                regressions.append((recent_trend, baseline_trend, ratio))
+        return sorted(regressions, key=lambda entry: entry[2], reverse=True)
+
+
+def record_run(db_path: str, timestamp: str, hostname: str, log_dir: str,
+               source_results: Iterable[SourceResults], max_runs: int, max_bytes: int) -> int:
+    """
+    Adds a run to the results history database (creating it if needed), and prunes old runs.
+    Returns the ID of the new run.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    with ResultsHistory(db_path) as history:
+        try:
+            run_id = history.add_run(timestamp=timestamp, hostname=hostname, log_dir=log_dir,
+                                     source_results=source_results)
+            history.prune(max_runs=max_runs, max_bytes=max_bytes)
+        except sqlite3.Error as e:
+            raise ResultsHistoryException(f"Unable to update results history database {db_path}: {e}") from e
+    return run_id
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to retrying requests to Goss endpoints which fail for reasons that are
+likely to be transient -- for example, while goss-servers.service is being restarted during an
+upgrade.
+"""
+
+import random
+
+from .timeouts import Deadline
+
+class RetryPolicy:
+    """
+    Bounded retries with exponential backoff and full jitter. Before retry number n (counting from 0),
+    the delay is chosen at random between 0 and min(max_delay, base_delay * 2**n) seconds. The jitter
+    keeps many requests that failed at the same moment from all being retried at the same moment.
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry_number: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry_number)))
+
+    def next_delay(self, retry_number: int, deadline: Deadline):
+        """
+        Returns how long to wait before making retry number retry_number, or None if no
+        retry should be made (because the retries are exhausted, or because the retry
+        could not be made before the deadline).
+        """
+        if retry_number >= self.max_retries:
+            return None
+        delay = self.delay(retry_number)
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+def retries_string(retries: int, last_reason: str = "") -> str:
+    """
+    Returns a suffix for a message about a source, saying how many times its request was retried
+    (empty if it was not retried), and why it was last retried (if last_reason is given)
+    """
+    if retries == 0:
+        return ""
+    retries_text = f"after {retries} {'retry' if retries == 1 else 'retries'}"
+    if last_reason:
+        return f" ({retries_text}; the last retry was because of: {last_reason})"
+    return f" ({retries_text})"
+
+def is_goss_results_body(body: bytes) -> bool:
+    """
+    Cheap check of whether a response body looks like a complete set of Goss JSON results.
+    This does not decode the JSON (that happens later), but it does catch empty, truncated,
+    and non-JSON responses.
+    """
+    body = body.strip()
+    return body.startswith(b"{") and body.endswith(b"}")
+
+def is_retryable_status(status_code: int, body: bytes) -> bool:
+    """
+    Only responses which mean that the suite was not run are retried: a 502 (from a proxy in front of
+    the endpoint), and a 503 without Goss results (the server is not ready). Goss uses 503 to report
+    test failures, so a 503 with results is a real answer. A 500 means that Goss could not run the
+    suite, which will happen again, and a 504 from the Goss gateway comes after a run of the suite
+    that took GOSS_GATEWAY_RUN_TIMEOUT seconds, so neither is retried (retrying them would run the
+    whole suite on the node again).
+    """
+    if status_code == 502:
+        return True
+    if status_code == 503:
+        return not is_goss_results_body(body)
+    return False
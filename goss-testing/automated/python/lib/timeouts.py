@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Helper functions for Goss Python automated scripts
+
+These functions relate to limiting how long the Goss test sources are allowed to run.
+"""
+
+from typing import Optional
+
+import time
+
+class Deadline:
+    """
+    The time (on the monotonic clock) by which an entire run must be finished.
+    A deadline of 0 seconds never expires.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        if seconds > 0:
+            self.expires = time.monotonic() + seconds
+        else:
+            self.expires = None
+
+    def remaining(self) -> Optional[float]:
+        """
+        Returns the number of seconds left before the deadline (never less than 0),
+        or None if there is no deadline.
+        """
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def cap(self, timeout: Optional[float]) -> Optional[float]:
+        """
+        Returns the smaller of the timeout and the time remaining before the deadline.
+        A timeout of 0 (or None) means no timeout. Returns None if neither applies.
+        """
+        remaining = self.remaining()
+        if timeout is None or timeout <= 0:
+            return remaining
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
+
+
+class SourceTimeout:
+    """
+    Recorded as the result for a source that did not finish within its timeout, or before the
+    deadline. This lets timed out sources be reported separately from test failures and from
+    other errors.
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def timeout_message(source: str, timeout: Optional[float]) -> str:
+    if timeout is None:
+        return f"Timed out waiting for {source}"
+    return f"Timed out after {timeout:.1f} seconds waiting for {source}"
+
+def deadline_message(source: str, deadline: Deadline) -> str:
+    return f"Run deadline ({deadline.seconds:g} seconds) reached before {source} completed"
@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022-2023 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022-2023,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -44,11 +44,60 @@ to be a Goss test/suite file. It will be executed and its results will be parsed
 - Otherwise, it is assumed to be a file containing Goss test results in JSON
 format.
 
-As each source is processed, the failures are displayed, along with a single line summary
-of the overall results for that source.
+As each source completes, its failures are displayed right away, without waiting for any
+slower sources. By default (GOSS_SCRIPT_FAILURE_VIEW=grouped), each distinct failure (by test name
+and summary line) is displayed in full the first time any source reports it, and after that only a
+one-line count of failures is shown for each source as it completes. Once all sources are done, each
+distinct failure is summarized on one line, with a compact list of the nodes it failed on (the output
+file also gets its minimum, median, and maximum execution time). Set GOSS_SCRIPT_FAILURE_VIEW=per-node
+to instead display every failure from every source as it completes. The full results for every source are written to the output file at the end,
+sorted by node and source, along with a single line summary of the overall results for each
+source.
 
 At the end, a final single line summary is printed.
 
+Goss file and URL sources are run in parallel. By default this uses a thread pool, whose size can
+be set with the GOSS_SCRIPT_MAX_THREADS environment variable. If GOSS_SCRIPT_ENGINE is set to
+"asyncio", then all of these sources are instead run on a single asyncio event loop, with at most
+GOSS_SCRIPT_MAX_IN_FLIGHT of them in progress at once. This scales better to very large numbers
+of sources.
+
+Each of these sources is given GOSS_SCRIPT_CONNECT_TIMEOUT seconds to connect (URL sources)
+and GOSS_SCRIPT_READ_TIMEOUT seconds to return its results (for Goss files, this limits how long
+Goss may run). The entire run is limited to GOSS_SCRIPT_DEADLINE seconds; any sources which have
+not finished by then are cancelled. Sources which time out are reported separately from test
+failures and other errors, and the results from all other sources are still summarized.
+Setting any of these to 0 disables that limit.
+
+Requests to URL sources which fail to connect, or which get a 502, or a 503 without Goss results (so the
+suite was not run), are retried up to GOSS_SCRIPT_MAX_RETRIES times, with randomized exponential backoff
+(see GOSS_SCRIPT_RETRY_BACKOFF and GOSS_SCRIPT_RETRY_MAX_BACKOFF), as long as the deadline allows.
+The number of retries for each source is included in its results summary.
+
+The results of every run are also added to a local SQLite database (GOSS_SCRIPT_HISTORY_DB), which
+keeps only the most recent runs and is bounded in size. It can be queried for the slowest tests,
+flapping tests, and execution time regressions with goss_results_history.py.
+
+If GOSS_SCRIPT_BASELINE_SAVE is set to a file path, a compact snapshot of the results of the run (the
+result and execution time of each test on each node) is saved there. If GOSS_SCRIPT_BASELINE_COMPARE
+is set to such a file, the results of the run are compared with it, and the tests which newly fail,
+newly pass, are missing, or got at least GOSS_SCRIPT_BASELINE_SLOW_RATIO times slower are reported.
+These comparisons do not change the exit code.
+
+A performance report is written to the output file at the end of the run. It lists the slowest
+GOSS_SCRIPT_PERF_REPORT_TOP tests, the slowest source on each node, and the critical path (the
+source which finished last), along with how much time was spent waiting to start, fetching results
+from URLs, running Goss, and decoding JSON. The critical path is also shown on the screen. If
+GOSS_SCRIPT_PERF_REPORT_JSON is set to a file path, the report is also written there as JSON.
+The timing spans for each source (and the engine settings for the run) are also written to the
+grok-exporter log and debug log as structured records. The time spent in each phase is also written
+to GOSS_SCRIPT_METRICS_FILE, from which the Goss gateway exports it on its /metrics endpoint. Where
+the metrics endpoint is scraped, the grok-exporter log can be turned off with
+GOSS_SCRIPT_GROK_EXPORTER_LOG=false.
+
+If GOSS_SCRIPT_PROFILE is set to a comma-separated list of profilers (cprofile, tracemalloc, or all),
+the run is profiled with them, and their output is written to the log directory of the run.
+
 The script creates a log directory when it is executed. The location of this directory is
 included at the top of the script output. Two files are generated there. One is a terse log file,
 which is mainly intended to help with debugging of the script itself. The other is a verbose output
@@ -56,10 +105,11 @@ file, where full test results are written (not just failures).
 
 Exit codes:
 
-All tests passed            0
-At least one test failed    1
-Usage error                 2
-Other error                 3
+All tests passed                0
+At least one test failed        1
+Usage error                     2
+Other error                     3
+At least one source timed out   4
 
 If multiple exit codes apply, the highest one is used.
 """
@@ -68,8 +118,29 @@ from lib.common import err_text,                    \
                        fmt_exc,                     \
                        get_hostname,                \
                        goss_base,                   \
+                       goss_script_baseline_compare, \
+                       goss_script_baseline_min_seconds, \
+                       goss_script_baseline_save,   \
+                       goss_script_baseline_slow_ratio, \
+                       goss_script_connect_timeout, \
+                       goss_script_deadline,        \
+                       goss_script_engine,          \
+                       goss_script_failure_view,    \
+                       goss_script_grok_exporter_log, \
+                       goss_script_history_db,      \
+                       goss_script_history_max_mb,  \
+                       goss_script_history_max_runs, \
                        goss_script_log_level,       \
+                       goss_script_max_in_flight,   \
+                       goss_script_max_retries,     \
                        goss_script_max_threads,     \
+                       goss_script_metrics_file,    \
+                       goss_script_perf_report_json, \
+                       goss_script_perf_report_top, \
+                       goss_script_profile,         \
+                       goss_script_read_timeout,    \
+                       goss_script_retry_backoff,   \
+                       goss_script_retry_max_backoff, \
                        log_dir,                     \
                        log_goss_env_variables,      \
                        log_values,                  \
@@ -81,32 +152,95 @@ from lib.common import err_text,                    \
                        StringList,                  \
                        strip_path,                  \
                        time_pid_unique_string,      \
+                       timestamp_string,            \
                        warn_text
 
-from lib.grok_exporter_logger import grok_exporter_log,      \
+from lib.baseline import Baseline,              \
+                         BaselineComparison,    \
+                         BaselineException,     \
+                         BaselineKey
+
+from lib.endpoints import load_goss_endpoint_registry
+
+from lib.failure_groups import FailureGroups
+
+from lib.gateway_metrics import write_aggregator_metrics
+
+from lib.grok_exporter_logger import data_to_json,           \
+                                     grok_exporter_log,      \
                                      GROK_EXPORTER_LOG_DIR,  \
                                      JSONDict
 
-from typing import Callable, Dict, List, Tuple
+from lib.http_sessions import close_goss_http_session,      \
+                              goss_http_session,            \
+                              is_retryable_error,           \
+                              is_timeout_error,             \
+                              url_host_count
+
+from lib.retry import is_retryable_status,  \
+                      retries_string,       \
+                      RetryPolicy
+
+from lib.json_stream import iter_json_object,  \
+                            JsonStreamError
+
+from lib.output_sinks import start_output_sinks,    \
+                             stop_output_sinks,     \
+                             write_line
+
+from lib.perf_report import perf_report_data,       \
+                            perf_report_lines,      \
+                            RunTimer,               \
+                            source_timing_records
+
+from lib.profiling import profiled_run
+
+from lib.results import DurationSeconds,    \
+                        ResultsEntry,       \
+                        SourceResults
+
+from lib.timeouts import deadline_message,      \
+                         Deadline,              \
+                         SourceTimeout,         \
+                         timeout_message
+
+# Modules which are slow to import, and only needed on some paths (asyncio, concurrent.futures,
+# requests, subprocess, and sqlite3), are imported where they are used, to keep startup fast
+from typing import Callable, Dict, Iterable, List, TextIO, Tuple
 
 import argparse
-import concurrent.futures
+import atexit
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import re
-import requests
-import subprocess
 import sys
 import threading
+import time
 import traceback
 
 RC_TESTFAIL = 1
 RC_USAGE = 2
 RC_ERROR = 3
+RC_TIMEOUT = 4
+
+# How many tests to list on the screen for each kind of change since the baseline
+BASELINE_SCREEN_LIMIT = 20
+
+# How long past the deadline to wait for sources that have not honored it, before abandoning them
+DEADLINE_GRACE_SECONDS = 5
 
 outfile = None
 grok_exporter_outfile = None
+# These are set by run()
+MY_LOG_FILE = None
+MY_OUTPUT_FILE = None
+GROK_EXPORTER_LOG_FILE = None
+# Total seconds spent writing to the grok-exporter log, for the grok phase of the source timings.
+# Only the reporting thread writes to it.
+grok_exporter_seconds = 0.0
 
 MY_BASENAME = strip_path(__file__)
 
@@ -115,8 +249,11 @@ def log_to_grok_exporter(msg: str, data: JSONDict=None) -> None:
     """
     Add a line to the grok-exporter log file.
     """
+    global grok_exporter_seconds
+    started = time.monotonic()
     grok_exporter_log(message=msg, script_name=MY_BASENAME, outfile=grok_exporter_outfile,
                       data=data)
+    grok_exporter_seconds += time.monotonic() - started
         
 
 def outfile_print(s: str) -> None:
@@ -124,8 +261,7 @@ def outfile_print(s: str) -> None:
     if outfile == None:
         return
     try:
-        outfile.write(f"{s}\n")
-        outfile.flush()
+        write_line(outfile, s)
     except Exception as e:
         msg = f"Error writing to output file. {fmt_exc(e)}"
         logging.error(msg)
@@ -173,40 +309,58 @@ def print_reading_test_results_message(node: str, label: str = "") -> None:
         stdout_print(f"Reading test results for node {warn_text(node)}")
         outfile_print(f"Reading test results for node {node}")
 
-def read_and_decode_json(input_file: str, node: str) -> dict:
+def read_and_extract_results(input_file: str, node: str) -> Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds]:
+    """
+    Reads Goss JSON results from a file or stdin. The JSON is decoded incrementally, one test result
+    at a time, so the text of the file is never held in memory all at once.
+    Returns the same values as extract_results_data.
+    """
     if input_file == "stdin" or input_file[:6] == "stdin:":
         logging.debug("Reading standard input for JSON results")
         if input_file == "stdin":
             print_reading_test_results_message(node)
         else:
             print_reading_test_results_message(node, input_file[6:])
-        input = sys.stdin.read()
-    else:
-        print_reading_test_results_message(node, input_file)
-        logging.debug(f"Reading {input_file} for JSON results")
-        try:
-            with open(input_file, "rt") as infile:
-                input = infile.read()
-        except Exception as e:
-            # Add a newline before printing errors
-            print_newline()
-            multi_print(traceback.format_exc(), outfile_print, logging.error)
-            raise ScriptException(f"Problem reading input file {input_file}. {fmt_exc(e)}")
+        return stream_results_data(sys.stdin, input_file)
 
+    print_reading_test_results_message(node, input_file)
+    logging.debug(f"Reading {input_file} for JSON results")
     try:
-        return json.loads(input)
+        infile = open(input_file, "rt")
     except Exception as e:
         # Add a newline before printing errors
         print_newline()
-        log_values(logging.debug, input=input)
         multi_print(traceback.format_exc(), outfile_print, logging.error)
-        raise ScriptException(f"Error decoding JSON from {input_file}. {fmt_exc(e)}")
+        raise ScriptException(f"Problem reading input file {input_file}. {fmt_exc(e)}")
+    with infile:
+        return stream_results_data(infile, input_file)
+
+
+class SourceTimeoutException(ScriptException):
+    pass
 
 
 class JsonResultsCollection:
-    def __init__(self):
+    def __init__(self, session=None, connect_timeout: float = 0, read_timeout: float = 0,
+                 deadline: Deadline = None, retry_policy: RetryPolicy = None, run_timer: RunTimer = None):
         self.lock = threading.Lock()
         self.results_map = dict()
+        # Number of times the request to each URL source was retried, and why it was last retried
+        self.retries_map = dict()
+        # Shared requests.Session used for all URL sources
+        self.session = session
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        if deadline is None:
+            deadline = Deadline(0)
+        self.deadline = deadline
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_retries=0, base_delay=0, max_delay=0)
+        self.retry_policy = retry_policy
+        # Records where the time for each source went, for the performance report
+        if run_timer is None:
+            run_timer = RunTimer()
+        self.run_timer = run_timer
 
     # This just makes sure that log_values makes a single call to
     # the logging method, guaranteeing that the entry will all go in together. That way it won't be interleaved
@@ -220,200 +374,299 @@ class JsonResultsCollection:
         """
         Takes the lock and then sets the json_results_map[source] entry to be result
         """
+        self.run_timer.source_finished(source)
         with self.lock:
             self.results_map[source] = result
 
+    def pop_result(self, source: str):
+        """
+        Takes the lock and then removes and returns the json_results_map[source] entry.
+        Raises KeyError if there is no entry for the source.
+        """
+        with self.lock:
+            return self.results_map.pop(source)
+
+    def source_started(self, source: str) -> None:
+        self.run_timer.source_started(source)
+
+    def source_phase(self, source: str, phase: str, seconds: float) -> None:
+        self.run_timer.source_phase(source, phase, seconds)
+
+    def source_retried(self, source: str, reason: str) -> None:
+        with self.lock:
+            retries, _ = self.retries_map.get(source, (0, ""))
+            self.retries_map[source] = (retries + 1, reason)
+
+    def pop_retries(self, source: str) -> Tuple[int, str]:
+        """
+        Returns the number of times the request to the source was retried, and the reason for the last retry
+        """
+        with self.lock:
+            return self.retries_map.pop(source, (0, ""))
+
+    def retry_delay(self, input_url: str, retry_number: int, reason: str):
+        """
+        Returns the number of seconds to wait before retrying the request, or None if it should not be retried
+        """
+        delay = self.retry_policy.next_delay(retry_number, self.deadline)
+        if delay is not None:
+            logging.warning(f"GET request to {input_url} failed ({reason}); retrying in {delay:.2f} seconds")
+            self.source_retried(input_url, reason)
+        return delay
+
     # input_url suffices as a unique name for this function in a multi-threading context, as we do not
     # permit duplicate URLs. It is important to include this in all logging calls made in this function,
     # in order to identify which thread was making the call. Also, 
     def get_json_from_input_url(self, input_url: str) -> None:
-        logging.info(f"Making GET request to {input_url}")
-        try:
-            resp = requests.get(input_url)
-        except Exception as e:
-            logging.error(f"Unexpected error attempting GET request to {input_url}: {traceback.format_exc()}")
-            self.send_result(input_url, f"Unexpected error attempting GET request to {input_url}: {fmt_exc(e)}")
+        retry_number = 0
+        fetch_started = time.monotonic()
+        while True:
+            # Neither timeout is allowed to go past the deadline. Once it has been reached (before the
+            # first attempt, or while waiting to retry), the source has timed out; requests does not
+            # accept timeouts of 0.
+            timeouts = (self.deadline.cap(self.connect_timeout), self.deadline.cap(self.read_timeout))
+            if self.deadline.expired() or any(timeout is not None and timeout <= 0 for timeout in timeouts):
+                logging.error(f"Run deadline reached before GET request to {input_url} completed")
+                self.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+                self.source_timeout(input_url, deadline_message(input_url, self.deadline))
+                return
+            logging.info(f"Making GET request to {input_url}")
+            try:
+                resp = self.session.get(input_url, timeout=timeouts)
+            except Exception as e:
+                if is_retryable_error(e):
+                    delay = self.retry_delay(input_url, retry_number, fmt_exc(e))
+                    if delay is not None:
+                        time.sleep(delay)
+                        retry_number += 1
+                        continue
+                self.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+                self.get_json_error(input_url, e, timeouts)
+                return
+            if is_retryable_status(resp.status_code, resp.content):
+                delay = self.retry_delay(input_url, retry_number, f"Status code {resp.status_code}")
+                if delay is not None:
+                    resp.close()
+                    time.sleep(delay)
+                    retry_number += 1
+                    continue
+            self.source_phase(input_url, "fetch", time.monotonic() - fetch_started)
+            self.url_response(input_url, resp.status_code, resp.reason, resp.headers, resp.content)
             return
 
-        JsonResultsCollection.log_values(logging.debug, input_url=input_url, status_code=resp.status_code, reason=resp.reason, headers=resp.headers, ok=resp.ok)
+    def get_json_error(self, input_url: str, e: Exception, timeouts: Tuple[float, float]) -> None:
+        """
+        Records the final outcome of a GET request which raised an exception (and was not retried)
+        """
+        if is_timeout_error(e):
+            logging.error(f"Timed out making GET request to {input_url}: {fmt_exc(e)}")
+            # A timeout while connecting is also a (retryable) connection error; a timeout waiting
+            # for the response is not
+            if self.deadline.expired():
+                self.source_timeout(input_url, deadline_message(input_url, self.deadline))
+            elif is_retryable_error(e):
+                self.source_timeout(input_url, timeout_message(input_url, timeouts[0]))
+            else:
+                self.source_timeout(input_url, timeout_message(input_url, timeouts[1]))
+            return
+        logging.error(f"Unexpected error attempting GET request to {input_url}: {traceback.format_exc()}")
+        self.url_error(input_url, e)
+
+    def url_error(self, input_url: str, exc: Exception) -> None:
+        self.send_result(input_url, f"Unexpected error attempting GET request to {input_url}: {fmt_exc(exc)}")
+
+    def source_timeout(self, source: str, message: str) -> None:
+        self.send_result(source, SourceTimeout(message))
+
+    def url_response(self, input_url: str, status_code: int, reason: str, headers, body: bytes) -> None:
+        JsonResultsCollection.log_values(logging.debug, input_url=input_url, status_code=status_code, reason=reason, headers=headers, ok=(status_code < 400))
         # Expected responses are 200 (meaning no tests failed) or 503 (which can mean either that there were test failures OR that there was
         # another Goss issue, like syntax errors in the test files).
-        if resp.status_code not in { 200, 503 }:
-            err_msg = f"Status code {resp.status_code} received from Goss URL {input_url}: {resp.text}"
+        if status_code not in { 200, 503 }:
+            err_msg = f"Status code {status_code} received from Goss URL {input_url}: {body.decode(errors='replace')}"
             logging.error(err_msg)
             self.send_result(input_url, err_msg)
             return
 
         logging.info(f"Decoding JSON response body from {input_url}")
+        decode_started = time.monotonic()
         try:
-            json_results = resp.json()
+            json_results = json.loads(body)
         except Exception as e:
             logging.error(f"Unexpected error decoding JSON response from {input_url}: {traceback.format_exc()}")
-            JsonResultsCollection.log_values(logging.debug, input_url=input_url, text=resp.text)
+            JsonResultsCollection.log_values(logging.debug, input_url=input_url, text=body.decode(errors='replace'))
             self.send_result(input_url, f"Unexpected error decoding JSON response from {input_url}: {fmt_exc(e)}")
             return
 
+        self.source_phase(input_url, "decode", time.monotonic() - decode_started)
         JsonResultsCollection.log_values(logging.debug, input_url=input_url, json_results=json_results)
         logging.info(f"Successfully decoded JSON response from {input_url}")
         self.send_result(input_url, json_results)
         return
 
     def run_goss_decode_json(self, suite_or_test: str) -> None:
-        cmd_list = ["/usr/bin/goss", "-g", suite_or_test, "v", "--format", "json"]
+        import subprocess
+        cmd_list = goss_validate_cmd(suite_or_test)
+        timeout = self.deadline.cap(self.read_timeout)
         logging.debug(f"Running: {cmd_list}")
-        cmd_result = subprocess.run(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-        cmd_out = cmd_result.stdout
-        cmd_err = cmd_result.stderr
+        exec_started = time.monotonic()
+        try:
+            # On timeout, subprocess.run kills the goss process before raising the exception
+            cmd_result = subprocess.run(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+                                        timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logging.error(f"Timed out running {cmd_list}")
+            self.source_timeout(suite_or_test, timeout_message(suite_or_test, timeout))
+            return
+        self.source_phase(suite_or_test, "exec", time.monotonic() - exec_started)
+        self.goss_output(suite_or_test, cmd_list, cmd_result.returncode, cmd_result.stdout, cmd_result.stderr)
+
+    def goss_output(self, suite_or_test: str, cmd_list: StringList, returncode: int, cmd_out: bytes, cmd_err: bytes) -> None:
         # The goss command will return non-0 both in the case of test failures and in the case of other errors
         # (such as syntax errors in the test files). From what I can tell, it will return 1 in either case.
         # If the output of the command has valid JSON results data, then we're happy.
 
         # If the stderr is not empty, we log these values as warnings. Otherwise we log them as debug.
         if len(cmd_err) != 0:
-            JsonResultsCollection.log_values(logging.warning, cmd_list=cmd_list, returncode=cmd_result.returncode, stderr=cmd_err)
+            JsonResultsCollection.log_values(logging.warning, cmd_list=cmd_list, returncode=returncode, stderr=cmd_err)
         else:
-            JsonResultsCollection.log_values(logging.debug, cmd_list=cmd_list, returncode=cmd_result.returncode, stderr=cmd_err)
+            JsonResultsCollection.log_values(logging.debug, cmd_list=cmd_list, returncode=returncode, stderr=cmd_err)
         logging.info(f"Command completed: {cmd_list}")
+        decode_started = time.monotonic()
         try:
             json_results = json.loads(cmd_out)
         except Exception as e:
             # This is most likely going to happen if the goss command failed
-            JsonResultsCollection.log_values(logging.error, cmd_list=cmd_list, returncode=cmd_result.returncode,
+            JsonResultsCollection.log_values(logging.error, cmd_list=cmd_list, returncode=returncode,
                                 stdout=cmd_out, stderr=cmd_err)
             logging.error(f"Unexpected error decoding JSON output from {cmd_list}: {traceback.format_exc()}")
             self.send_result(suite_or_test, f"Unexpected error decoding JSON output from {cmd_list}: {fmt_exc(e)}")
             return
-        JsonResultsCollection.log_values(logging.debug, cmd_list=cmd_list, returncode=cmd_result.returncode,
+        self.source_phase(suite_or_test, "decode", time.monotonic() - decode_started)
+        JsonResultsCollection.log_values(logging.debug, cmd_list=cmd_list, returncode=returncode,
                             stdout=cmd_out, stderr=cmd_err)
         logging.info(f"Successfully decoded JSON output from {cmd_list}")
         self.send_result(suite_or_test, json_results)
         return
 
     def run_test_decode_json(self, source: str) -> None:
-        if is_url(source):
+        self.source_started(source)
+        if self.deadline.expired():
+            # This source was still waiting for a worker thread when the deadline was reached
+            self.source_timeout(source, deadline_message(source, self.deadline))
+        elif is_url(source):
             self.get_json_from_input_url(input_url=source)
         else:
             self.run_goss_decode_json(suite_or_test=source)
 
 
-class DurationSeconds:
-    """
-    Ensures that when the entries are dumped as JSON in grok_exporter_logger.py,
-    the desired formatting of the duration in seconds is preserved.
-    """
+def goss_validate_cmd(suite_or_test: str) -> StringList:
+    return ["/usr/bin/goss", "-g", suite_or_test, "v", "--format", "json"]
 
-    def __init__(self, nanoseconds: int):
-        self.nanoseconds = nanoseconds
-        self.seconds = nanoseconds / 1000000000.0
 
-    def to_nanoseconds(self) -> int:
-        return self.nanoseconds
-
-    def __repr__(self) -> str:
-        # Print 9 decimal places because the minimum possible value is 0.000000001 (1 nanosecond)
-        return f"{self.seconds:.9f}"
+def results_format_error(e: Exception) -> ScriptException:
+    # Add a newline before printing errors
+    print_newline()
+    multi_print(traceback.format_exc(), outfile_print, logging.error)
+    return ScriptException(f"Goss test results from have unexpected format. {fmt_exc(e)}")
 
-    def __str__(self) -> str:
-        return self.__repr__()
+def finish_results_data(selected_results: List[ResultsEntry],
+                        summary: dict) -> Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds]:
+    try:
+        # Get some of the summary fields
+        failed_count = summary["failed-count"]
+        total_duration = DurationSeconds(summary["total-duration"])
+    except (KeyError, TypeError) as e:
+        raise results_format_error(e)
 
-    def to_json(self):
-        """
-        Used by the custom-JSON-encoding function in the grok_exporter_logger module
-        """
-        return self.__repr__()
-
-
-class ResultsEntry:
-    def __init__(self, result_entry_raw: dict):
-        self.result_raw = result_entry_raw["result"]
-        self.title = result_entry_raw["title"]
-        self.summary = result_entry_raw["summary-line"]
-        self.duration_seconds = DurationSeconds(result_entry_raw["duration"])
-        self.resource = result_entry_raw["resource-id"]
-        self.description = result_entry_raw["meta"]["desc"]
-        if self.result_raw == 0:
-            # Test passed
-            self.result_string = "PASS"
-        elif self.result_raw == 1:
-            # Test failed
-            self.result_string = "FAIL"
-        elif self.result_raw == 2:
-            # Test was skipped (this is not usually due to error)
-            self.result_string = "SKIPPED"
-        else:
-            # This should never happpen
-            self.result_string = f"UNKNOWN (Goss result = {self.result_raw})"
+    if len(selected_results) == 0:
+        raise ScriptException("No Goss test results found.")
 
-    def multiline_string(self, source: str, node_name: str) -> str:
-        """
-        Return a string of the results formatted as a multi-line string,
-        followed by a blank line
-        """
-        return ( f"Result: {self.result_string}\n"
-                 f"Source: {source}\n"
-                 f"Test Name: {self.title}\n"
-                 f"Description: {self.description}\n"
-                 f"Test Summary: {self.summary}\n"
-                 f"Execution Time: {self.duration_seconds} seconds\n"
-                 f"Node: {node_name}\n\n" )
-
-    def dict(self, source: str, node_name: str) -> dict:
-        """
-        Return the results in dict format.
+    # Sort the results
+    selected_results.sort(key=ResultsEntry.sort_key)
+    return tuple(selected_results), failed_count, total_duration
 
-        To avoid JSON printing the seconds duration in scientific notation (which causes problems
-        for the grok exporter that parses the log), we record it here as a string in the non-scientific format.
-        """
-        return { "Result Code": self.result_raw,
-                 "Result String": self.result_string,
-                 "Source": source,
-                 "Test Name": self.title,
-                 "Description": self.description,
-                 "Test Summary": self.summary,
-                 "Execution Time (seconds)": self.duration_seconds,
-                 "Execution Time (nanoseconds)": self.duration_seconds.to_nanoseconds(),
-                 "Node": node_name }
-
-
-def extract_results_data(json_results: dict) -> Tuple[List[ResultsEntry], int, DurationSeconds]:
+def extract_results_data(json_results: dict) -> Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds]:
+    """
+    Returns only the compact results entries and summary fields, so that the caller
+    does not need to keep the decoded JSON around once this returns.
+    """
     try:
         results = json_results["results"]
         # Make list of results with a numeric result
         selected_results = [ ResultsEntry(result_entry_raw=result_entry)
                              for result_entry in results
                              if isinstance(result_entry["result"], int) ]
-
-        # Get some of the summary fields
         summary = json_results["summary"]
-        failed_count = summary["failed-count"]
-        total_duration = DurationSeconds(summary["total-duration"])
     except (KeyError, TypeError) as e:
+        raise results_format_error(e)
+    return finish_results_data(selected_results, summary)
+
+def stream_results_data(infile: TextIO, input_file: str) -> Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds]:
+    """
+    Like extract_results_data, but decodes the Goss JSON from infile as it is read. Each test result
+    is converted to a ResultsEntry as soon as it has been decoded, and the summary is handled once
+    the end of the data is reached.
+    """
+    selected_results = list()
+    summary = None
+    try:
+        for key, value in iter_json_object(infile, array_keys=("results",)):
+            if key == "results[]":
+                # Keep only results with a numeric result
+                if isinstance(value["result"], int):
+                    selected_results.append(ResultsEntry(result_entry_raw=value))
+            elif key == "results":
+                # Not an array, so it cannot hold any results
+                raise TypeError(f"results field has unexpected type {type(value).__name__}")
+            elif key == "summary":
+                summary = value
+        if summary is None:
+            raise KeyError("summary")
+    except JsonStreamError as e:
         # Add a newline before printing errors
         print_newline()
         multi_print(traceback.format_exc(), outfile_print, logging.error)
-        raise ScriptException(f"Goss test results from have unexpected format. {fmt_exc(e)}")
+        raise ScriptException(f"Error decoding JSON from {input_file}. {fmt_exc(e)}")
+    except (KeyError, TypeError) as e:
+        raise results_format_error(e)
+    return finish_results_data(selected_results, summary)
 
-    if len(selected_results) == 0:
-        raise ScriptException("No Goss test results found.")
+def source_summary_data(source: str, node_name: str, total_count: int, pass_count: int,
+                        fail_count: int, skip_count: int, unknown_count: int,
+                        total_duration: DurationSeconds, retries: int) -> dict:
+    return {
+        "Node": node_name,
+        "Source": source,
+        "Total Tests": total_count,
+        "Total Passed": pass_count,
+        "Total Failed": fail_count,
+        "Total Skipped": skip_count,
+        "Total Unknown": unknown_count,
+        "Total Execution Time": f"{total_duration} seconds",
+        "Retries": retries }
 
-    # Sort the results
-    selected_results.sort(key=lambda r: (r.title, r.result_raw))
-    return selected_results, failed_count, total_duration
+def failed_count_mismatch(failed_count: int, manual_fail_count: int) -> str:
+    return f"failed_count in results ({failed_count}) does not match manual tally of test failures ({manual_fail_count})"
 
-def show_results(source: str, selected_results: List[ResultsEntry], failed_count: int,
-                 total_duration: DurationSeconds, node_name: str) -> Tuple[int, int, int]:
+def show_results(results: SourceResults, failure_groups: FailureGroups = None) -> Tuple[int, int, int, int]:
     """
-    Prints all results to outfile.
-    Prints failures to stderr.
+    Prints failures to stderr. If failure_groups is specified, the failures are also added to it (to be
+    summarized once all sources are done), and only the first occurrence of each is printed in full,
+    followed by a one-line count of the failures for the source.
+    Writes all results to the grok-exporter log.
     Prints warnings if no tests executed or the Goss data contains inconsistencies.
-    Returns (# of passes, # of failures, # of unknown results)
+    The full results are not written to the outfile here -- that is done by
+    write_results_to_outfile, once all sources have been processed.
+    Returns (# of passes, # of failures, # of skips, # of unknown results)
     """
     manual_unknown_count=0
     manual_pass_count=0
     manual_fail_count=0
     manual_skip_count=0    
-    total_count=len(selected_results)
-    for res in selected_results:
+    source, node_name = results.source, results.node_name
+    total_count=len(results.selected_results)
+    for res in results.selected_results:
         bad_result = False
         # Goss result 0 -> pass, 1 -> fail, 2 -> skip
         if res.result_string == "PASS":
@@ -431,43 +684,336 @@ def show_results(source: str, selected_results: List[ResultsEntry], failed_count
             manual_unknown_count+=1
             bad_result = True
 
-        # Write to output file
-        result_lines=res.multiline_string(source=source, node_name=node_name)
-        outfile_print(result_lines)
-
         # Write to grok-exporter log
         log_to_grok_exporter("Test result", data=res.dict(source=source, node_name=node_name))
 
         # If the test failed or had an unknown result, also print to stderr in red
-        if bad_result:
+        if bad_result and failure_groups is not None:
+            if failure_groups.add(res, source=source, node_name=node_name):
+                stdout_print("")
+                stderr_print(err_text(res.multiline_string(source=source, node_name=node_name)))
+        elif bad_result:
             # If this is the first error for this source, add a newline before it
             if (manual_fail_count + manual_unknown_count) == 1:
-                print_newline()
-            stderr_print(err_text(result_lines))
+                stdout_print("")
+            stderr_print(err_text(res.multiline_string(source=source, node_name=node_name)))
 
-    summary_data = {
-        "Node": node_name,
-        "Source": source,
-        "Total Tests": total_count,
-        "Total Passed": manual_pass_count,
-        "Total Failed": manual_fail_count,
-        "Total Skipped": manual_skip_count,
-        "Total Unknown": manual_unknown_count,
-        "Total Execution Time": f"{total_duration} seconds" }
+    summary_data = source_summary_data(source=source, node_name=node_name, total_count=total_count,
+                                       pass_count=manual_pass_count, fail_count=manual_fail_count,
+                                       skip_count=manual_skip_count, unknown_count=manual_unknown_count,
+                                       total_duration=results.total_duration, retries=results.retries)
     summary = ', '.join([ f"{key}: {value}" for key, value in summary_data.items() ])
-    multi_print(summary, logging.info, outfile_print)
+    logging.info(summary)
     log_to_grok_exporter("Source test results summary", summary_data)
+    if failure_groups is not None and (manual_fail_count + manual_unknown_count) > 0:
+        stderr_print(err_text(f"Node: {node_name}, Source: {source}: "
+                              f"{manual_fail_count + manual_unknown_count} of {total_count} tests did not pass"))
+    failed_count = results.failed_count
     if failed_count != manual_fail_count:
         # If no errors have been reported yet for this source, add a newline first
         if manual_fail_count == 0:
-            print_newline()
-        mismatch=f"failed_count in results ({failed_count}) does not match manual tally of test failures ({manual_fail_count})"
+            stdout_print("")
+        mismatch=failed_count_mismatch(failed_count, manual_fail_count)
         stderr_print(warn_text(f"WARNING: {mismatch}"))
         logging.warning(mismatch)
-        multi_print(f"WARNING: {mismatch}", outfile_print, log_to_grok_exporter)
+        log_to_grok_exporter(f"WARNING: {mismatch}")
+        stdout_print("")
+
+    return manual_pass_count, manual_fail_count, manual_skip_count, manual_unknown_count
+
+def write_results_to_outfile(results: SourceResults, counts: Tuple[int, int, int, int]) -> None:
+    """
+    Writes all results for a source to the outfile, followed by its summary line.
+    counts is the (passes, failures, skips, unknowns) tuple returned by show_results.
+    """
+    pass_count, fail_count, skip_count, unknown_count = counts
+    source, node_name = results.source, results.node_name
+    for res in results.selected_results:
+        outfile_print(res.multiline_string(source=source, node_name=node_name))
+    summary_data = source_summary_data(source=source, node_name=node_name,
+                                       total_count=len(results.selected_results), pass_count=pass_count,
+                                       fail_count=fail_count, skip_count=skip_count,
+                                       unknown_count=unknown_count, total_duration=results.total_duration,
+                                       retries=results.retries)
+    outfile_print(', '.join([ f"{key}: {value}" for key, value in summary_data.items() ]))
+    if results.failed_count != fail_count:
+        outfile_print(f"\nWARNING: {failed_count_mismatch(results.failed_count, fail_count)}\n")
+
+
+class StreamingResultsReporter:
+    """
+    Reports the results for each source as soon as they are available, rather than waiting
+    for every source to finish. Failures are printed to the screen and all results are written
+    to the grok-exporter log right away. The full per-test output for the outfile is written
+    by replay_to_outfile, sorted by node and source, so that the outfile contents do not depend
+    on the order in which the sources happened to complete.
+    """
+
+    def __init__(self, group_failures: bool = False, run_timer: RunTimer = None):
+        # When failures are grouped, only the first occurrence of each is shown as it is reported; they are
+        # summarized by show_failure_groups, after all sources are done
+        self.failure_groups = FailureGroups() if group_failures else None
+        # The time spent reporting each source is recorded as its report and grok phases
+        if run_timer is None:
+            run_timer = RunTimer()
+        self.run_timer = run_timer
+        self.reported = list()
+        self.timed_out = list()
+        self.total_passed = 0
+        self.total_failed = 0
+        self.total_unknown = 0
+
+    def report(self, results: SourceResults) -> None:
+        log_values(logging.debug, results=results)
+        if not self.reported:
+            multi_print("\nChecking test results", outfile_print, logging.info, stdout_print)
+            stdout_print("Only errors will be printed to the screen")
+        started = self.run_timer.elapsed()
+        grok_started = grok_exporter_seconds
+        passed, failed, skipped, unknown = counts = show_results(results, self.failure_groups)
+        grok_seconds = grok_exporter_seconds - grok_started
+        timings = self.run_timer.source_timings(results.source)
+        timings.add("report", self.run_timer.elapsed() - started - grok_seconds, started)
+        timings.add("grok", grok_seconds, started)
+        self.total_passed += passed
+        self.total_failed += failed
+        self.total_unknown += unknown
+        self.reported.append((results, counts))
+
+    def report_timeout(self, source: str, node_name: str, message: str, retries: int = 0,
+                       retry_reason: str = "") -> None:
+        """
+        Timed out sources are their own category -- they are neither test failures nor errors
+        """
+        message += retries_string(retries, retry_reason)
+        stderr_print(err_text(f"TIMED OUT: {message}"))
+        logging.error(f"Source timed out. {message}")
+        log_to_grok_exporter("Source timed out", { "Node": node_name, "Source": source, "Message": message,
+                                                   "Retries": retries })
+        self.timed_out.append((node_name, source, message))
+
+    def show_failure_groups(self) -> None:
+        """
+        Summarizes each distinct failure on one line on the screen (its details were shown when it was
+        first reported), and in full in the outfile, with the nodes it failed on. The outfile also has the
+        full per-node results, from replay_to_outfile.
+        """
+        if not self.failure_groups:
+            return
+        multi_print(f"\n{len(self.failure_groups)} distinct test failure(s):\n", outfile_print, stdout_print)
+        for group in self.failure_groups.sorted_groups():
+            stderr_print(err_text(group.summary_line()))
+            outfile_print(group.multiline_string())
+
+    def replay_to_outfile(self) -> None:
+        if self.reported:
+            outfile_print("")
+            self.reported.sort(key=lambda entry: entry[0].sort_key())
+            for results, counts in self.reported:
+                write_results_to_outfile(results, counts)
+        if self.timed_out:
+            outfile_print("\nSources which timed out:")
+            for node_name, source, message in sorted(self.timed_out):
+                outfile_print(f"Node: {node_name}, Source: {source}, {message}")
+
+
+def record_results_history(reporter: StreamingResultsReporter, node_name: str) -> None:
+    """
+    Adds the results of this run to the historical results database. Problems with the database
+    are logged, but do not affect the outcome of the run.
+    """
+    db_path = goss_script_history_db()
+    if not db_path:
+        logging.debug("Results history database is disabled")
+        return
+    try:
+        # sqlite3 is only loaded when the history is recorded, at the end of the run
+        from lib.results_history import record_run
+        run_id = record_run(db_path=db_path, timestamp=timestamp_string(), hostname=node_name,
+                            log_dir=os.path.dirname(MY_LOG_FILE),
+                            source_results=[ results for results, _ in reporter.reported ],
+                            max_runs=goss_script_history_max_runs(),
+                            max_bytes=goss_script_history_max_mb()*1024*1024)
+    except Exception as e:
+        multi_print(traceback.format_exc(), logging.warning)
+        logging.warning(f"Unable to record results in history database {db_path}. {fmt_exc(e)}")
+        return
+    log_values(logging.info, history_db=db_path, history_run_id=run_id)
+
+def show_baseline_changes(title: str, keys: List[BaselineKey], print_method: Callable,
+                          details: List[str] = None) -> None:
+    """
+    Writes every change to the outfile, but only the first BASELINE_SCREEN_LIMIT to the screen
+    """
+    if not keys:
+        return
+    multi_print(f"{title} ({len(keys)}):", outfile_print, print_method)
+    for i, (node_name, test_name) in enumerate(keys):
+        line = f"    Node: {node_name}, Test Name: {test_name}"
+        if details is not None:
+            line += f", {details[i]}"
+        outfile_print(line)
+        if i < BASELINE_SCREEN_LIMIT:
+            print_method(line)
+        log_to_grok_exporter("Baseline change", { "Change": title, "Node": node_name, "Test Name": test_name })
+    if len(keys) > BASELINE_SCREEN_LIMIT:
+        print_method(f"    ... and {len(keys) - BASELINE_SCREEN_LIMIT} more (see the full output file)")
+
+def compare_and_save_baseline(reporter: StreamingResultsReporter) -> None:
+    """
+    If requested, compares the results of this run with a saved baseline, and/or saves them as a
+    new baseline. The comparison is informational, and does not affect the outcome of the run.
+    """
+    compare_path, save_path = goss_script_baseline_compare(), goss_script_baseline_save()
+    if not compare_path and not save_path:
+        return
+    current = Baseline.from_results(timestamp=timestamp_string(),
+                                    source_results=[ results for results, _ in reporter.reported ])
+    if compare_path:
+        try:
+            baseline = Baseline.load(compare_path)
+        except BaselineException as e:
+            warning(str(e))
+        else:
+            comparison = BaselineComparison(baseline, current, slow_ratio=goss_script_baseline_slow_ratio(),
+                                            min_duration_ns=int(goss_script_baseline_min_seconds() * 1000000000))
+            multi_print(f"\nChanges since baseline {compare_path} (from {baseline.timestamp}):",
+                        outfile_print, stdout_print)
+            show_baseline_changes("Newly failing", comparison.newly_failing, lambda s: stderr_print(err_text(s)))
+            show_baseline_changes("Newly passing", comparison.newly_passing, stdout_print)
+            show_baseline_changes("Missing", comparison.missing, lambda s: stderr_print(warn_text(s)))
+            show_baseline_changes("Slower", [ slower_test.key for slower_test in comparison.slower ],
+                                  lambda s: stderr_print(warn_text(s)),
+                                  details=[ f"{slower_test.baseline_duration} -> {slower_test.duration} seconds "
+                                            f"({slower_test.ratio:.2f}x)" for slower_test in comparison.slower ])
+            summary_data = comparison.summary_data()
+            summary = ', '.join([ f"{key}: {value}" for key, value in summary_data.items() ])
+            multi_print(summary, outfile_print, stdout_print, logging.info)
+            log_to_grok_exporter("Baseline comparison summary", dict(summary_data, Baseline=compare_path))
+    if save_path:
+        try:
+            current.save(save_path)
+        except BaselineException as e:
+            warning(str(e))
+        else:
+            multi_print(f"Saved results as baseline {save_path}", outfile_print, stdout_print, logging.info)
+
+def show_perf_report(reporter: StreamingResultsReporter, run_timer: RunTimer, source_nodes: Dict[str, str]) -> None:
+    """
+    Writes the performance report to the outfile (and to a JSON file, if GOSS_SCRIPT_PERF_REPORT_JSON
+    is set). Only the critical path is shown on the screen.
+    """
+    report = perf_report_data(source_results=[ results for results, _ in reporter.reported ],
+                              nodes=source_nodes, run_timer=run_timer, top=goss_script_perf_report_top())
+    outfile_print("")
+    for line in perf_report_lines(report):
+        multi_print(line, outfile_print, logging.info)
+        if line.startswith("Critical path:"):
+            stdout_print(f"\n{line}")
+    log_to_grok_exporter("Performance report", { "Critical Path": report["Critical Path"],
+                                                 "Time By Phase (seconds)": report["Time By Phase (seconds)"] })
+    log_source_timings(run_timer, source_nodes)
+    write_run_metrics(report, run_timer)
+    json_path = goss_script_perf_report_json()
+    if not json_path:
+        return
+    try:
+        with open(json_path, "wt") as json_file:
+            json_file.write(data_to_json(report))
+            json_file.write("\n")
+    except Exception as e:
+        warning(f"Unable to write performance report to {json_path}. {fmt_exc(e)}")
+        return
+    multi_print(f"Performance report written to {json_path}", outfile_print, stdout_print, logging.info)
+
+def write_run_metrics(report: dict, run_timer: RunTimer) -> None:
+    """
+    Writes the timings of this run to the run metrics file, for the /metrics endpoint of the Goss gateway.
+    Problems with the file are logged, but do not affect the outcome of the run.
+    """
+    metrics_path = goss_script_metrics_file()
+    if not metrics_path:
+        logging.debug("Run metrics file is disabled")
+        return
+    try:
+        write_aggregator_metrics(metrics_path, run_seconds=report["Run Time (seconds)"],
+                                 sources=len(run_timer.timings), phases=report["Time By Phase (seconds)"])
+    except Exception as e:
+        logging.warning(f"Unable to write run metrics to {metrics_path}. {fmt_exc(e)}")
+        return
+    log_values(logging.debug, metrics_file=metrics_path)
+
+def url_source_suites(sources: Iterable[str]) -> Dict[str, str]:
+    """
+    Returns the Goss suite for each URL source which is a configured Goss endpoint. If the Goss server
+    configuration cannot be loaded (for example, when not run on an NCN), returns an empty dict.
+    """
+    url_sources = [ source for source in sources if is_url(source) ]
+    if not url_sources:
+        return dict()
+    try:
+        registry = load_goss_endpoint_registry()
+    except ScriptException as e:
+        logging.debug(f"Unable to load Goss endpoint registry: {e}")
+        return dict()
+    suites = dict()
+    for source in url_sources:
+        suite = registry.suite_for_url(source)
+        if suite is not None:
+            suites[source] = suite
+    return suites
+
+def log_source_timings(run_timer: RunTimer, source_nodes: Dict[str, str]) -> None:
+    """
+    Writes the run settings which affect its timing, and the spans for each source, to the grok-exporter
+    log and the debug log, as structured records
+    """
+    engine = goss_script_engine()
+    run_data = { "Engine": engine,
+                 "Max Threads": goss_script_max_threads() if engine == "threads" else None,
+                 "Max In Flight": goss_script_max_in_flight() if engine == "asyncio" else None,
+                 "Sources": len(run_timer.timings),
+                 "Run Time (seconds)": round(run_timer.elapsed(), 6) }
+    log_to_grok_exporter("Run timings", run_data)
+    log_values(logging.debug, run_timings=run_data)
+    suites = url_source_suites(run_timer.timings)
+    for record in source_timing_records(run_timer, source_nodes):
+        record["Suite"] = suites.get(record["Source"])
+        log_to_grok_exporter("Source timings", record)
+        log_values(logging.debug, source_timings=record)
+
+def report_json_results(source: str, json_results: dict, node_name: str,
+                        reporter: StreamingResultsReporter, retries: int = 0) -> bool:
+    """
+    Extracts the test results from the decoded JSON for a source and passes them to the reporter.
+    Only the compact results are kept, so the decoded JSON can be freed as soon as this returns.
+    Returns True on success. Returns False if there was a problem (which will already have been
+    reported).
+    """
+    try:
+        with reporter.run_timer.span(source, "extract"):
+            extracted_results = extract_results_data(json_results)
+    except ScriptException as e:
+        error(e)
+        error(f"Skipping {source} due to error\n")
+        return False
+    except Exception as e:
+        # Add a newline before printing errors
         print_newline()
+        multi_print(traceback.format_exc(), outfile_print, logging.error)
+        error(f"Skipping {source} due to error extracting test results from JSON data: {fmt_exc(e)}\n")
+        return False
+    report_extracted_results(source, extracted_results, node_name, reporter, retries=retries)
+    return True
 
-    return manual_pass_count, manual_fail_count, manual_unknown_count
+def report_extracted_results(source: str, extracted_results: Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds],
+                             node_name: str, reporter: StreamingResultsReporter, retries: int = 0) -> None:
+    """
+    Passes the values returned by extract_results_data (or stream_results_data) to the reporter
+    """
+    selected_results, failed_count, total_duration = extracted_results
+    reporter.report(SourceResults(source=source, node_name=node_name, selected_results=selected_results,
+                                  failed_count=failed_count, total_duration=total_duration, retries=retries))
 
 suite_test_file_pattern = "^(?:suites|tests)/[^/]+[.]yaml$"
 suite_test_file_prog = re.compile(suite_test_file_pattern)
@@ -535,19 +1081,34 @@ def main(input_sources: Dict[str, StringList]) -> int:
     # of failures beyond test failures
     unexpected_error = False
     
-    all_results = list()
+    deadline = Deadline(goss_script_deadline())
+    failure_view = goss_script_failure_view()
+    log_values(logging.debug, failure_view=failure_view)
+    # Where the time for each source went, and the node for each source, for the performance report
+    run_timer = RunTimer()
+    source_nodes = dict()
+    reporter = StreamingResultsReporter(group_failures=(failure_view == "grouped"), run_timer=run_timer)
     url_sources = input_sources["url"]
     goss_file_sources = input_sources["goss_file"]
     results_file_sources = input_sources["results_file"]
 
     mynode = get_hostname()
 
+    def timed_read_and_extract_results(source: str) -> Tuple[Tuple[ResultsEntry, ...], int, DurationSeconds]:
+        source_nodes[source] = mynode
+        run_timer.source_started(source)
+        try:
+            return read_and_extract_results(source, mynode)
+        finally:
+            run_timer.source_phase(source, "decode", run_timer.elapsed() - run_timer.source_timings(source).started)
+            run_timer.source_finished(source)
+
     # First handle results files:
     for source in results_file_sources:
         try:
             log_values(logging.debug, source=source)
-            json_results = read_and_decode_json(source, mynode)
-            log_values(logging.info, source=source, node=mynode, json_results=json_results)
+            extracted_results = timed_read_and_extract_results(source)
+            log_values(logging.info, source=source, node=mynode, num_results=len(extracted_results[0]))
         except ScriptException as e:
             error(e)
             error(f"Skipping {source} due to error\n")
@@ -558,87 +1119,107 @@ def main(input_sources: Dict[str, StringList]) -> int:
             error(f"Skipping {source} due to error: {fmt_exc(e)}\n")
             unexpected_error = True
             continue
-        # Extract the results from the JSON
-        try:
-            selected_results, failed_count, total_duration = extract_results_data(json_results)
-        except ScriptException as e:
-            error(e)
-            error(f"Skipping {source} due to error\n")
-            unexpected_error = True
-            continue
-        except Exception as e:
-            # Add a newline before printing errors
-            print_newline()
-            multi_print(traceback.format_exc(), outfile_print, logging.error)
-            error(f"Skipping {source} due to error extracting test results from JSON data: {fmt_exc(e)}\n")
-            unexpected_error = True
-            continue
-        all_results.append({
-            "source": source,
-            "selected_results": selected_results,
-            "failed_count": failed_count,
-            "total_duration": total_duration,
-            "node_name": mynode })
-
-    # Now handle goss files and url sources in parallel
+        report_extracted_results(source, extracted_results, mynode, reporter)
+
+    # Now handle goss files and url sources in parallel. Each source is reported as soon as it
+    # completes, so one slow endpoint does not hold up the results from all of the others.
     parallel_sources = goss_file_sources + url_sources
     if parallel_sources:
-        json_results_collection = JsonResultsCollection()
         multi_print("Running tests", outfile_print, logging.info, stdout_print)
 
-        max_workers = goss_script_max_threads()
-        if max_workers == 0:
-            exec_args = dict()
-        else:
-            exec_args = { "max_workers": max_workers }
-        log_values(logging.debug, exec_args=exec_args)
-        with concurrent.futures.ThreadPoolExecutor(**exec_args) as executor:
-            executor.map(json_results_collection.run_test_decode_json, parallel_sources)
-        json_results_map = json_results_collection.results_map
-        for source in parallel_sources:
+        def report_parallel_source(source: str) -> None:
+            nonlocal unexpected_error
+            retries, retry_reason = json_results_collection.pop_retries(source)
             try:
-                json_results = json_results_map[source]
+                json_results = json_results_collection.pop_result(source)
             except KeyError:
                 error(f"Internal error. Unable to find results OR error message from request to {source}")
                 error(f"Skipping {source} due to error\n")
                 unexpected_error = True
-                continue
+                return
+            if source in url_sources:
+                node = get_node_from_url(source)
+            else:
+                node = mynode
+            source_nodes[source] = node
+            if isinstance(json_results, SourceTimeout):
+                reporter.report_timeout(source, node, json_results.message, retries, retry_reason)
+                return
             if isinstance(json_results, str):
-                error(f"Error encountered running {source} tests: {json_results}")
+                # The error is the reason for the last retry (if it was retried), so it is not repeated
+                error(f"Error encountered running {source} tests: {json_results}{retries_string(retries)}")
                 error(f"Skipping {source} due to error\n")
                 unexpected_error = True
-                continue
-            # Extract the results from the JSON
-            try:
-                selected_results, failed_count, total_duration = extract_results_data(json_results)
-            except ScriptException as e:
-                error(e)
-                error(f"Skipping {source} due to error\n")
-                unexpected_error = True
-                continue
-            except Exception as e:
-                multi_print(traceback.format_exc(), outfile_print, logging.error)
-                error(f"Skipping {source} due to error extracting test results from JSON data: {fmt_exc(e)}\n")
+                return
+            if not report_json_results(source, json_results, node, reporter, retries=retries):
                 unexpected_error = True
-                continue
-            if source in url_sources:
-                node = get_node_from_url(source)
+
+        engine = goss_script_engine()
+        connect_timeout = goss_script_connect_timeout()
+        read_timeout = goss_script_read_timeout()
+        retry_policy = RetryPolicy(max_retries=goss_script_max_retries(), base_delay=goss_script_retry_backoff(),
+                                   max_delay=goss_script_retry_max_backoff())
+        log_values(logging.debug, engine=engine, connect_timeout=connect_timeout, read_timeout=read_timeout,
+                   deadline=deadline.seconds, max_retries=retry_policy.max_retries)
+        if engine == "asyncio":
+            max_in_flight = goss_script_max_in_flight()
+            log_values(logging.debug, max_in_flight=max_in_flight)
+            json_results_collection = JsonResultsCollection(run_timer=run_timer)
+            from lib import async_engine
+            async_engine.run_sources(url_sources=url_sources, goss_sources=goss_file_sources,
+                                     handler=json_results_collection, goss_cmd=goss_validate_cmd,
+                                     max_in_flight=max_in_flight, on_complete=report_parallel_source,
+                                     connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                     deadline=deadline, retry_policy=retry_policy)
+        else:
+            import concurrent.futures
+            from lib.daemon_executor import DaemonThreadPoolExecutor
+            max_workers = goss_script_max_threads()
+            if max_workers == 0:
+                exec_args = dict()
             else:
-                node = mynode
-            all_results.append({
-                "source": source,
-                "selected_results": selected_results,
-                "failed_count": failed_count,
-                "total_duration": total_duration,
-                "node_name": node })
+                exec_args = { "max_workers": max_workers }
+            log_values(logging.debug, exec_args=exec_args)
+            if url_sources:
+                session = goss_http_session(max_workers=max_workers, num_hosts=url_host_count(url_sources))
+            else:
+                session = None
+            json_results_collection = JsonResultsCollection(session=session, connect_timeout=connect_timeout,
+                                                            read_timeout=read_timeout, deadline=deadline,
+                                                            retry_policy=retry_policy, run_timer=run_timer)
+            # The workers are daemon threads, so that sources given up on at the deadline cannot keep the
+            # script running after it has reported everything
+            executor = DaemonThreadPoolExecutor(**exec_args)
+            future_to_source = { executor.submit(json_results_collection.run_test_decode_json, source): source
+                                 for source in parallel_sources }
+            # Every source is limited by the deadline on its own, so this only comes into play if one of
+            # them fails to honor it (a server trickling out its response, for example).
+            remaining = deadline.remaining()
+            if remaining is not None:
+                remaining += DEADLINE_GRACE_SECONDS
+            try:
+                for future in concurrent.futures.as_completed(future_to_source, timeout=remaining):
+                    try:
+                        future.result()
+                    except Exception:
+                        multi_print(traceback.format_exc(), outfile_print, logging.error)
+                    report_parallel_source(future_to_source.pop(future))
+            except concurrent.futures.TimeoutError:
+                # Give up on the stragglers
+                for future, source in future_to_source.items():
+                    future.cancel()
+                    json_results_collection.source_timeout(source, deadline_message(source, deadline))
+                    report_parallel_source(source)
+            executor.shutdown(wait=False)
+            close_goss_http_session()
 
     # Finally we handle stdin,
     if input_sources["stdin"]:
         source = input_sources["stdin"][0]
         try:
             log_values(logging.debug, source=source)
-            json_results = read_and_decode_json(source, mynode)
-            log_values(logging.info, source=source, node=mynode, json_results=json_results)
+            extracted_results = timed_read_and_extract_results(source)
+            log_values(logging.info, source=source, node=mynode, num_results=len(extracted_results[0]))
         except ScriptException as e:
             error(e)
             error(f"Skipping {source} due to error\n")
@@ -648,47 +1229,31 @@ def main(input_sources: Dict[str, StringList]) -> int:
             error(f"Skipping {source} due to error: {fmt_exc(e)}\n")
             unexpected_error = True
         else:
-            # Extract the results from the JSON
-            try:
-                selected_results, failed_count, total_duration = extract_results_data(json_results)
-            except ScriptException as e:
-                error(e)
-                error(f"Skipping {source} due to error\n")
-                unexpected_error = True
-            except Exception as e:
-                # Add a newline before printing errors
-                print_newline()
-                multi_print(traceback.format_exc(), outfile_print, logging.error)
-                error(f"Skipping {source} due to error extracting test results from JSON data: {fmt_exc(e)}\n")
-                unexpected_error = True
-            else:
-                all_results.append({
-                    "source": source,
-                    "selected_results": selected_results,
-                    "failed_count": failed_count,
-                    "total_duration": total_duration,
-                    "node_name": mynode })
-
-    total_passed = 0
-    total_failed = 0
-    total_unknown = 0
-    if all_results:
-        multi_print("\nChecking test results", outfile_print, logging.info, stdout_print)
-        stdout_print("Only errors will be printed to the screen")
-        for results in all_results:
-            log_values(logging.debug, results=results)
-            passed, failed, unknown = show_results(**results)
-            total_passed += passed
-            total_failed += failed
-            total_unknown += unknown
+            report_extracted_results(source, extracted_results, mynode, reporter)
+
+    # The outfile gets the full results for every source, in a deterministic order
+    reporter.replay_to_outfile()
+    reporter.show_failure_groups()
+    record_results_history(reporter, mynode)
+    compare_and_save_baseline(reporter)
+    show_perf_report(reporter, run_timer, source_nodes)
+
+    total_passed = reporter.total_passed
+    total_failed = reporter.total_failed
+    total_unknown = reporter.total_unknown
+    total_timed_out = len(reporter.timed_out)
 
     print_newline()
-    if total_unknown == 0:
-        total_summary = f"GRAND TOTAL: {total_passed} passed, {total_failed} failed"
-    else:
-        total_summary = f"GRAND TOTAL: {total_passed} passed, {total_failed} failed, {total_unknown} unknown results"
+    total_summary = f"GRAND TOTAL: {total_passed} passed, {total_failed} failed"
+    if total_unknown > 0:
+        total_summary += f", {total_unknown} unknown results"
+    if total_timed_out > 0:
+        total_summary += f", {total_timed_out} sources timed out"
     multi_print(total_summary, outfile_print, log_to_grok_exporter)
-    if total_passed == 0 and total_failed == 0 and total_unknown == 0:
+    if total_timed_out > 0 and total_failed == 0 and total_unknown == 0:
+        stderr_print(err_text(total_summary))
+        logging.error(total_summary)
+    elif total_passed == 0 and total_failed == 0 and total_unknown == 0:
         stderr_print(warn_text(total_summary))
         logging.warning(total_summary)
         warning("No tests executed")
@@ -703,6 +1268,10 @@ def main(input_sources: Dict[str, StringList]) -> int:
 
     if unexpected_error or total_unknown > 0:
         error("Errors occured during execution beyond just test failures.")
+    if total_timed_out > 0:
+        error(f"{total_timed_out} source(s) did not complete in time. Results from all other sources are shown above.")
+        raise SourceTimeoutException()
+    if unexpected_error or total_unknown > 0:
         raise ScriptException()
     return total_failed
 
@@ -711,9 +1280,11 @@ def setup_logging() -> Tuple[str, str, str]:
     unique_string = time_pid_unique_string()
     
     MY_LOG_DIR = log_dir(script_name=__file__, sub_directory_basename=unique_string)
+    grok_exporter_log_enabled = goss_script_grok_exporter_log()
     try:
         # create the log directory for the grok-exporter logs; it is ok if it already exists
-        os.makedirs(GROK_EXPORTER_LOG_DIR, exist_ok=True)
+        if grok_exporter_log_enabled:
+            os.makedirs(GROK_EXPORTER_LOG_DIR, exist_ok=True)
         
         # create log directory; it is NOT ok if it already exists
         os.makedirs(MY_LOG_DIR, exist_ok=False)
@@ -723,10 +1294,21 @@ def setup_logging() -> Tuple[str, str, str]:
 
     MY_LOG_FILE = f"{MY_LOG_DIR}/log"
     try:
-        logging.basicConfig(filename=MY_LOG_FILE, level=goss_script_log_level())
+        # Log records are written to the file by a listener thread, so that logging from the worker
+        # threads does not wait on file I/O
+        log_file_handler = logging.FileHandler(MY_LOG_FILE)
+        log_file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        log_queue = queue.Queue()
+        log_listener = logging.handlers.QueueListener(log_queue, log_file_handler)
+        # The QueueHandler has no formatter of its own, so records are only formatted once, by the file handler
+        logging.root.addHandler(logging.handlers.QueueHandler(log_queue))
+        logging.root.setLevel(goss_script_log_level())
+        log_listener.start()
     except Exception as e:
         stderr_print(err_text(f"Error configuring script logging. {fmt_exc(e)}"))    
         sys.exit(RC_ERROR)
+    # Make sure every queued log record is written before the script exits
+    atexit.register(log_listener.stop)
 
     MY_OUTPUT_FILE = f"{MY_LOG_DIR}/out"
 
@@ -735,56 +1317,90 @@ def setup_logging() -> Tuple[str, str, str]:
     log_values(logging.info, MY_OUTPUT_FILE=MY_OUTPUT_FILE)
     log_goss_env_variables(logging.debug)
 
-    GROK_EXPORTER_LOG_FILE = f"{GROK_EXPORTER_LOG_DIR}/{unique_string}.log"
+    # If the grok-exporter log is disabled, it is written to /dev/null, so that nothing else changes
+    GROK_EXPORTER_LOG_FILE = f"{GROK_EXPORTER_LOG_DIR}/{unique_string}.log" if grok_exporter_log_enabled else os.devnull
 
     return MY_LOG_FILE, MY_OUTPUT_FILE, GROK_EXPORTER_LOG_FILE
 
 
-# Parse command-line arguments
-input_sources = parse_args()
+def run() -> None:
+    """
+    Runs the script. Nothing is done at import time, and nothing is set up before the command-line
+    arguments have been parsed, so that a usage error (or --help) returns right away.
+    """
+    global MY_LOG_FILE, MY_OUTPUT_FILE, GROK_EXPORTER_LOG_FILE, outfile, grok_exporter_outfile
 
-# Set up logging
-MY_LOG_FILE, MY_OUTPUT_FILE, GROK_EXPORTER_LOG_FILE = setup_logging()
+    # Parse command-line arguments
+    input_sources = parse_args()
 
-log_values(logging.debug, input_sources=input_sources, sys_argv=sys.argv)
+    # Set up logging
+    MY_LOG_FILE, MY_OUTPUT_FILE, GROK_EXPORTER_LOG_FILE = setup_logging()
 
+    log_values(logging.debug, input_sources=input_sources, sys_argv=sys.argv)
 
-with open(MY_OUTPUT_FILE, "wt") as outfile:
-    outfile_print(f"Script debug log file: {MY_LOG_FILE}")
-    with open(GROK_EXPORTER_LOG_FILE, "wt") as grok_exporter_outfile:
-        outfile_print(f"Script grok-exporter log file: {GROK_EXPORTER_LOG_FILE}")
-        log_values(logging.info, GROK_EXPORTER_LOG_FILE=GROK_EXPORTER_LOG_FILE)
-        log_to_grok_exporter("Starting", data={ "sys.argv": sys.argv })
-        try:
-            if main(input_sources) == 0:
-                stdout_print(ok_text("\nPASSED"))
-                outfile_print("\nPASSED")
-                multi_print("PASSED; exiting with return code 0", logging.info, log_to_grok_exporter)
-                sys.exit(0)
-            stderr_print(err_text("\nFAILED"))
-            outfile_print("\nFAILED")
-            multi_print(f"FAILED (failed tests); exiting with return code {RC_TESTFAIL}", logging.error, log_to_grok_exporter)
-            sys.exit(RC_TESTFAIL)
-        except ScriptException:
-            stdout_print(f"Full script output: {MY_OUTPUT_FILE}\nScript debug log: {MY_LOG_FILE}")
-            stderr_print(err_text("\nFAILED"))
-            outfile_print("\nFAILED")
-            multi_print(f"FAILED; exiting with return code {RC_ERROR}", logging.error, log_to_grok_exporter)
-            sys.exit(RC_ERROR)
-        except Exception as e:
-            # For any anticipated exceptions, they would have been caught at a lower level and turned into
-            # ScriptExceptions. So we should print more information about this exception.
-            stdout_print(f"Full script output: {MY_OUTPUT_FILE}\nScript debug log: {MY_LOG_FILE}")
-            multi_print(traceback.format_exc(), logging.error, outfile_print, log_to_grok_exporter)
-            msg = f"Unexpected error. {fmt_exc(e)}"
-            error(msg)
-            log_to_grok_exporter(msg)
-            stderr_print(err_text("\nFAILED"))
-            outfile_print("\nFAILED")
-            multi_print(f"FAILED (unexpected error); exiting with return code {RC_ERROR}", logging.error, log_to_grok_exporter)
-            sys.exit(RC_ERROR)
 
-outfile = None
-grok_exporter_outfile = None
-error("\nPROGRAMMING LOGIC ERROR: This line should never be reached")
-sys.exit(RC_ERROR)
+    with open(MY_OUTPUT_FILE, "wt") as outfile:
+        outfile_print(f"Script debug log file: {MY_LOG_FILE}")
+        with open(GROK_EXPORTER_LOG_FILE, "wt") as grok_exporter_outfile:
+            if GROK_EXPORTER_LOG_FILE == os.devnull:
+                # Do not spend any time formatting log entries which would be thrown away
+                grok_exporter_outfile = None
+                outfile_print("Script grok-exporter log file: disabled (GOSS_SCRIPT_GROK_EXPORTER_LOG)")
+            else:
+                outfile_print(f"Script grok-exporter log file: {GROK_EXPORTER_LOG_FILE}")
+            log_values(logging.info, GROK_EXPORTER_LOG_FILE=GROK_EXPORTER_LOG_FILE)
+            log_to_grok_exporter("Starting", data={ "sys.argv": sys.argv })
+            # From here on, output lines are written by a background thread. Every way out of this block
+            # (including each sys.exit call) goes through the finally clause, which writes out everything
+            # still queued before the out file and grok-exporter log are closed.
+            start_output_sinks()
+            try:
+                # If GOSS_SCRIPT_PROFILE is set, the profiler output is written to the log directory
+                with profiled_run(goss_script_profile(), os.path.dirname(MY_LOG_FILE)) as profile_files:
+                    failed_count = main(input_sources)
+                if profile_files:
+                    outfile_print(f"Profiler output: {' '.join(profile_files)}")
+                if failed_count == 0:
+                    stdout_print(ok_text("\nPASSED"))
+                    outfile_print("\nPASSED")
+                    multi_print("PASSED; exiting with return code 0", logging.info, log_to_grok_exporter)
+                    sys.exit(0)
+                stderr_print(err_text("\nFAILED"))
+                outfile_print("\nFAILED")
+                multi_print(f"FAILED (failed tests); exiting with return code {RC_TESTFAIL}", logging.error, log_to_grok_exporter)
+                sys.exit(RC_TESTFAIL)
+            except SourceTimeoutException:
+                stdout_print(f"Full script output: {MY_OUTPUT_FILE}\nScript debug log: {MY_LOG_FILE}")
+                stderr_print(err_text("\nFAILED (timed out)"))
+                outfile_print("\nFAILED (timed out)")
+                multi_print(f"FAILED (timed out); exiting with return code {RC_TIMEOUT}", logging.error, log_to_grok_exporter)
+                sys.exit(RC_TIMEOUT)
+            except ScriptException:
+                stdout_print(f"Full script output: {MY_OUTPUT_FILE}\nScript debug log: {MY_LOG_FILE}")
+                stderr_print(err_text("\nFAILED"))
+                outfile_print("\nFAILED")
+                multi_print(f"FAILED; exiting with return code {RC_ERROR}", logging.error, log_to_grok_exporter)
+                sys.exit(RC_ERROR)
+            except Exception as e:
+                # For any anticipated exceptions, they would have been caught at a lower level and turned into
+                # ScriptExceptions. So we should print more information about this exception.
+                stdout_print(f"Full script output: {MY_OUTPUT_FILE}\nScript debug log: {MY_LOG_FILE}")
+                multi_print(traceback.format_exc(), logging.error, outfile_print, log_to_grok_exporter)
+                msg = f"Unexpected error. {fmt_exc(e)}"
+                error(msg)
+                log_to_grok_exporter(msg)
+                stderr_print(err_text("\nFAILED"))
+                outfile_print("\nFAILED")
+                multi_print(f"FAILED (unexpected error); exiting with return code {RC_ERROR}", logging.error, log_to_grok_exporter)
+                sys.exit(RC_ERROR)
+            finally:
+                stop_output_sinks()
+
+    outfile = None
+    grok_exporter_outfile = None
+    error("\nPROGRAMMING LOGIC ERROR: This line should never be reached")
+    sys.exit(RC_ERROR)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,6 +1,6 @@
 # MIT License
 #
-# (C) Copyright 2021-2023 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2023,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -87,6 +87,13 @@ ncn_num_pattern="([1-9][0-9][0-9]|0[1-9][0-9]|00[1-9])"
 # When cmsdev tests are run, these test areas will always be included
 default_cms_tests="bos cfs conman ims tftp vcs"
 
+# The local variables for this node (added to the Goss variable file by add_local_vars) are cached in
+# GOSS_VARS_CACHE_DIR for GOSS_VARS_CACHE_TTL seconds (0 disables the cache). Goss variable files created
+# more than GOSS_VARS_GC_MINUTES minutes ago are removed, unless they are still in use (0 disables this).
+GOSS_VARS_CACHE_DIR=${GOSS_VARS_CACHE_DIR:-"/tmp/goss-variables-cache"}
+GOSS_VARS_CACHE_TTL=${GOSS_VARS_CACHE_TTL:-300}
+GOSS_VARS_GC_MINUTES=${GOSS_VARS_GC_MINUTES:-1440}
+
 # Import helper functions
 . "${GOSS_BASE}/scripts/sw_admin_password.sh"
 
@@ -161,141 +168,33 @@ function get_ncns {
     # Regardless of the above, if --exclude-pit is specified, and this function is being called on the PIT node,
     # then ncn-m001 will be excluded from the results.
     #
-    local type_char_pattern type_string
-
-    local masters=N
-    local storage=N
-    local workers=N
-    local exclude_m001=N
-
-    while [[ $# -gt 0 ]]; do
-        case "$1" in
-            "--masters") masters=Y ;;
-            "--storage") storage=Y ;;
-            "--workers") workers=Y ;;
-            "--exclude-pit") if is_pit_node; then exclude_m001=Y ; fi ;;
-            *) err_exit "PROGRAMMING LOGIC ERROR: get_ncns: Invalid argument: '$1'"
-        esac
-        shift
-    done
-    if [[ ${masters} == N && ${storage} == N && ${workers} == N ]]; then masters=Y ; storage=Y; workers=Y; fi
-
-    if [[ ${masters} == N ]]; then
-        # No need to exclude ncn-m001 if we aren't including it in the first place
-        exclude_m001=N
-    fi
-
-    if [[ ${masters} == Y && ${storage} == Y && ${workers} == Y ]]; then
-        type_string="NCN"
-        type_char_pattern="[msw]"
-    else
-        type_string=""
-        type_char_pattern="["
-        if [[ ${masters} == Y ]]; then type_char_pattern+="m" ; type_string+="/master" ; fi
-        if [[ ${storage} == Y ]]; then type_char_pattern+="s" ; type_string+="/storage" ; fi
-        if [[ ${workers} == Y ]]; then type_char_pattern+="w" ; type_string+="/worker" ; fi
-        type_string+=" NCN"
-        # Strip the first character, which is a /
-        type_string=${type_string:1}
-        type_char_pattern="${type_char_pattern}]"
-    fi
-    local ncn_string_pattern="ncn-${type_char_pattern}${ncn_num_pattern}"
-
-    # Define a local function to do the output filtering based on the arguments passed in here.
-    # End with a grep command that will give status code 0 if any output is matched (that is, the output is not blank)
-    if [[ ${exclude_m001} == Y ]]; then
-        function __unique_ncns { grep -oE "${ncn_string_pattern}" | sort -u | grep -v ncn-m001 | grep . ; }
-    else
-        function __unique_ncns { grep -oE "${ncn_string_pattern}" | sort -u | grep . ; }
-    fi
-
     # If the GOSS_TEST_NCN_LIST environment variable has been set, this will be used. This allows users a method to
     # run the automated scripts in cases where the usual methods of obtaining the NCN list does not work.
-    if [[ -n ${GOSS_TEST_NCN_LIST} ]]; then
-        if echo "${GOSS_TEST_NCN_LIST}" | __unique_ncns ; then
-            return 0
-        fi
-        print_warn "GOSS_TEST_NCN_LIST variable is set, but unable to obtain ${type_string} list from it: '${GOSS_TEST_NCN_LIST}'"
-    fi
-
-    if is_pit_node; then
-        if [[ -z ${PITDATA} ]]; then
-            print_warn "The PITDATA environment variable is not set."
-        elif [[ -z ${SYSTEM_NAME} ]]; then
-            print_warn "The SYSTEM_NAME environment variable is not set."
-        else
-            local sys_prep_dir="${PITDATA}/prep/${SYSTEM_NAME}"
-            local sls_json="${sys_prep_dir}/sls_input_file.json"
-            local sys_prep_dnsmasqd_statics="${sys_prep_dir}/dnsmasq.d/statics.conf"
-
-            if [[ ! -s ${sls_json} ]]; then
-                print_warn "The '${sls_json}' file does not exist or is empty"
-            else
-                if cat "${sls_json}" |
-                        jq -r '.Hardware | .[] | select(.Type=="comptype_node" and .TypeString=="Node" and .ExtraProperties.Role=="Management") | .ExtraProperties.Aliases | .[]' |
-                        __unique_ncns
-                then
-                    return 0
-                fi
-                print_warn "Unable to obtain ${type_string} list from '${sls_json}'"
-            fi
-
-            if [[ ! -s ${sys_prep_dnsmasqd_statics} ]]; then
-                print_warn "The '${sys_prep_dnsmasqd_statics}' file does not exist or is empty"
-            else
-                if cat "${sys_prep_dnsmasqd_statics}" | __unique_ncns ; then
-                    return 0
-                fi
-                print_warn "Unable to obtain ${type_string} list from '${sys_prep_dnsmasqd_statics}'"
-            fi
-        fi
-
-        # Final backup option is to use the live dnsmasq statics file
-        local dnsmasqd_statics=/etc/dnsmasq.d/statics.conf
+    #
+    # Otherwise the NCN list is found by goss_ncn_inventory, which queries all of its sources at once, with short
+    # timeouts, and caches the list that it finds (see GOSS_SCRIPT_NCN_INVENTORY_TTL).
+    #
+    local arg
 
-        if [[ ! -s ${dnsmasqd_statics} ]]; then
-            print_warn "The '${dnsmasqd_statics}' file does not exist or is empty"
-        else
-            if cat "${dnsmasqd_statics}" | __unique_ncns ; then
-                return 0
-            fi
-            print_warn "Unable to obtain ${type_string} list from '${dnsmasqd_statics}'"
-        fi
-    else
-        # Not on a PIT node
-
-        # Loop until node names are found
-        while true ; do
-
-            # Try getting node list from basecamp metadata endpoint first
-            if curl -s http://ncn-m001:8888/meta-data | jq -r '.Global.host_records[].aliases[1]' | __unique_ncns ; then
-                return 0
-            fi
-            # No warning message is printed in this case, because this is expected to fail once the PIT node is redeployed
-
-            # Try BSS metadata
-            if curl -s http://api-gw-service-nmn.local:8888/meta-data | jq -r '.Global.host_records[].aliases[1]' | __unique_ncns ; then
-                return 0
-            else
-                print_warn "Unable to obtain ${type_string} list from BSS"
-            fi
-
-            if [[ ! -s /etc/hosts ]]; then
-                print_warn "File does not exist or is empty: /etc/hosts"
-            else
-                if cat /etc/hosts | __unique_ncns ; then
-                    return 0
-                fi
-                print_warn "Unable to obtain ${type_string} list from /etc/hosts"
-            fi
-
-            echo "${type_string} names could not be found. Sleeping for 30 seconds and retrying" 1>&2
-            sleep 30
+    for arg in "$@"; do
+        case "${arg}" in
+            "--masters"|"--storage"|"--workers"|"--exclude-pit") ;;
+            *) err_exit "PROGRAMMING LOGIC ERROR: get_ncns: Invalid argument: '${arg}'"
+        esac
+    done
 
-        done
+    # On the PIT node, the sources are all local files, so there is no point in retrying
+    if is_pit_node; then
+        goss_ncn_inventory "$@"
+        return $?
     fi
-    print_error "Unable to obtain ${type_string} list from any source"
-    return 1
+
+    # Loop until node names are found
+    while ! goss_ncn_inventory "$@" ; do
+        echo "NCN names could not be found. Sleeping for 30 seconds and retrying" 1>&2
+        sleep 30
+    done
+    return 0
 }
 
 # Some Python script wrappers -- they transparently pass their arguments into the scripts, and return the script's return code
@@ -309,6 +208,16 @@ function print_goss_json_results {
     return $?
 }
 
+function goss_url_plan {
+    "${GOSS_BASE}/automated/python/goss_url_plan.py" "$@"
+    return $?
+}
+
+function goss_ncn_inventory {
+    "${GOSS_BASE}/automated/python/goss_ncn_inventory.py" "$@"
+    return $?
+}
+
 function goss_suites_endpoints_ports {
     "${GOSS_BASE}/automated/python/goss_suites_endpoints_ports.py" "$@"
     return $?
@@ -350,12 +259,37 @@ function get_ready_k8s_node
     return 1
 }
 
-function healthcheck_urls_for_master_nodelist
+function goss_plan_entry
 {
-    # Usage: healthcheck_urls_for_master_nodelist <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite
+    # Usage: goss_plan_entry <suite> <node1> [<node2>] ...
+    # Prints a goss_url_plan entry for running the suite on all of the nodes
+    local suite=$1
+    shift
+    local IFS=,
+    echo "${suite}=$*"
+}
+
+function goss_endpoint_urls_for_plan
+{
+    # Usage: goss_endpoint_urls_for_plan <plan entry> [<plan entry>] ...
+    # Prints the URLs for every entry of the plan (see goss_plan_entry), all found in a single call
+    if ! goss_url_plan "$@" ; then
+        print_error "Error finding test URLs for plan: $*"
+        return 1
+    fi
+    return 0
+}
+
+# The *_plan_* functions below print the plan entries for a set of tests. The corresponding *_urls_*
+# functions print the URLs for them. To get the URLs for several sets of tests, it is faster to combine
+# their plans and make a single goss_endpoint_urls_for_plan call.
+
+function healthcheck_plan_for_master_nodelist
+{
+    # Usage: healthcheck_plan_for_master_nodelist <node1> [<node2>] ...
+    local suite after_pit_suite plan ready_node single_suite
     if [[ $# -eq 0 ]]; then
-        print_error "healthcheck_urls_for_master_nodelist: Function requires at least 1 argument"
+        print_error "healthcheck_plan_for_master_nodelist: Function requires at least 1 argument"
         return 1
     fi
 
@@ -365,35 +299,22 @@ function healthcheck_urls_for_master_nodelist
 
     ready_node=$(get_ready_k8s_node "$@") || return 1
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
-
-    if ! more_urls=$(goss_endpoint_urls "${single_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${single_suite} on ${ready_node}"
-        return 1
-    fi
-    urls+=" ${more_urls}"
+    plan="$(goss_plan_entry "${suite}" "$@") $(goss_plan_entry "${single_suite}" "${ready_node}")"
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_suite}" "$@") ; then
-            print_error "Error finding test URLs for ${after_pit_suite} on $*"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_suite}" "$@")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function healthcheck_urls_for_master_nodelist_post_services_upgrade
+function healthcheck_plan_for_master_nodelist_post_services_upgrade
 {
-    # Usage: healthcheck_urls_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite
+    # Usage: healthcheck_plan_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
+    local suite after_pit_suite plan ready_node single_suite
     if [[ $# -eq 0 ]]; then
-        print_error " healthcheck_urls_for_master_nodelist_post_services_upgrade: Function requires at least 1 argument"
+        print_error "healthcheck_plan_for_master_nodelist_post_services_upgrade: Function requires at least 1 argument"
         return 1
     fi
 
@@ -403,64 +324,44 @@ function healthcheck_urls_for_master_nodelist_post_services_upgrade
 
     ready_node=$(get_ready_k8s_node "$@") || return 1
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
-
-    if ! more_urls=$(goss_endpoint_urls "${single_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${single_suite} on ${ready_node}"
-        return 1
-    fi
-    urls+=" ${more_urls}"
+    plan="$(goss_plan_entry "${suite}" "$@") $(goss_plan_entry "${single_suite}" "${ready_node}")"
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_suite}" "$@") ; then
-            print_error "Error finding test URLs for ${after_pit_suite} on $*"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_suite}" "$@")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function healthcheck_urls_for_storage_nodelist
+function healthcheck_plan_for_storage_nodelist
 {
-    # Usage: healthcheck_urls_for_storage_nodelist <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls
+    # Usage: healthcheck_plan_for_storage_nodelist <node1> [<node2>] ...
+    local suite after_pit_suite plan
     if [[ $# -eq 0 ]]; then
-        print_error "healthcheck_urls_for_storage_nodelist: Function requires at least 1 argument"
+        print_error "healthcheck_plan_for_storage_nodelist: Function requires at least 1 argument"
         return 1
     fi
 
     suite="ncn-healthcheck-storage.yaml"
     after_pit_suite="ncn-afterpitreboot-healthcheck-storage.yaml"
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
+    plan=$(goss_plan_entry "${suite}" "$@")
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_suite}" "$@") ; then
-            print_error "Error finding test URLs for ${after_pit_suite} on $*"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_suite}" "$@")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function healthcheck_urls_for_worker_nodelist
+function healthcheck_plan_for_worker_nodelist
 {
-    # Usage: healthcheck_urls_for_worker_nodelist <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite after_pit_single_suite
+    # Usage: healthcheck_plan_for_worker_nodelist <node1> [<node2>] ...
+    local suite after_pit_suite plan ready_node single_suite after_pit_single_suite
     if [[ $# -eq 0 ]]; then
-        print_error "healthcheck_urls_for_worker_nodelist: Function requires at least 1 argument"
+        print_error "healthcheck_plan_for_worker_nodelist: Function requires at least 1 argument"
         return 1
     fi
 
@@ -471,40 +372,22 @@ function healthcheck_urls_for_worker_nodelist
 
     ready_node=$(get_ready_k8s_node "$@") || return 1
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
-
-    if ! more_urls=$(goss_endpoint_urls "${single_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${single_suite} on ${ready_node}"
-        return 1
-    fi
-    urls+=" ${more_urls}"
+    plan="$(goss_plan_entry "${suite}" "$@") $(goss_plan_entry "${single_suite}" "${ready_node}")"
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_suite}" "$@") ; then
-            print_error "Error finding test URLs for ${after_pit_suite} on $*"
-            return 1
-        fi
-        urls+=" ${more_urls}"
-
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_single_suite}" "${ready_node}") ; then
-            print_error "Error finding test URL for ${after_pit_single_suite} on ${ready_node}"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_suite}" "$@")"
+        plan+=" $(goss_plan_entry "${after_pit_single_suite}" "${ready_node}")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function k8s_check_urls_for_master_nodelist {
-    # Usage: k8s_check_urls_for_master_nodelist <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite after_pit_single_suite
+function k8s_check_plan_for_master_nodelist {
+    # Usage: k8s_check_plan_for_master_nodelist <node1> [<node2>] ...
+    local suite plan ready_node single_suite after_pit_single_suite
     if [[ $# -eq 0 ]]; then
-        print_error "k8s_check_urls_for_master_nodelist: Function requires at least 1 argument"
+        print_error "k8s_check_plan_for_master_nodelist: Function requires at least 1 argument"
         return 1
     fi
 
@@ -514,35 +397,22 @@ function k8s_check_urls_for_master_nodelist {
 
     ready_node=$(get_ready_k8s_node "$@") || return 1
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
-
-    if ! more_urls=$(goss_endpoint_urls "${single_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${single_suite} on ${ready_node}"
-        return 1
-    fi
-    urls+=" ${more_urls}"
+    plan="$(goss_plan_entry "${suite}" "$@") $(goss_plan_entry "${single_suite}" "${ready_node}")"
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_single_suite}" "${ready_node}") ; then
-            print_error "Error finding test URL for ${after_pit_single_suite} on ${ready_node}"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_single_suite}" "${ready_node}")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function k8s_check_urls_for_master_nodelist_post_services_upgrade {
-    # Usage: k8s_check_urls_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite after_pit_single_suite post_csm_upgrade_suite even_more_urls
+function k8s_check_plan_for_master_nodelist_post_services_upgrade {
+    # Usage: k8s_check_plan_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
+    local suite plan ready_node single_suite after_pit_single_suite post_csm_upgrade_suite
 
     if [[ $# -eq 0 ]]; then
-        print_error "k8s_check_urls_for_master_nodelist_post_services_upgrade: Function requires at least 1 argument"
+        print_error "k8s_check_plan_for_master_nodelist_post_services_upgrade: Function requires at least 1 argument"
         return 1
     fi
 
@@ -553,84 +423,134 @@ function k8s_check_urls_for_master_nodelist_post_services_upgrade {
 
     ready_node=$(get_ready_k8s_node "$@") || return 1
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
-
-    if ! more_urls=$(goss_endpoint_urls "${single_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${single_suite} on ${ready_node}"
-        return 1
-    fi
-
-    if ! even_more_urls=$(goss_endpoint_urls "${post_csm_upgrade_suite}" "${ready_node}") ; then
-        print_error "Error finding test URL for ${post_csm_upgrade_suite} on ${ready_node}"
-        return 1
-    fi
-
-    urls+=" ${more_urls}"
-    urls+=" ${even_more_urls}"
+    plan="$(goss_plan_entry "${suite}" "$@") $(goss_plan_entry "${single_suite}" "${ready_node}")"
+    plan+=" $(goss_plan_entry "${post_csm_upgrade_suite}" "${ready_node}")"
 
     if ! is_pit_node ; then
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_single_suite}" "${ready_node}") ; then
-            print_error "Error finding test URL for ${after_pit_single_suite} on ${ready_node}"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_single_suite}" "${ready_node}")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function k8s_check_urls_for_worker_nodelist {
-    # Usage: k8s_check_urls_for_worker_nodelist <node1> [<node2>] ...
-    local suite after_pit_suite urls more_urls ready_node single_suite after_pit_single_suite
+function k8s_check_plan_for_worker_nodelist {
+    # Usage: k8s_check_plan_for_worker_nodelist <node1> [<node2>] ...
+    local suite plan ready_node after_pit_single_suite
     if [[ $# -eq 0 ]]; then
-        print_error "k8s_check_urls_for_worker_nodelist: Function requires at least 1 argument"
+        print_error "k8s_check_plan_for_worker_nodelist: Function requires at least 1 argument"
         return 1
     fi
 
     suite="ncn-kubernetes-tests-worker.yaml"
     after_pit_single_suite="ncn-afterpitreboot-kubernetes-tests-worker-single.yaml"
 
-    if ! urls=$(goss_endpoint_urls "${suite}" "$@") ; then
-        print_error "Error finding test URLs for ${suite} on $*"
-        return 1
-    fi
+    plan=$(goss_plan_entry "${suite}" "$@")
 
     if ! is_pit_node ; then
         ready_node=$(get_ready_k8s_node "$@") || return 1
-
-        if ! more_urls=$(goss_endpoint_urls "${after_pit_single_suite}" "${ready_node}") ; then
-            print_error "Error finding test URL for ${after_pit_single_suite} on ${ready_node}"
-            return 1
-        fi
-        urls+=" ${more_urls}"
+        plan+=" $(goss_plan_entry "${after_pit_single_suite}" "${ready_node}")"
     fi
 
-    echo ${urls}
+    echo ${plan}
     return 0
 }
 
-function ncn_healthcheck_master_urls {
+function ncn_healthcheck_master_plan {
     local nodes
     nodes=$(get_ncns --masters --exclude-pit) || return 1
-    healthcheck_urls_for_master_nodelist ${nodes}
+    healthcheck_plan_for_master_nodelist ${nodes}
     return $?
 }
 
-function ncn_healthcheck_storage_urls {
+function ncn_healthcheck_storage_plan {
     local nodes
     nodes=$(get_ncns --storage) || return 1
-    healthcheck_urls_for_storage_nodelist ${nodes}
+    healthcheck_plan_for_storage_nodelist ${nodes}
     return $?
 }
 
-function ncn_healthcheck_worker_urls {
+function ncn_healthcheck_worker_plan {
     local nodes
     nodes=$(get_ncns --workers) || return 1
-    healthcheck_urls_for_worker_nodelist ${nodes}
+    healthcheck_plan_for_worker_nodelist ${nodes}
+    return $?
+}
+
+function healthcheck_urls_for_master_nodelist {
+    # Usage: healthcheck_urls_for_master_nodelist <node1> [<node2>] ...
+    local plan
+    plan=$(healthcheck_plan_for_master_nodelist "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function healthcheck_urls_for_master_nodelist_post_services_upgrade {
+    # Usage: healthcheck_urls_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
+    local plan
+    plan=$(healthcheck_plan_for_master_nodelist_post_services_upgrade "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function healthcheck_urls_for_storage_nodelist {
+    # Usage: healthcheck_urls_for_storage_nodelist <node1> [<node2>] ...
+    local plan
+    plan=$(healthcheck_plan_for_storage_nodelist "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function healthcheck_urls_for_worker_nodelist {
+    # Usage: healthcheck_urls_for_worker_nodelist <node1> [<node2>] ...
+    local plan
+    plan=$(healthcheck_plan_for_worker_nodelist "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function k8s_check_urls_for_master_nodelist {
+    # Usage: k8s_check_urls_for_master_nodelist <node1> [<node2>] ...
+    local plan
+    plan=$(k8s_check_plan_for_master_nodelist "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function k8s_check_urls_for_master_nodelist_post_services_upgrade {
+    # Usage: k8s_check_urls_for_master_nodelist_post_services_upgrade <node1> [<node2>] ...
+    local plan
+    plan=$(k8s_check_plan_for_master_nodelist_post_services_upgrade "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function k8s_check_urls_for_worker_nodelist {
+    # Usage: k8s_check_urls_for_worker_nodelist <node1> [<node2>] ...
+    local plan
+    plan=$(k8s_check_plan_for_worker_nodelist "$@") || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function ncn_healthcheck_master_urls {
+    local plan
+    plan=$(ncn_healthcheck_master_plan) || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function ncn_healthcheck_storage_urls {
+    local plan
+    plan=$(ncn_healthcheck_storage_plan) || return 1
+    goss_endpoint_urls_for_plan ${plan}
+    return $?
+}
+
+function ncn_healthcheck_worker_urls {
+    local plan
+    plan=$(ncn_healthcheck_worker_plan) || return 1
+    goss_endpoint_urls_for_plan ${plan}
     return $?
 }
 
@@ -682,13 +602,26 @@ function run_goss_tests_print_results {
     return $?
 }
 
+# Like dst-ct-results.sh, this runs the Goss suites served on this node and writes a DST-compatible results file
+# (the arguments are passed to the Python script), but the suites are run in parallel, using a temporary variables
+# file created here.
+function dst_ct_results {
+    local GOSS_VARS
+    GOSS_VARS=$(create_goss_variable_file) || return 1
+    export GOSS_VARS
+
+    "${GOSS_BASE}/automated/python/dst_ct_results.py" "$@"
+    return $?
+}
+
 function add_local_vars {
     # $1 - goss variable file
-    if [[ $# -ne 1 ]]; then
-        print_error "add_local_vars: Function requires exactly 1 argument but received $#: $*"
+    # $2 - NCN list (from get_ncns)
+    if [[ $# -ne 2 ]]; then
+        print_error "add_local_vars: Function requires exactly 2 arguments but received $#: $*"
         return 1
     elif [[ -z $1 ]]; then
-        print_error "add_local_vars: Argument may not be blank"
+        print_error "add_local_vars: First argument may not be blank"
         return 1
     elif [[ ! -e $1 ]]; then
         print_error "add_local_vars: File '$1' does not exist"
@@ -699,20 +632,56 @@ function add_local_vars {
     fi
 
     local this_node_name this_node_manufacturer var_string node nodes is_vshasta test cmsdev_test_list
+    local inputs_dir pid rc=0
+    local pids=()
+
+    inputs_dir=$(mktemp -d "/tmp/goss-variables-inputs-XXXXXX")
+    if [[ $? -ne 0 ]]; then
+        print_error "add_local_vars: mktemp command failed"
+        return 1
+    fi
+
+    # The inputs below are independent of each other, and each one may take several seconds, so they are
+    # gathered concurrently, each into its own file in the inputs directory.
+    (
+        if is_vshasta_node; then
+            echo true > "${inputs_dir}/vshasta"
+            # Since we know this is vshasta, we directly set the node manufacturer variable, rather
+            # than the usual call to ipmitool
+            echo vshasta > "${inputs_dir}/manufacturer"
+        else
+            echo false > "${inputs_dir}/vshasta"
+            # Not vshasta -- call ipmitool to determine node manufacturer
+            ipmitool mc info |
+                grep -E "^Manufacturer Name[[:space:]]{1,}:[[:space:]]*[^[:space:]]" |
+                sed -e 's/^Manufacturer Name[[:space:]]*:[[:space:]]*//' -e 's/[[:space:]]*$//' > "${inputs_dir}/manufacturer"
+        fi
+    ) &
+    pids+=($!)
+
+    # if not running on the PIT node, and the cmsdev utility is present, query it to list possible additional tests to run
+    if ! is_pit_node && [ -f /usr/local/bin/cmsdev ]; then
+        /usr/local/bin/cmsdev test -l --exclude-aliases > "${inputs_dir}/cmsdev" &
+        pids+=($!)
+    fi
 
-    if is_vshasta_node; then
-        # vshasta
+    # if run_hms_ct_tests.sh script is present, query it for the list of HMS CT tests
+    if [ -f /opt/cray/csm/scripts/hms_verification/run_hms_ct_tests.sh ]; then
+        /opt/cray/csm/scripts/hms_verification/run_hms_ct_tests.sh -l > "${inputs_dir}/hms_ct_tests" &
+        pids+=($!)
+    fi
+
+    # Only wait for our own background jobs, not any which our caller may have started
+    for pid in "${pids[@]}"; do
+        wait "${pid}"
+    done
+
+    if [[ $(cat "${inputs_dir}/vshasta" 2>/dev/null) == true ]]; then
         is_vshasta="\nvshasta: true\n"
-        # Since we know this is vshasta, we directly set the node manufacturer variable, rather
-        # than the usual call to ipmitool
-        this_node_manufacturer=vshasta
     else
         is_vshasta="\nvshasta: false\n"
-        # Not vshasta -- call ipmitool to determine node manufacturer
-        this_node_manufacturer=$(ipmitool mc info |
-            grep -E "^Manufacturer Name[[:space:]]{1,}:[[:space:]]*[^[:space:]]" |
-            sed -e 's/^Manufacturer Name[[:space:]]*:[[:space:]]*//' -e 's/[[:space:]]*$//')
     fi
+    this_node_manufacturer=$(cat "${inputs_dir}/manufacturer" 2>/dev/null)
     # Add hardware manufacturer as variable
     var_string+="\nthis_node_manufacturer: \"${this_node_manufacturer}\"\n"
 
@@ -720,8 +689,7 @@ function add_local_vars {
     this_node_name=$(hostname -s | grep -Eo '(ncn-[msw][0-9]{3}|.*-pit)$')
     var_string+="\n\nthis_node_name: \"${this_node_name}\"\n"
 
-    # Get NCN list
-    nodes=$(get_ncns)
+    nodes=$2
 
     # add list of all nodes
     var_string+="\nnodes:\n"
@@ -750,9 +718,8 @@ function add_local_vars {
     # add list of CMS tests, if not running on the PIT node
     if ! is_pit_node; then
         var_string+="\ncms_tests:\n"
-        # if cmsdev utility is present, query it to list possible additional tests to run
         if [ -f /usr/local/bin/cmsdev ]; then
-            cmsdev_test_list=$(/usr/local/bin/cmsdev test -l --exclude-aliases)
+            cmsdev_test_list=$(cat "${inputs_dir}/cmsdev" 2>/dev/null)
             # Added to help debug potential problems
             echo "DEBUG: cmsdev_test_list='${cmsdev_test_list}'" >&2
         else
@@ -766,16 +733,97 @@ function add_local_vars {
     # add list of HMS CT tests, if run_hms_ct_tests.sh script is present
     if [ -f /opt/cray/csm/scripts/hms_verification/run_hms_ct_tests.sh ]; then
         var_string+="\nhms_ct_tests:\n"
-        for test in $(/opt/cray/csm/scripts/hms_verification/run_hms_ct_tests.sh -l); do
+        for test in $(cat "${inputs_dir}/hms_ct_tests" 2>/dev/null); do
             var_string+="  - ${test}\n"
         done
     fi
 
     var_string+="\n${is_vshasta}\n"
 
-    echo -e "${var_string}" >> "$1"
-    # shellcheck disable=SC2320
-    return $?
+    rm -rf "${inputs_dir}"
+
+    echo -e "${var_string}" >> "$1" || rc=$?
+    return ${rc}
+}
+
+function local_vars_cache_file {
+    # $1 - base goss variable file
+    # $2 - NCN list
+    # Prints the path to a file containing the local variables for this node (as added by add_local_vars). The
+    # file is named after a hash of the cache key (the hostname, the base variable file and its mtime, and the
+    # NCN list), and is regenerated if it does not exist or is more than GOSS_VARS_CACHE_TTL seconds old.
+    #
+    # Returns 1 if the cache cannot be used (in which case the caller should call add_local_vars itself), and
+    # 2 if the local variables could not be generated.
+    local mtime key cache_file age tmpfile
+
+    [[ ${GOSS_VARS_CACHE_TTL} =~ ^[0-9]+$ && ${GOSS_VARS_CACHE_TTL} -gt 0 ]] || return 1
+    # An empty NCN list means that get_ncns failed, so do not cache the result
+    [[ -n $2 ]] || return 1
+
+    mtime=$(stat -c %Y "$1") || return 1
+    key=$(printf "hostname=%s\nbase_var_file=%s\nbase_var_file_mtime=%s\nnodes=%s\n" \
+        "$(hostname -s)" "$1" "${mtime}" "$(echo $2)")
+    cache_file="${GOSS_VARS_CACHE_DIR}/local-vars-$(echo "${key}" | sha256sum | cut -c1-16).yaml"
+
+    if [[ -s ${cache_file} ]]; then
+        age=$(( $(date +%s) - $(stat -c %Y "${cache_file}") ))
+        if [[ ${age} -ge 0 && ${age} -lt ${GOSS_VARS_CACHE_TTL} ]]; then
+            echo "${cache_file}"
+            return 0
+        fi
+    fi
+
+    # The cache directory is in /tmp, so make sure that it belongs to us before using it
+    mkdir -p -m 700 "${GOSS_VARS_CACHE_DIR}" 2>/dev/null
+    if [[ ! -d ${GOSS_VARS_CACHE_DIR} || ! -O ${GOSS_VARS_CACHE_DIR} ]]; then
+        print_warn "Not caching Goss local variables: Directory does not exist or is not owned by us: ${GOSS_VARS_CACHE_DIR}"
+        return 1
+    fi
+
+    tmpfile=$(mktemp "${GOSS_VARS_CACHE_DIR}/.local-vars-XXXXXX") || return 1
+    if ! add_local_vars "${tmpfile}" "$2" ; then
+        rm -f "${tmpfile}"
+        return 2
+    fi
+    # Renaming the file into place means that concurrent callers never see a partially written file
+    if ! mv -f "${tmpfile}" "${cache_file}" ; then
+        rm -f "${tmpfile}"
+        return 1
+    fi
+    echo "${cache_file}"
+    return 0
+}
+
+function remove_stale_goss_variable_files {
+    # Removes the Goss variable files (and cached local variables) created more than GOSS_VARS_GC_MINUTES minutes
+    # ago. Variable files which are still named in the command line or environment of a running process (such as
+    # a Goss server, or print_goss_json_results.py with GOSS_VARS set) are left alone.
+    local file
+    local -A in_use=()
+
+    [[ ${GOSS_VARS_GC_MINUTES} =~ ^[0-9]+$ && ${GOSS_VARS_GC_MINUTES} -gt 0 ]] || return 0
+
+    while read -r file; do
+        in_use[${file}]=1
+    done < <(cat /proc/[0-9]*/cmdline /proc/[0-9]*/environ 2>/dev/null | tr '\0' '\n' |
+                grep -oE '/tmp/goss-variables-[^/[:space:]]*-temp\.yaml' | sort -u)
+
+    while read -r file; do
+        [[ -n ${in_use[${file}]} ]] && continue
+        rm -f "${file}"
+    done < <(find /tmp -maxdepth 1 -type f -name 'goss-variables-*-temp.yaml' -user "$(id -u)" \
+                -mmin "+${GOSS_VARS_GC_MINUTES}" 2>/dev/null)
+
+    # Input directories left behind by add_local_vars calls which were interrupted
+    find /tmp -maxdepth 1 -type d -name 'goss-variables-inputs-*' -user "$(id -u)" \
+        -mmin "+${GOSS_VARS_GC_MINUTES}" -exec rm -rf {} + 2>/dev/null
+
+    if [[ -d ${GOSS_VARS_CACHE_DIR} && -O ${GOSS_VARS_CACHE_DIR} ]]; then
+        find "${GOSS_VARS_CACHE_DIR}" -maxdepth 1 -type f -name '*local-vars-*' \
+            -mmin "+${GOSS_VARS_GC_MINUTES}" -delete 2>/dev/null
+    fi
+    return 0
 }
 
 # Creates Goss variable file and prints path to it
@@ -788,7 +836,7 @@ function create_goss_variable_file {
         return 1
     fi
 
-    local base_var_file tmpvars
+    local base_var_file tmpvars nodes local_vars_file rc
 
     if is_pit_node ; then
         base_var_file="${GOSS_BASE}/vars/variables-livecd.yaml"
@@ -804,6 +852,8 @@ function create_goss_variable_file {
         return 1
     fi
 
+    remove_stale_goss_variable_files
+
     tmpvars=$(mktemp "/tmp/goss-variables-$(date +%s)-XXXXXX-temp.yaml")
     if [[ $? -ne 0 ]]; then
         print_error "create_goss_variable_file: mktemp command failed"
@@ -815,7 +865,23 @@ function create_goss_variable_file {
         return 1
     fi
 
-    add_local_vars "${tmpvars}" || return 1
+    # Get NCN list (it is part of the cache key for the local variables). This is done before the cache lookup,
+    # rather than alongside the other inputs in add_local_vars, because goss_ncn_inventory caches the list itself
+    # (see GOSS_SCRIPT_NCN_INVENTORY_TTL), so it is usually cheap.
+    nodes=$(get_ncns)
+
+    local_vars_file=$(local_vars_cache_file "${base_var_file}" "${nodes}")
+    rc=$?
+    if [[ ${rc} -eq 0 ]]; then
+        if ! cat "${local_vars_file}" >> "${tmpvars}" ; then
+            print_error "create_goss_variable_file: Command failed: cat '${local_vars_file}' >> '${tmpvars}'"
+            return 1
+        fi
+    elif [[ ${rc} -eq 1 ]]; then
+        add_local_vars "${tmpvars}" "${nodes}" || return 1
+    else
+        return 1
+    fi
 
     echo "${tmpvars}"
     return 0
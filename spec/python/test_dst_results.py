@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/dst_results.py
+"""
+
+import json
+import os
+import stat
+
+from lib import dst_results
+from lib.dst_results import SuiteResults, dst_test, goss_validate_cmd, run_suites, write_dst_results
+
+# The fake Goss fails one test of smoke.yaml, cannot run broken.yaml, and passes everything else.
+# It is slowest for the first suite, so the suites finish out of order.
+FAKE_GOSS = """#!/bin/sh
+case "$2" in
+    *smoke.yaml) sleep 0.5
+                 echo '{"results":[{"title":"S1","resource-id":"s1","successful":false,"stderr":"boom"},
+                                   {"title":"S2","resource-id":"s2","successful":true,"stderr":""}]}'
+                 exit 1 ;;
+    *broken.yaml) echo "bad suite" >&2; exit 1 ;;
+esac
+echo '{"results":[{"title":"P","resource-id":"p","successful":true,"stderr":""}]}'
+"""
+
+DST_KEYS = [ "product_name", "product_version", "release_name", "release_version",
+             "output", "status", "label", "test_name" ]
+
+def fake_goss(tmp_path, monkeypatch) -> None:
+    goss = tmp_path / "goss"
+    goss.write_text(FAKE_GOSS)
+    goss.chmod(goss.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setattr(dst_results, "GOSS_BINARY", str(goss))
+
+def test_dst_test_record_matches_dst_ct_results_sh():
+    # The same record, with the same key order, as the jq filter in dst-ct-results.sh
+    passed = dst_test({ "title": "T", "resource-id": "r", "successful": True, "stderr": "ignored" }, "1.6.0")
+    assert list(passed) == DST_KEYS
+    assert passed == { "product_name": "CSM", "product_version": "1.6.0", "release_name": "",
+                       "release_version": "", "output": "omitted", "status": "pass", "label": "r",
+                       "test_name": "T" }
+    failed = dst_test({ "title": "T", "resource-id": "r", "successful": False, "stderr": "error" }, "1.6.0")
+    assert (failed["output"], failed["status"]) == ("error", "fail")
+
+def test_goss_validate_cmd_limits_concurrent_tests():
+    cmd = goss_validate_cmd("/suites/a.yaml", "/tmp/vars.yaml")
+    assert cmd[1:] == [ "-g", "/suites/a.yaml", "--vars", "/tmp/vars.yaml", "validate", "--format", "json",
+                        "--max-concurrent", "4" ]
+    assert "--vars" not in goss_validate_cmd("/suites/a.yaml", "")
+
+def test_run_suites_merges_in_suite_order(tmp_path, monkeypatch):
+    fake_goss(tmp_path, monkeypatch)
+    completed = list()
+    suites = [ "/suites/smoke.yaml", "/suites/broken.yaml", "/suites/preflight.yaml" ]
+    results = run_suites(suites, "", "1.6.0", max_workers=3, timeout=30, on_complete=completed.append)
+
+    assert [ r.suite for r in results ] == [ "smoke.yaml", "broken.yaml", "preflight.yaml" ]
+    assert completed[-1].suite == "smoke.yaml"
+    smoke, broken, preflight = results
+    assert ([ t["test_name"] for t in smoke.tests ], smoke.failed_count, smoke.error) == ([ "S1", "S2" ], 1, "")
+    assert (broken.tests, broken.failed_count) == ([], 0)
+    assert broken.error == "No results (Goss return code 1): bad suite"
+    assert [ t["status"] for t in preflight.tests ] == [ "pass" ]
+
+    path = str(tmp_path / "dst-results.json")
+    assert write_dst_results(path, results) == 3
+    with open(path, "rt") as f:
+        data = json.load(f)
+    assert list(data) == [ "run_id", "tests", "triage" ]
+    assert (data["run_id"], data["triage"]) == ("", {})
+    assert [ (t["test_name"], t["status"], t["output"]) for t in data["tests"] ] == \
+        [ ("S1", "fail", "boom"), ("S2", "pass", "omitted"), ("P", "pass", "omitted") ]
+    assert [ name for name in os.listdir(str(tmp_path)) if name.startswith(".") ] == []
+
+def test_write_dst_results_with_no_results(tmp_path):
+    path = str(tmp_path / "dst-results.json")
+    assert write_dst_results(path, [ SuiteResults("a.yaml", list(), 0, 0.0, "error") ]) == 0
+    with open(path, "rt") as f:
+        assert json.load(f) == { "run_id": "", "tests": [], "triage": {} }
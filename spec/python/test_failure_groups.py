@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/failure_groups.py
+"""
+
+import pytest
+
+from lib.failure_groups import compact_node_list
+
+@pytest.mark.parametrize("node_names, expected", [
+    ([], ""),
+    ([ "ncn-m001" ], "ncn-m001"),
+    ([ "ncn-m003", "ncn-m001", "ncn-m002" ], "ncn-m[001-003]"),
+    ([ "ncn-w005", "ncn-w001", "ncn-w002" ], "ncn-w[001-002,005]"),
+    ([ "ncn-w001", "ncn-w003", "ncn-w005" ], "ncn-w[001,003,005]"),
+    ([ "pit", "ncn-w002", "ncn-m001", "ncn-w001", "ncn-m002", "ncn-m003", "ncn-w005" ],
+     "ncn-m[001-003],ncn-w[001-002,005],pit"),
+    ([ "ncn-m001", "ncn-m001", "ncn-m002" ], "ncn-m[001-002]"),
+    # Names are only combined if their numbers have the same width
+    ([ "x1", "x2", "x01" ], "x01,x[1-2]"),
+    ([ "ncn-s010", "ncn-s009", "ncn-s011" ], "ncn-s[009-011]"),
+])
+def test_compact_node_list(node_names, expected):
+    assert compact_node_list(node_names) == expected
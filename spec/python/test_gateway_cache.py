@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/gateway_cache.py. The suites are not run: the scheduler returns canned results.
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from lib.gateway import GatewayEndpoint, SuiteRun
+from lib.gateway_cache import CachedRun, SAVED_RESULTS_VERSION, SuiteResultCache
+
+WAIT_SECONDS = 10
+
+class FakeScheduler:
+    """
+    Counts the runs of each suite. While blocked, runs wait until release is called.
+    """
+    content_type = "application/json"
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.started = threading.Event()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def block(self) -> None:
+        self.unblocked.clear()
+
+    def release(self) -> None:
+        self.unblocked.set()
+
+    def run(self, endpoint: GatewayEndpoint) -> SuiteRun:
+        with self.lock:
+            self.runs += 1
+            run_number = self.runs
+        self.started.set()
+        assert self.unblocked.wait(WAIT_SECONDS)
+        return SuiteRun(self.status, f'{{"run": {run_number}}}'.encode(), self.content_type, 0.0, 0.1)
+
+def make_endpoint(tmp_path, cache_ttl: int = 5, max_stale: int = 0) -> GatewayEndpoint:
+    suite_file = tmp_path / "ncn-smoke-tests.yaml"
+    if not suite_file.exists():
+        suite_file.write_text("command: {}\n")
+    return GatewayEndpoint("ncn-smoke-tests.yaml", str(suite_file), "ncn-smoke-tests", 8995, cache_ttl, max_stale)
+
+def age_results(cache: SuiteResultCache, endpoint: GatewayEndpoint, seconds: float) -> None:
+    cache.results[endpoint.path].finished -= seconds
+
+def wait_for_flights(cache: SuiteResultCache) -> None:
+    for flight in list(cache.flights.values()):
+        assert flight.done.wait(WAIT_SECONDS)
+
+def test_concurrent_requests_share_one_run(tmp_path):
+    scheduler = FakeScheduler()
+    scheduler.block()
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path)
+    responses = list()
+
+    def request() -> None:
+        run, _, cache_status = cache.get(endpoint)
+        responses.append((run.body, cache_status))
+
+    threads = [ threading.Thread(target=request) for _ in range(8) ]
+    for thread in threads:
+        thread.start()
+    assert scheduler.started.wait(WAIT_SECONDS)
+    scheduler.release()
+    for thread in threads:
+        thread.join(WAIT_SECONDS)
+    assert scheduler.runs == 1
+    assert responses == [ (b'{"run": 1}', "miss") ] * 8
+    assert cache.flights == {}
+
+def test_results_are_served_until_cache_ttl(tmp_path):
+    scheduler = FakeScheduler()
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path, cache_ttl=5)
+    cache.get(endpoint)
+    run, age, cache_status = cache.get(endpoint)
+    assert (run.body, cache_status, scheduler.runs) == (b'{"run": 1}', "hit", 1)
+    assert age < 5
+    age_results(cache, endpoint, 6)
+    run, _, cache_status = cache.get(endpoint)
+    assert (run.body, cache_status, scheduler.runs) == (b'{"run": 2}', "miss", 2)
+
+def test_stale_results_are_served_while_one_refresh_runs(tmp_path):
+    scheduler = FakeScheduler()
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path, cache_ttl=5, max_stale=10)
+    cache.get(endpoint)
+    age_results(cache, endpoint, 7)
+    scheduler.block()
+    for _ in range(3):
+        run, age, cache_status = cache.get(endpoint)
+        assert (run.body, cache_status) == (b'{"run": 1}', "stale")
+        assert 7 <= age <= 15
+    scheduler.release()
+    wait_for_flights(cache)
+    assert scheduler.runs == 2
+    run, _, cache_status = cache.get(endpoint)
+    assert (run.body, cache_status) == (b'{"run": 2}', "hit")
+
+def test_results_older_than_max_stale_are_not_served(tmp_path):
+    scheduler = FakeScheduler()
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path, cache_ttl=5, max_stale=10)
+    cache.get(endpoint)
+    age_results(cache, endpoint, 16)
+    run, age, cache_status = cache.get(endpoint)
+    assert (run.body, cache_status) == (b'{"run": 2}', "miss")
+    assert age < 5
+
+def test_fresh_requests_always_run(tmp_path):
+    scheduler = FakeScheduler()
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path, cache_ttl=60)
+    cache.get(endpoint)
+    run, _, cache_status = cache.get(endpoint, fresh=True)
+    assert (run.body, cache_status, scheduler.runs) == (b'{"run": 2}', "fresh", 2)
+
+def test_errors_are_not_cached(tmp_path):
+    scheduler = FakeScheduler(status=500)
+    cache = SuiteResultCache(scheduler)
+    endpoint = make_endpoint(tmp_path, cache_ttl=60)
+    assert cache.get(endpoint)[0].status == 500
+    assert cache.get(endpoint)[2] == "miss"
+    assert scheduler.runs == 2
+    assert cache.age(endpoint) is None
+
+def saved_cache(tmp_path, endpoint: GatewayEndpoint) -> str:
+    """
+    Saves one set of results for the endpoint, and returns the results directory
+    """
+    results_dir = str(tmp_path / "results")
+    cache = SuiteResultCache(FakeScheduler(), results_dir)
+    cache.save(endpoint, CachedRun(SuiteRun(503, b'{"saved": true}', "application/json", 0.5, 2.0), time.monotonic()))
+    return results_dir
+
+def test_saved_results_are_loaded(tmp_path):
+    endpoint = make_endpoint(tmp_path, cache_ttl=60)
+    results_dir = saved_cache(tmp_path, endpoint)
+    scheduler = FakeScheduler()
+    cache = SuiteResultCache(scheduler, results_dir)
+    assert cache.load_saved([ endpoint ]) == [ "ncn-smoke-tests" ]
+    run, _, cache_status = cache.get(endpoint)
+    assert (run.status, run.body, cache_status, scheduler.runs) == (503, b'{"saved": true}', "hit", 0)
+
+def test_saved_results_for_a_changed_suite_are_not_loaded(tmp_path):
+    endpoint = make_endpoint(tmp_path)
+    results_dir = saved_cache(tmp_path, endpoint)
+    stat = os.stat(endpoint.suite_file)
+    os.utime(endpoint.suite_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert SuiteResultCache(FakeScheduler(), results_dir).load_saved([ endpoint ]) == []
+
+def test_saved_results_in_another_format_are_not_loaded(tmp_path):
+    endpoint = make_endpoint(tmp_path)
+    results_dir = saved_cache(tmp_path, endpoint)
+    scheduler = FakeScheduler()
+    scheduler.content_type = "application/xml"
+    assert SuiteResultCache(scheduler, results_dir).load_saved([ endpoint ]) == []
+
+@pytest.mark.parametrize("field, value", [ ("version", SAVED_RESULTS_VERSION + 1),
+                                           ("suite_file", "/some/other/suite.yaml") ])
+def test_saved_results_which_do_not_match_are_not_loaded(tmp_path, field, value):
+    endpoint = make_endpoint(tmp_path)
+    results_dir = saved_cache(tmp_path, endpoint)
+    results_file = os.path.join(results_dir, "ncn-smoke-tests.json")
+    with open(results_file, "rt") as f:
+        data = json.load(f)
+    data[field] = value
+    with open(results_file, "wt") as f:
+        json.dump(data, f)
+    assert SuiteResultCache(FakeScheduler(), results_dir).load_saved([ endpoint ]) == []
+
+def test_unreadable_saved_results_are_skipped(tmp_path):
+    endpoint = make_endpoint(tmp_path)
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    (results_dir / "ncn-smoke-tests.json").write_text("{ truncated")
+    assert SuiteResultCache(FakeScheduler(), str(results_dir)).load_saved([ endpoint ]) == []
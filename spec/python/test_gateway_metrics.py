@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/gateway_metrics.py
+"""
+
+import json
+
+import pytest
+
+from lib import gateway_metrics
+from lib.gateway import SuiteRun
+
+def goss_run(results: list, status: int = 200, content_type: str = "application/json") -> SuiteRun:
+    return SuiteRun(status, json.dumps({ "results": results, "summary": {} }).encode(), content_type, 0.0, 1.0)
+
+def entry(title: str, result: int, seconds: float = 1.0, **fields) -> dict:
+    return dict(title=title, result=result, duration=int(seconds * 1000000000), **fields)
+
+@pytest.mark.parametrize("results, expected", [
+    ([ 0, 1, 2 ], 1),
+    ([ 2, 1, 0 ], 1),
+    ([ 2, 0 ], 0),
+    ([ 0, 2 ], 0),
+    ([ 2, 2 ], 2),
+    # Unknown result codes are reported over every known one
+    ([ 1, 7 ], 7),
+])
+def test_results_of_tests_with_the_same_title_are_merged(results, expected):
+    run = goss_run([ entry("Test", result) for result in results ])
+    result, seconds = gateway_metrics.test_results(run)["Test"]
+    assert result == expected
+    assert seconds == pytest.approx(len(results))
+
+def test_durations_are_summed_per_title():
+    run = goss_run([ entry("A", 0, 0.25), entry("B", 0, 2), entry("A", 0, 0.5) ])
+    assert gateway_metrics.test_results(run) == { "A": (0, pytest.approx(0.75)), "B": (0, pytest.approx(2)) }
+
+def test_title_falls_back_to_resource_id():
+    run = goss_run([ { "resource-id": "kubelet", "result": 1, "duration": 0 },
+                     { "title": "", "resource-id": "etcd", "result": 0 } ])
+    assert gateway_metrics.test_results(run) == { "kubelet": (1, 0.0), "etcd": (0, 0.0) }
+
+def test_entries_without_a_title_or_result_are_skipped():
+    run = goss_run([ { "result": 0 }, { "title": "No result" }, "not an entry", entry("A", 0) ])
+    assert list(gateway_metrics.test_results(run)) == [ "A" ]
+
+def test_failed_suite_runs_have_results():
+    assert gateway_metrics.test_results(goss_run([ entry("A", 1) ], status=503)) == { "A": (1, 1.0) }
+
+@pytest.mark.parametrize("status, content_type", [
+    (500, "application/json"),
+    (502, "application/json"),
+    (200, "application/xml"),
+    (200, "text/plain"),
+])
+def test_runs_without_json_results_have_none(status, content_type):
+    assert gateway_metrics.test_results(goss_run([ entry("A", 0) ], status, content_type)) is None
+
+def test_undecodable_results_are_none():
+    assert gateway_metrics.test_results(SuiteRun(200, b"{", "application/json", 0.0, 1.0)) is None
+
+def test_number_of_tests_is_capped(monkeypatch):
+    monkeypatch.setattr(gateway_metrics, "MAX_TESTS_PER_SUITE", 2)
+    run = goss_run([ entry("A", 0), entry("B", 0), entry("C", 1), entry("A", 1) ])
+    assert gateway_metrics.test_results(run) == { "A": (1, 2.0), "B": (0, 1.0) }
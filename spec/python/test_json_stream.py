@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/json_stream.py
+"""
+
+import io
+import json
+
+import pytest
+
+from lib.json_stream import JsonStreamError, iter_json_object
+
+RESULTS = { "results": [ { "title": "Kubernetes nodes are Ready", "result": 0, "duration": 123456789 },
+                         { "title": "etcd is healthy", "result": 1, "duration": 1.5e9,
+                           "summary-line": "Expected \"ok\" but got [\"down\"]" } ],
+            "summary": { "failed-count": 1, "test-count": 2, "total-duration": 4246561234 },
+            "empty": [], "nested": { "a": [ 1, { "b": None } ], "c": True } }
+
+def members(text: str, array_keys=(), chunk_size: int = 64*1024) -> list:
+    return list(iter_json_object(io.StringIO(text), array_keys, chunk_size=chunk_size))
+
+@pytest.mark.parametrize("chunk_size", [ 1, 2, 7, 64*1024 ])
+def test_members_match_json_loads(chunk_size):
+    assert dict(members(json.dumps(RESULTS, indent=2), chunk_size=chunk_size)) == RESULTS
+
+@pytest.mark.parametrize("chunk_size", [ 1, 3, 64*1024 ])
+def test_array_items_are_yielded_one_at_a_time(chunk_size):
+    result = members(json.dumps(RESULTS), array_keys=[ "results", "empty" ], chunk_size=chunk_size)
+    assert result == [ ("results[]", RESULTS["results"][0]),
+                       ("results[]", RESULTS["results"][1]),
+                       ("summary", RESULTS["summary"]),
+                       ("nested", RESULTS["nested"]) ]
+
+def test_array_keys_whose_values_are_not_arrays_are_yielded_whole():
+    assert members('{"results": {"x": 1}}', array_keys=[ "results" ]) == [ ("results", { "x": 1 }) ]
+
+@pytest.mark.parametrize("number", [ "4246561234", "-12.5e-3", "0", "1E+10" ])
+def test_numbers_split_across_chunks(number):
+    for chunk_size in range(1, len(number) + 3):
+        assert members(f'{{"n":{number}}}', chunk_size=chunk_size) == [ ("n", json.loads(number)) ]
+
+def test_empty_object():
+    assert members(" { } \n") == []
+
+@pytest.mark.parametrize("text", [ "", "[]", '{"a": 1', '{"a" 1}', '{"a": 1,}', "{1: 2}",
+                                   '{"a": [1, 2}', '{"a": tru}', '{"a": 1} {"b": 2}', '{"a": 1} x' ])
+def test_invalid_data_is_an_error(text):
+    with pytest.raises(JsonStreamError):
+        members(text, array_keys=[ "a" ], chunk_size=2)
+
+def test_errors_are_value_errors():
+    assert issubclass(JsonStreamError, ValueError)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/ncn_inventory.py
+"""
+
+import json
+
+import pytest
+
+from lib import ncn_inventory
+from lib.common import ScriptException
+from lib.ncn_inventory import get_ncns, InventorySource, resolve_inventory
+
+def source(name: str, text: str, authoritative: bool) -> InventorySource:
+    return InventorySource(name, lambda timeout: text, authoritative=authoritative)
+
+def failing_source(name: str, authoritative: bool) -> InventorySource:
+    def read(timeout):
+        raise OSError("down")
+    return InventorySource(name, read, authoritative=authoritative)
+
+@pytest.fixture
+def sources(monkeypatch, tmp_path):
+    """
+    Replaces the inventory sources (off the PIT node) with basecamp, which has no workers, and
+    /etc/hosts, which has every NCN
+    """
+    cache_file = tmp_path / "ncn-inventory.json"
+    monkeypatch.setattr(ncn_inventory, "is_pit_node", lambda: False)
+    monkeypatch.setattr(ncn_inventory, "inventory_sources", lambda pit: [
+        source("basecamp", "ncn-m001 ncn-m002 ncn-s001", authoritative=True),
+        source("/etc/hosts", "ncn-m001 ncn-m002 ncn-s001 ncn-w001 ncn-w002", authoritative=False) ])
+    monkeypatch.delenv("GOSS_TEST_NCN_LIST", raising=False)
+    monkeypatch.setenv("GOSS_SCRIPT_NCN_INVENTORY_CACHE", str(cache_file))
+    monkeypatch.setenv("GOSS_SCRIPT_NCN_INVENTORY_TTL", "300")
+    return cache_file
+
+def test_authoritative_source_is_used_first():
+    result = resolve_inventory([ source("/etc/hosts", "ncn-m001 ncn-w001", authoritative=False),
+                                 source("BSS", "ncn-m001 ncn-m002", authoritative=True) ], timeout=5)
+    assert (result.source, result.ncns, result.passed_over) == ("BSS", [ "ncn-m001", "ncn-m002" ], False)
+
+def test_failed_sources_fall_through_in_order():
+    result = resolve_inventory([ failing_source("BSS", authoritative=True),
+                                 source("/etc/hosts", "ncn-w002 ncn-m001 ncn-w002", authoritative=False) ], timeout=5)
+    assert (result.source, result.ncns) == ("/etc/hosts", [ "ncn-m001", "ncn-w002" ])
+    assert [ failed.name for failed, _ in result.failures ] == [ "BSS" ]
+
+def test_no_source_answers():
+    with pytest.raises(ScriptException, match="Unable to obtain NCN list from any source"):
+        resolve_inventory([ failing_source("BSS", authoritative=True) ], timeout=5)
+
+def test_source_without_wanted_ncns_falls_through(sources):
+    assert get_ncns(types=[ "worker" ], warn=lambda message: None) == [ "ncn-w001", "ncn-w002" ]
+    # The fallback list is not cached, so that it is not used for the other NCN types
+    assert not sources.exists()
+    assert get_ncns(types=[ "master" ]) == [ "ncn-m001", "ncn-m002" ]
+    with open(str(sources), "rt") as f:
+        assert json.load(f)["source"] == "basecamp"
+
+def test_cached_list_without_wanted_ncns_is_not_used(sources):
+    assert get_ncns() == [ "ncn-m001", "ncn-m002", "ncn-s001" ]
+    assert get_ncns(types=[ "worker" ], warn=lambda message: None) == [ "ncn-w001", "ncn-w002" ]
+
+def test_no_source_has_wanted_ncns(monkeypatch, sources):
+    monkeypatch.setattr(ncn_inventory, "inventory_sources", lambda pit: [
+        source("basecamp", "ncn-m001 ncn-s001", authoritative=True) ])
+    with pytest.raises(ScriptException, match="Unable to obtain worker NCN list from any source"):
+        get_ncns(types=[ "worker" ])
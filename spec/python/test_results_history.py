@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/results_history.py
+"""
+
+from lib.results import DurationSeconds, ResultsEntry, SourceResults
+from lib.results_history import ResultsHistory
+
+PASS, FAIL, SKIP = 0, 1, 2
+
+def entry(title: str, result: int, duration_ns: int) -> ResultsEntry:
+    return ResultsEntry({ "result": result, "title": title, "summary-line": f"{title} {result}",
+                          "duration": duration_ns, "meta": { "desc": title } })
+
+def source_results(*entries: ResultsEntry) -> SourceResults:
+    failed_count = sum(1 for e in entries if e.result_raw == FAIL)
+    total_ns = sum(e.duration_nanoseconds for e in entries)
+    return SourceResults(source="http://ncn-w001:8994/ncn-healthcheck-worker", node_name="ncn-w001",
+                         selected_results=tuple(entries), failed_count=failed_count,
+                         total_duration=DurationSeconds(total_ns))
+
+def add_runs(history: ResultsHistory, runs) -> None:
+    for i, entries in enumerate(runs):
+        history.add_run(timestamp=f"2026-01-01T00:00:0{i}", hostname="ncn-m001", log_dir="/tmp",
+                        source_results=[ source_results(*entries) ])
+
+def test_properties_of_one_test_are_not_flapping(tmp_path):
+    # The same properties pass and fail in every run, so the test consistently fails
+    with ResultsHistory(str(tmp_path / "history.db")) as history:
+        add_runs(history, [ [ entry("Test A", PASS, 10), entry("Test A", FAIL, 20) ] ] * 5)
+        assert history.flapping_tests(num_runs=5, min_changes=1) == []
+        rows = list(history.test_results(history.recent_run_ids(5)))
+        assert [ row[4] for row in rows ] == [ FAIL ] * 5
+
+def test_flapping_counts_one_change_per_run(tmp_path):
+    with ResultsHistory(str(tmp_path / "history.db")) as history:
+        add_runs(history, [ [ entry("Test A", PASS, 10), entry("Test A", PASS if i % 2 else FAIL, 20) ]
+                            for i in range(5) ])
+        flapping = history.flapping_tests(num_runs=5, min_changes=1)
+        assert flapping == [ (("ncn-w001", "http://ncn-w001:8994/ncn-healthcheck-worker", "Test A"),
+                              4, [ FAIL, PASS, FAIL, PASS, FAIL ]) ]
+
+def test_skipped_properties_do_not_hide_passes(tmp_path):
+    with ResultsHistory(str(tmp_path / "history.db")) as history:
+        add_runs(history, [ [ entry("Test A", SKIP, 1), entry("Test A", PASS, 1) ],
+                            [ entry("Test A", SKIP, 1) ] ])
+        rows = list(history.test_results(history.recent_run_ids(2)))
+        assert [ row[4] for row in rows ] == [ PASS, SKIP ]
+
+def test_durations_are_summed_over_properties(tmp_path):
+    with ResultsHistory(str(tmp_path / "history.db")) as history:
+        add_runs(history, [ [ entry("Test A", PASS, 10), entry("Test A", PASS, 20 + i),
+                              entry("Test B", PASS, 5) ] for i in range(3) ])
+        trends = history.duration_trends(history.recent_run_ids(3))
+        key = ("ncn-w001", "http://ncn-w001:8994/ncn-healthcheck-worker", "Test A")
+        assert trends[key].durations == [ 30, 31, 32 ]
+        assert trends[key].median().to_nanoseconds() == 31
+        assert [ trend.title for trend in history.slowest_tests(num_runs=3, limit=2) ] == [ "Test A", "Test B" ]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for lib/retry.py
+"""
+
+import random
+
+import pytest
+
+from lib.retry import RetryPolicy, is_retryable_status, retries_string
+from lib.timeouts import Deadline
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    random.seed(1)
+
+def test_no_delay_once_retries_are_exhausted():
+    policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.1)
+    assert policy.next_delay(0, Deadline(0)) is not None
+    assert policy.next_delay(1, Deadline(0)) is not None
+    assert policy.next_delay(2, Deadline(0)) is None
+    assert RetryPolicy(max_retries=0, base_delay=0.01, max_delay=0.1).next_delay(0, Deadline(0)) is None
+
+@pytest.mark.parametrize("retry_number", range(8))
+def test_delays_are_within_the_backoff_bounds(retry_number):
+    policy = RetryPolicy(max_retries=8, base_delay=0.5, max_delay=10)
+    upper_bound = min(10, 0.5 * 2**retry_number)
+    for _ in range(200):
+        assert 0 <= policy.next_delay(retry_number, Deadline(0)) <= upper_bound
+
+def test_no_delay_which_would_pass_the_deadline():
+    policy = RetryPolicy(max_retries=3, base_delay=1000, max_delay=1000)
+    random.seed(1)
+    assert policy.next_delay(0, Deadline(0)) > 1
+    random.seed(1)
+    assert policy.next_delay(0, Deadline(1)) is None
+
+def test_no_delay_after_the_deadline(monkeypatch):
+    deadline = Deadline(60)
+    monkeypatch.setattr(deadline, "remaining", lambda: 0.0)
+    assert RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.001).next_delay(0, deadline) is None
+
+def test_delays_within_the_deadline_are_allowed():
+    assert RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.001).next_delay(2, Deadline(60)) is not None
+
+@pytest.mark.parametrize("status_code, body, expected", [
+    (502, b"", True),
+    (503, b"", True),
+    (503, b"Service Unavailable", True),
+    (503, b'{"results": [], "summary": {}}', False),
+    (500, b"", False),
+    (504, b"", False),
+    (404, b"", False),
+    (200, b"", False),
+])
+def test_is_retryable_status(status_code, body, expected):
+    assert is_retryable_status(status_code, body) is expected
+
+def test_retries_string():
+    assert retries_string(0) == ""
+    assert retries_string(2) == " (after 2 retries)"
+    assert retries_string(1, "HTTP status 502") == \
+           " (after 1 retry; the last retry was because of: HTTP status 502)"
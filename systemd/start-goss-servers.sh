@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2020-2024 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2020-2024,2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -88,6 +88,20 @@ else
 fi
 [[ -z ${ip} ]] && exit 2
 
+# GOSS_SERVERS_MODE may be set in /etc/sysconfig/goss-servers. If it is "gateway", then a single goss_gateway process
+# serves all of the endpoints for this node, on the same ports, and runs at most GOSS_GATEWAY_MAX_CONCURRENT suites at
+# once. Otherwise ("legacy", the default), a separate Goss server is started for each endpoint.
+GOSS_SERVERS_MODE=${GOSS_SERVERS_MODE:-legacy}
+if [[ ${GOSS_SERVERS_MODE} == gateway ]]; then
+    echo "starting goss gateway on ${ip}"
+    exec "${GOSS_BASE}/automated/python/goss_gateway.py" \
+        --vars "${tmpvars}" \
+        --format "${results_format}" \
+        --listen-ip "${ip}"
+elif [[ ${GOSS_SERVERS_MODE} != legacy ]]; then
+    echo "WARNING: Invalid GOSS_SERVERS_MODE value '${GOSS_SERVERS_MODE}'. Starting one Goss server per endpoint." 1>&2
+fi
+
 # The goss_suites_endpoints_ports function calls a Python script that outputs lines of the format:
 # <suite file path> <endpoint name> <port>
 # For all Goss endpoints that should be started on this node